@@ -0,0 +1,85 @@
+"""
+Auth latency: remote `supabase.auth.get_user` vs local JWT verification.
+
+Run from backend/:  python -m benchmarks.bench_auth
+The remote path is simulated with a fixed network delay so the numbers are
+reproducible offline (override with AUTH_BENCH_REMOTE_MS).
+"""
+import os
+import time
+import statistics
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:54321/functions/v1/embed")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-secret-with-at-least-thirty-two-chars")
+
+import jwt
+from types import SimpleNamespace
+from fastapi import Depends, FastAPI, Header
+from fastapi.testclient import TestClient
+
+import config
+from dependencies import get_current_user
+
+REMOTE_MS = float(os.getenv("AUTH_BENCH_REMOTE_MS", "40"))
+N = int(os.getenv("AUTH_BENCH_N", "500"))
+
+def make_token(user_id: str) -> str:
+    return jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 3600},
+        config.SUPABASE_JWT_SECRET,
+        algorithm="HS256"
+    )
+
+def fake_get_user(token):
+    time.sleep(REMOTE_MS / 1000)
+    claims = jwt.decode(token, options={"verify_signature": False})
+    return SimpleNamespace(user=SimpleNamespace(id=claims["sub"]))
+
+async def legacy_current_user(authorization: str = Header(...)):
+    """The pre-change dependency: one auth-server hop per request."""
+    token = authorization.split(" ")[1]
+    user_response = config.get_supabase().auth.get_user(token)
+    return user_response.user.id
+
+def build_app(dependency) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health-auth")
+    def health(user_id: str = Depends(dependency)):
+        return {"status": "ok", "user": user_id}
+
+    return app
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+def run(label: str, client: TestClient, tokens: list):
+    samples = []
+    for i in range(N):
+        token = tokens[i % len(tokens)]
+        start = time.perf_counter()
+        r = client.get("/health-auth", headers={"Authorization": f"Bearer {token}"})
+        samples.append((time.perf_counter() - start) * 1000)
+        assert r.status_code == 200, r.text
+    print(f"{label:<28} p50={percentile(samples, 0.5):7.2f}ms  "
+          f"p99={percentile(samples, 0.99):7.2f}ms  mean={statistics.mean(samples):7.2f}ms")
+
+if __name__ == "__main__":
+    tokens = [make_token(f"user-{i}") for i in range(50)]
+    config.get_supabase().auth.get_user = fake_get_user
+
+    # Before: every call goes to the auth server
+    run("before (remote get_user)", TestClient(build_app(legacy_current_user)), tokens)
+
+    # After: local signature check on every call
+    client = TestClient(build_app(get_current_user))
+    cold = [make_token(f"cold-{i}") for i in range(N)]
+    run("after (local, cold cache)", client, cold)
+
+    # After: repeat tokens served from the TTL cache
+    run("after (local + ttl cache)", client, tokens)
@@ -0,0 +1,95 @@
+"""
+Chunking: legacy split('\\n\\n') vs the sentence-aware token-bounded chunker.
+
+Run from backend/:  python -m benchmarks.bench_chunker
+For synthetic journals of 1KB..1MB, in two shapes (one unformatted block,
+and a list-style entry with one short line per paragraph), reports chunk
+count, chunking time and retrieval quality.
+
+Retrieval quality uses a local stand-in for the embedding model (hashed
+bag-of-words with sublinear tf, cosine similarity) that, like the real
+model, only reads the first MODEL_MAX_TOKENS tokens of a chunk. "Needle"
+sentences are planted in the text and each is used as a query; we report
+recall@3 (the needle's chunk is in the top 3 and the needle falls inside
+the model's input window) and focus (mean similarity
+of that chunk to the query, which drops as chunks get oversized).
+"""
+import os
+import time
+import random
+import hashlib
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:54321/functions/v1/embed")
+
+import numpy as np
+from services.chunker import chunk_text, _TOKEN
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DIMENSIONS = 4096
+MODEL_MAX_TOKENS = 512
+NEEDLES = 5
+
+WORDS = (
+    "today work friend walk tired happy anxious river coffee meeting family call "
+    "sleep morning evening rain sun garden book music run dinner talk quiet busy "
+    "felt thought remember hope worry laugh cry stress calm grateful lonely"
+).split()
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+
+def make_journal(size: int, shape: str, rng: random.Random):
+    needles = [f"Needle {i} zebra{i} quasar{i} marmalade{i} lantern{i}." for i in range(NEEDLES)]
+    parts, length = [], 0
+    while length < size:
+        s = sentence(rng) if shape == "unformatted" else "- " + " ".join(rng.choice(WORDS) for _ in range(3))
+        parts.append(s)
+        length += len(s) + 2
+    for i, needle in enumerate(needles):
+        parts.insert((i + 1) * len(parts) // (NEEDLES + 1), needle)
+    sep = " " if shape == "unformatted" else "\n\n"
+    return sep.join(parts), needles
+
+def embed(text: str) -> np.ndarray:
+    v = np.zeros(DIMENSIONS)
+    for token in _TOKEN.findall(text.lower())[:MODEL_MAX_TOKENS]:
+        v[int(hashlib.md5(token.encode()).hexdigest()[:8], 16) % DIMENSIONS] += 1
+    v = np.log1p(v)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+def legacy_chunks(text: str) -> list:
+    return [c for c in text.split('\n\n') if c.strip()] or [text]
+
+def evaluate(chunks: list, needles: list):
+    matrix = np.stack([embed(c) for c in chunks])
+    hits, focus = 0, []
+    for needle in needles:
+        scores = matrix @ embed(needle)
+        target = next(i for i, c in enumerate(chunks) if needle in c)
+        visible = needle.split()[2].lower() in _TOKEN.findall(chunks[target].lower())[:MODEL_MAX_TOKENS]
+        hits += visible and target in np.argsort(-scores)[:3]
+        focus.append(scores[target])
+    return hits / len(needles), float(np.mean(focus))
+
+def main():
+    rng = random.Random(7)
+    print(f"{'shape':<12} {'size':>8} {'method':<8} {'chunks':>7} {'time':>9} {'recall@3':>9} {'focus':>6}")
+    for shape in ("unformatted", "list"):
+        for size in SIZES:
+            text, needles = make_journal(size, shape, rng)
+            for name, fn in (("legacy", legacy_chunks), ("chunker", chunk_text)):
+                start = time.perf_counter()
+                chunks = fn(text)
+                elapsed = (time.perf_counter() - start) * 1000
+                # Needles must survive chunking intact to be scored
+                chunks_for_eval = chunks if all(any(n in c for c in chunks) for n in needles) else None
+                recall, focus = evaluate(chunks_for_eval, needles) if chunks_for_eval else (float("nan"), float("nan"))
+                print(f"{shape:<12} {size:>8} {name:<8} {len(chunks):>7} {elapsed:>7.1f}ms {recall:>9.2f} {focus:>6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Home/insights page load: the old request fan-out vs GET /dashboard.
+
+Run from backend/:  python -m benchmarks.bench_dashboard
+Before: /moods/today, /moods/history twice (chart and calendar),
+/insights/weekly and /quotes/daily - the browser sends them in parallel,
+as it did. After: one /dashboard, then a revalidation with If-None-Match
+(the next page load when nothing changed). The PostgREST stand-in answers
+after DASHBOARD_BENCH_DB_MS; the quote is already in memory, as it is
+once the prefetch has run. Reports page-load latency,
+backend requests and PostgREST calls per load, and bytes on the wire.
+"""
+import os
+import time
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", f"http://127.0.0.1:{PORT}/functions/v1/embed")
+os.environ.setdefault("API_NINJAS_KEY", "bench")
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from main import app
+from dependencies import get_current_user
+from services.quote_service import get_quote_provider
+from services.insight_service import week_range
+
+DB_MS = float(os.getenv("DASHBOARD_BENCH_DB_MS", "40"))
+LOADS_PER_USER = int(os.getenv("DASHBOARD_BENCH_LOADS", "10"))
+USERS = int(os.getenv("DASHBOARD_BENCH_USERS", "20"))
+
+today = datetime.utcnow().date()
+MOODS = [
+    {"id": str(uuid.uuid4()), "user_id": "bench-user", "mood_score": 1 + i % 5, "mood_label": "Good",
+     "created_at": f"{(today - timedelta(days=i)).isoformat()}T09:00:00+00:00"}
+    for i in range(35)
+]
+WEEKLY = {
+    "id": str(uuid.uuid4()), "user_id": "bench-user", "insight_type": "weekly_summary",
+    "valid_from": week_range(0)[0], "valid_until": week_range(0)[1],
+    "payload": {"headline": "A steadier week", "summary": "You slept better and wrote more.",
+                "pattern": "Walks after work lift the evening.", "sentiment_trend": "Rising",
+                "actionable_tip": "Keep the walks."},
+}
+
+async def rest_table(request):
+    await asyncio.sleep(DB_MS / 1000)
+    table = request.path_params["table"]
+    if table == "user_insights":
+        return JSONResponse([WEEKLY])
+    return JSONResponse(MOODS)
+
+standin_app = Starlette(routes=[Route("/rest/v1/{table}", rest_table, methods=["GET"])])
+
+db_calls = 0
+
+async def count_db_calls(request):
+    global db_calls
+    db_calls += 1
+
+async def page_before(client) -> tuple:
+    start, end = (today - timedelta(days=35)).isoformat(), f"{today.isoformat()}T23:59:59"
+    responses = await asyncio.gather(
+        client.get("/moods/today"),
+        client.get("/moods/history", params={"start_date": start, "end_date": end}),
+        client.get("/moods/history", params={"start_date": start, "end_date": end}),
+        client.get("/insights/weekly"),
+        client.get("/quotes/daily"),
+    )
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses]
+    return len(responses), sum(len(r.content) for r in responses)
+
+async def page_after(client, etag: str = None) -> tuple:
+    start, end = (today - timedelta(days=35)).isoformat(), f"{today.isoformat()}T23:59:59"
+    headers = {"If-None-Match": etag} if etag else {}
+    r = await client.get("/dashboard/", params={"start_date": start, "end_date": end}, headers=headers)
+    assert r.status_code in (200, 304), r.text
+    return 1, len(r.content), r.headers["etag"], r.status_code
+
+async def measure(label: str, load):
+    global db_calls
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies, requests, sizes = [], 0, 0
+        db_calls = 0
+
+        async def user():
+            nonlocal requests, sizes
+            for _ in range(LOADS_PER_USER):
+                start = time.perf_counter()
+                n, size = await load(client)
+                latencies.append(time.perf_counter() - start)
+                requests += n
+                sizes += size
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(USERS)))
+        wall = time.perf_counter() - start
+    loads = len(latencies)
+    latencies.sort()
+    print(f"{label:<26} p50 {latencies[loads // 2] * 1000:6.1f}ms  p99 {latencies[-1] * 1000:6.1f}ms  "
+          f"{requests / loads:.0f} req/load  {db_calls / loads:.1f} db calls/load  "
+          f"{sizes / loads:6.0f} B/load  {loads / wall:6.1f} loads/s")
+
+async def main():
+    app.dependency_overrides[get_current_user] = lambda: "bench-user"
+    get_quote_provider().memory[today.isoformat()] = {"quote": "Well begun is half done.", "author": "Aristotle"}
+    # Count PostgREST round trips from the API side
+    (await config.get_http_client()).event_hooks["request"].append(count_db_calls)
+
+    await measure("before (5-request fan-out)", page_before)
+
+    async def first(client):
+        n, size, _, _ = await page_after(client)
+        return n, size
+    await measure("after (/dashboard)", first)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        _, _, etag, _ = await page_after(client)
+
+    async def revalidate(client):
+        n, size, _, status = await page_after(client, etag)
+        assert status == 304
+        return n, size
+    await measure("after (304 revalidation)", revalidate)
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    standin = standins.start(standin_app, PORT)
+    try:
+        asyncio.run(main())
+    finally:
+        standin.terminate()
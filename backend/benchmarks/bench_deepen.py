@@ -0,0 +1,168 @@
+"""
+Go Deeper on a saved journal: re-embedding the draft vs. reusing stored vectors.
+
+Run from backend/:  python -m benchmarks.bench_deepen
+A synthetic user has DEEPEN_BENCH_JOURNALS past entries, each about one of
+TOPICS topics. The saved entry being edited covers two topics over six
+paragraphs; each round rewrites one paragraph and asks Go Deeper, with a
+cold embedding cache (a fresh worker, or an evicted draft).
+
+Embeddings come from a stand-in edge function whose vectors follow word
+topics, so "related" is measurable: we report chunks sent to the edge
+function, draft-embedding latency, how many hits were the entry's own
+chunks, and how many of the draft's two topics the hits cover.
+"""
+import os
+import time
+import random
+import asyncio
+import hashlib
+import tempfile
+
+import numpy as np
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ["EDGE_FUNCTION_URL"] = f"http://127.0.0.1:{PORT}/functions/v1/embed"
+os.environ["RETRIEVAL_BACKEND"] = "local"
+os.environ["RETRIEVAL_INDEX_DIR"] = tempfile.mkdtemp()
+os.environ.pop("EMBEDDING_CACHE_DB_PATH", None)
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from services import ai_service, crypto_service
+from services.embedding_cache import get_embedding_cache
+from services.retrieval import get_retriever
+
+JOURNALS = int(os.getenv("DEEPEN_BENCH_JOURNALS", "600"))
+EDGE_MS = float(os.getenv("DEEPEN_BENCH_EDGE_MS", "40"))
+ROUNDS = 20
+TOPICS = 24
+DIMENSIONS = 384
+USER = "bench-user"
+CURRENT = "current-journal"
+
+rng = random.Random(19)
+vocab = [[f"t{t}w{i}" for i in range(40)] for t in range(TOPICS)]
+topic_centers = np.random.default_rng(19).standard_normal((TOPICS, DIMENSIONS))
+
+def word_vector(word: str) -> np.ndarray:
+    topic = int(word[1:word.index("w")])
+    noise = np.random.default_rng(int(hashlib.sha256(word.encode()).hexdigest()[:8], 16)).standard_normal(DIMENSIONS)
+    return topic_centers[topic] + 1.5 * noise
+
+def embed_text(text: str) -> list:
+    v = sum(word_vector(w) for w in text.replace(".", "").split() if w.startswith("t"))
+    return (v / np.linalg.norm(v)).round(5).tolist()
+
+def paragraph(topic: int) -> str:
+    sentences = [" ".join(rng.choices(vocab[topic], k=12)) + "." for _ in range(14)]
+    return " ".join(sentences)
+
+def topic_of(text: str) -> int:
+    first = text.split()[0]
+    return int(first[1:first.index("w")])
+
+async def embed(request):
+    body = await request.json()
+    inputs = body.get("inputs") or [body["input"]]
+    await asyncio.sleep(EDGE_MS / 1000)
+    if "inputs" in body:
+        return JSONResponse({"vectors": [embed_text(t) for t in inputs]})
+    return JSONResponse({"vector": embed_text(inputs[0])})
+
+ROWS = []
+
+def store(journal_id: str, content: str):
+    ROWS[:] = [r for r in ROWS if r["journal_id"] != journal_id]
+    chunks = ai_service.split_chunks(content)
+    for i, (chunk, token) in enumerate(zip(chunks, crypto_service.encrypt_many(chunks))):
+        ROWS.append({"id": f"{journal_id}-{i}", "journal_id": journal_id, "user_id": USER,
+                     "content_chunk_encrypted": token, "embedding": embed_text(chunk), "topic": topic_of(chunk)})
+
+async def journal_vectors(request):
+    params = request.query_params
+    if "journal_id" in params:
+        rows = [r for r in ROWS if r["journal_id"] == params["journal_id"].removeprefix("eq.")]
+    else:
+        offset, limit = int(params.get("offset", "0")), int(params.get("limit", "1000"))
+        rows = ROWS[offset:offset + limit]
+    return JSONResponse([{k: v for k, v in r.items() if k != "topic"} for r in rows])
+
+standin_app = Starlette(routes=[
+    Route("/functions/v1/embed", embed, methods=["POST"]),
+    Route("/rest/v1/journal_vectors", journal_vectors, methods=["GET"]),
+])
+
+edge_inputs = 0
+embed_chunks = ai_service.embed_chunks
+
+async def counting_embed_chunks(chunks: list) -> list:
+    global edge_inputs
+    edge_inputs += len(chunks)
+    return await embed_chunks(chunks)
+
+ai_service.embed_chunks = counting_embed_chunks
+
+async def first_chunk_only(content: str) -> tuple:
+    """The previous behaviour: embed the whole draft, search with its first chunk."""
+    _, vectors = await ai_service.generate_embeddings_via_edge(content)
+    return await get_retriever().search(USER, vectors[0], config.RETRIEVAL_THRESHOLD, config.RETRIEVAL_K)
+
+async def reuse_stored(content: str, mode: str) -> list:
+    ai_service.DEEPEN_QUERY_MODE = mode
+    vectors, own_ids = await ai_service.draft_vectors(USER, content, CURRENT)
+    return await ai_service.related_chunks(USER, vectors, CURRENT, own_ids)
+
+async def run(label: str, deepen, topics: set):
+    global edge_inputs
+    topic_by_id = {r["id"]: r["topic"] for r in ROWS}
+    sent = own = covered = found = 0
+    latencies = []
+    for _ in range(ROUNDS):
+        paragraphs = DRAFT.split("\n\n")
+        i = rng.randrange(len(paragraphs))
+        paragraphs[i] = paragraph(topic_of(paragraphs[i]))
+        content = "\n\n".join(paragraphs)
+
+        get_embedding_cache().memory.clear()
+        edge_inputs = 0
+        start = time.perf_counter()
+        hits = await deepen(content)
+        latencies.append(time.perf_counter() - start)
+        sent += edge_inputs
+        own += sum(h["journal_id"] == CURRENT for h in hits)
+        found += len(hits)
+        covered += len({topic_by_id[h["id"]] for h in hits} & topics)
+    latencies.sort()
+    print(f"{label:<24} {sent / ROUNDS:>6.1f} {latencies[len(latencies) // 2] * 1000:>8.1f}ms "
+          f"{own / max(found, 1):>9.0%} {covered / ROUNDS:>12.2f}/{len(topics)}")
+
+async def main():
+    global DRAFT
+    for j in range(JOURNALS):
+        store(f"j{j:05d}", "\n\n".join(paragraph(j % TOPICS) for _ in range(2)))
+    topics = {0, 1}
+    DRAFT = "\n\n".join(paragraph(t) for t in (0, 0, 0, 1, 1, 1))
+    store(CURRENT, DRAFT)
+    # Forked after the rows exist, so the stand-in serves them
+    standins.start(standin_app, PORT)
+    print(f"{len(ROWS)} stored chunks, draft of {len(ai_service.split_chunks(DRAFT))} chunks, edge {EDGE_MS:.0f}ms")
+    await get_retriever().index_for(USER)
+
+    print(f"{'':<24} {'edge':>6} {'p50':>10} {'own hits':>9} {'topics hit':>14}")
+    await run("re-embed, first chunk", first_chunk_only, topics)
+    await run("reuse, mean query", lambda c: reuse_stored(c, "mean"), topics)
+    await run("reuse, max-sim", lambda c: reuse_stored(c, "maxsim"), topics)
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Embedding throughput: one request per chunk vs batched requests.
+
+Run from backend/:  python -m benchmarks.bench_embed
+Talks to benchmarks/edge_stub.py over the shared pooled client, so the
+numbers include real HTTP but not a real model.
+"""
+import os
+import time
+import asyncio
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["EDGE_FUNCTION_URL"] = f"http://127.0.0.1:{PORT}/functions/v1/embed"
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+
+import config
+from services import ai_service
+from benchmarks.edge_stub import app as edge_app
+
+CHUNKS = int(os.getenv("EMBED_BENCH_CHUNKS", "200"))
+
+async def run(label: str, batch_size: int, chunks: list):
+    ai_service.EMBED_BATCH_SIZE = batch_size
+    start = time.perf_counter()
+    vectors = await ai_service.embed_chunks(chunks)
+    elapsed = time.perf_counter() - start
+    ok = sum(v is not None for v in vectors)
+    print(f"{label:<24} {ok}/{len(chunks)} chunks  {elapsed * 1000:8.1f}ms  {ok / elapsed:8.1f} chunks/s")
+
+async def main():
+    chunks = [f"Paragraph {i}: today I walked by the river and thought about work." for i in range(CHUNKS)]
+    await run("per-chunk", 0, chunks)
+    for size in (16, 64):
+        await run(f"batched ({size})", size, chunks)
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    stub = standins.start(edge_app, PORT)
+    try:
+        asyncio.run(main())
+    finally:
+        stub.terminate()
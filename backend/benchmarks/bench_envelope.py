@@ -0,0 +1,84 @@
+"""
+Storage format: legacy Fernet(text) vs the compressed "v2:" envelope.
+
+Run from backend/:  python -m benchmarks.bench_envelope
+Builds a synthetic corpus of journals (Zipf-distributed vocabulary, so it
+compresses roughly like prose rather than like a repeated word list) and
+their chunks, then reports stored bytes and per-row encode/decode time
+for both formats.
+"""
+import os
+import time
+import random
+import string
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:54321/functions/v1/embed")
+# The envelope is opt-in; this benchmark measures it
+os.environ["ENCRYPTION_FORMAT"] = "2"
+
+from config import get_cipher
+from services import crypto_service
+from services.chunker import chunk_text
+
+JOURNAL_SIZES = [200, 1_000, 5_000, 20_000]
+PER_SIZE = 200
+VOCABULARY = 3_000
+
+def make_vocabulary(rng: random.Random) -> list:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(VOCABULARY)]
+
+def make_journal(size: int, vocab: list, weights: list, rng: random.Random) -> str:
+    sentences, length = [], 0
+    while length < size:
+        words = rng.choices(vocab, weights=weights, k=rng.randint(5, 18))
+        s = " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?"])
+        sentences.append(s)
+        length += len(s) + 1
+    return " ".join(sentences)[:size]
+
+def legacy_encrypt(text: str) -> str:
+    return get_cipher().encrypt(text.encode()).decode()
+
+def measure(texts: list, encode) -> tuple:
+    start = time.perf_counter()
+    tokens = [encode(t) for t in texts]
+    encode_us = (time.perf_counter() - start) / len(texts) * 1e6
+    start = time.perf_counter()
+    decoded = [crypto_service.decrypt(t) for t in tokens]
+    decode_us = (time.perf_counter() - start) / len(texts) * 1e6
+    assert decoded == texts
+    return sum(len(t) for t in tokens), encode_us, decode_us
+
+def report(label: str, texts: list):
+    plain = sum(len(t.encode()) for t in texts)
+    legacy_bytes, legacy_enc, legacy_dec = measure(texts, legacy_encrypt)
+    v2_bytes, v2_enc, v2_dec = measure(texts, crypto_service.encrypt)
+    saved = 1 - v2_bytes / legacy_bytes
+    print(
+        f"{label:<16} {len(texts):>6} {plain / 1024:>9.0f}K {legacy_bytes / 1024:>9.0f}K {v2_bytes / 1024:>9.0f}K "
+        f"{saved:>7.1%} {legacy_enc:>7.1f}/{legacy_dec:<6.1f} {v2_enc:>7.1f}/{v2_dec:<6.1f}"
+    )
+    return legacy_bytes, v2_bytes
+
+def main():
+    rng = random.Random(16)
+    vocab = make_vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+
+    print(f"{'rows':<16} {'count':>6} {'plaintext':>10} {'legacy':>10} {'v2':>10} {'saved':>7} {'legacy us enc/dec':>17} {'v2 us enc/dec':>14}")
+    total_legacy = total_v2 = 0
+    for size in JOURNAL_SIZES:
+        journals = [make_journal(size, vocab, weights, rng) for _ in range(PER_SIZE)]
+        chunks = [c for j in journals for c in chunk_text(j)]
+        for label, texts in ((f"journals {size}B", journals), (f"chunks of {size}B", chunks)):
+            legacy_bytes, v2_bytes = report(label, texts)
+            total_legacy += legacy_bytes
+            total_v2 += v2_bytes
+    print(f"\ntotal: {total_legacy / 1024:.0f}K -> {total_v2 / 1024:.0f}K ({1 - total_v2 / total_legacy:.1%} saved)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Summary calls with the LLM response cache.
+
+Run from backend/:  python -m benchmarks.bench_llm_cache
+Replays LLM_CACHE_BENCH_SAVES journal saves where LLM_CACHE_BENCH_REPEAT
+of them repeat earlier content (duplicate saves, job retries, a Go Deeper
+draft saved again - some with different whitespace) against a Groq
+stand-in that answers after 300ms and reports token usage. Then a fresh
+cache object on the same SQLite file (a restarted worker) replays the
+repeats. Reports hit ratio, latency on hits vs misses and the savings.
+"""
+import os
+import time
+import random
+import asyncio
+import tempfile
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["LLM_CACHE_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "llm_cache.db")
+os.environ["LLM_RPM_SMALL"] = os.environ["LLM_TPM_SMALL"] = "10000000"
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:9/functions/v1/embed")
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from services import ai_service, llm_cache
+
+SAVES = int(os.getenv("LLM_CACHE_BENCH_SAVES", "300"))
+REPEAT = float(os.getenv("LLM_CACHE_BENCH_REPEAT", "0.3"))
+
+async def chat_completions(request):
+    body = await request.json()
+    prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+    await asyncio.sleep(0.3)
+    return JSONResponse({
+        "id": "x", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": '{"summary": "A calm day after a hard week.", "tags": ["calm"]}'}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 25, "total_tokens": prompt_tokens + 25},
+    })
+
+standin_app = Starlette(routes=[Route("/openai/v1/chat/completions", chat_completions, methods=["POST"])])
+
+rng = random.Random(21)
+words = "today felt long but the walk helped and I talked to my sister about work and sleep".split()
+
+def journal() -> str:
+    return "\n\n".join(" ".join(rng.choices(words, k=60)) for _ in range(rng.randint(2, 6)))
+
+async def main():
+    standins.start(standin_app, PORT)
+    saved, hits, misses = [], [], []
+    for _ in range(SAVES):
+        if saved and rng.random() < REPEAT:
+            text = rng.choice(saved)
+            if rng.random() < 0.5:
+                text = text.replace(" ", "  ", 3) + "\n"
+        else:
+            text = journal()
+            saved.append(text)
+        before = llm_cache.get_llm_cache().stats()["misses"]
+        start = time.perf_counter()
+        await ai_service.generate_summary(text)
+        elapsed = time.perf_counter() - start
+        (misses if llm_cache.get_llm_cache().stats()["misses"] > before else hits).append(elapsed)
+
+    stats = llm_cache.get_llm_cache().stats()
+    hits.sort()
+    misses.sort()
+    print(f"{SAVES} saves, {len(saved)} distinct: hit ratio {stats['hit_ratio']:.2f}, "
+          f"p50 hit {hits[len(hits) // 2] * 1000:.2f}ms vs miss {misses[len(misses) // 2] * 1000:.0f}ms")
+    print(f"saved {stats['tokens_saved']} tokens, ${stats['usd_saved']:.4f} at {config.LLM_MODEL_SMALL} prices")
+
+    # A restarted worker: empty memory tier, same file
+    restarted = llm_cache.LLMResponseCache(db_path=config.LLM_CACHE_DB_PATH)
+    llm_cache.cache = restarted
+    start = time.perf_counter()
+    for text in saved[:100]:
+        await ai_service.generate_summary(text)
+    print(f"after restart: {restarted.stats()['disk_hits']}/{min(100, len(saved))} answered from disk, "
+          f"{(time.perf_counter() - start) / min(100, len(saved)) * 1000:.2f}ms each")
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
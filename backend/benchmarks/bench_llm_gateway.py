@@ -0,0 +1,127 @@
+"""
+LLM calls under a burst: direct SDK calls vs. the gateway.
+
+Run from backend/:  python -m benchmarks.bench_llm_gateway
+A Groq stand-in enforces a sliding one-minute request limit per model
+(LLM_BENCH_RPM_LARGE / LLM_BENCH_RPM_SMALL, answering 429 with
+retry-after past it) and answers after a per-model latency. A backlog of
+background summaries lands at once, then interactive deepen calls arrive
+one every LLM_BENCH_GAP_MS. Reported per kind: successes, p50/p99 latency,
+and for the gateway how often deepen was routed to the small model.
+"""
+import os
+import time
+import asyncio
+import collections
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+RPM_LARGE = float(os.getenv("LLM_BENCH_RPM_LARGE", "20"))
+RPM_SMALL = float(os.getenv("LLM_BENCH_RPM_SMALL", "60"))
+os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["LLM_RPM_LARGE"] = str(RPM_LARGE)
+os.environ["LLM_RPM_SMALL"] = str(RPM_SMALL)
+# The stand-in only limits requests
+os.environ["LLM_TPM_LARGE"] = os.environ["LLM_TPM_SMALL"] = "10000000"
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:9/functions/v1/embed")
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from services import llm_gateway
+
+SUMMARIES = int(os.getenv("LLM_BENCH_SUMMARIES", "80"))
+DEEPENS = int(os.getenv("LLM_BENCH_DEEPENS", "30"))
+GAP_MS = float(os.getenv("LLM_BENCH_GAP_MS", "1000"))
+LATENCY_MS = {config.LLM_MODEL_LARGE: 400, config.LLM_MODEL_SMALL: 120}
+LIMITS = {config.LLM_MODEL_LARGE: RPM_LARGE, config.LLM_MODEL_SMALL: RPM_SMALL}
+
+windows = collections.defaultdict(collections.deque)
+
+async def chat_completions(request):
+    body = await request.json()
+    model = body["model"]
+    now = time.monotonic()
+    window = windows[model]
+    while window and now - window[0] > 60:
+        window.popleft()
+    if len(window) >= LIMITS[model]:
+        retry_after = 60 - (now - window[0])
+        return JSONResponse({"error": {"message": "Rate limit reached", "type": "requests"}}, status_code=429,
+                            headers={"retry-after": f"{retry_after:.2f}"})
+    window.append(now)
+    await asyncio.sleep(LATENCY_MS[model] / 1000)
+    content = '{"summary": "ok", "tags": []}' if body.get("response_format") else "What made today different?"
+    return JSONResponse({
+        "id": "x", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    })
+
+async def reset(request):
+    windows.clear()
+    return JSONResponse({})
+
+standin_app = Starlette(routes=[
+    Route("/openai/v1/chat/completions", chat_completions, methods=["POST"]),
+    Route("/reset", reset, methods=["POST"]),
+])
+
+MESSAGES = [{"role": "system", "content": "x" * 800}, {"role": "user", "content": "y" * 2000}]
+
+async def direct(task: str):
+    model = config.LLM_MODEL_SMALL if task == "summary" else config.LLM_MODEL_LARGE
+    extra = {"response_format": {"type": "json_object"}} if task == "summary" else {}
+    # The previous call sites: the SDK's own defaults (2 quick retries)
+    await config.get_async_groq().chat.completions.create(messages=MESSAGES, model=model, **extra)
+
+async def gateway(task: str):
+    await llm_gateway.complete(task, MESSAGES, json_mode=task == "summary")
+
+async def timed(call, task: str, results: dict):
+    start = time.perf_counter()
+    try:
+        await call(task)
+        results[task].append(time.perf_counter() - start)
+    except Exception:
+        results[f"{task}_failed"].append(time.perf_counter() - start)
+
+def report(label: str, results: dict):
+    for task, total in (("deepen", DEEPENS), ("summary", SUMMARIES)):
+        ok = sorted(results[task])
+        p50 = ok[len(ok) // 2] * 1000 if ok else 0
+        p99 = ok[int(len(ok) * 0.99) - 1] * 1000 if ok else 0
+        print(f"{label:<10} {task:<8} {len(ok):>4}/{total:<4} p50 {p50:7.0f}ms  p99 {p99:7.0f}ms")
+
+async def run(label: str, call):
+    # Fresh per-minute windows for each run
+    async with httpx.AsyncClient() as client:
+        await client.post(f"http://127.0.0.1:{PORT}/reset")
+    results = collections.defaultdict(list)
+    start = time.perf_counter()
+    background = [asyncio.create_task(timed(call, "summary", results)) for _ in range(SUMMARIES)]
+    interactive = []
+    for _ in range(DEEPENS):
+        interactive.append(asyncio.create_task(timed(call, "deepen", results)))
+        await asyncio.sleep(GAP_MS / 1000)
+    await asyncio.gather(*background, *interactive)
+    report(label, results)
+    print(f"{'':<10} wall {time.perf_counter() - start:.1f}s")
+
+async def main():
+    standins.start(standin_app, PORT)
+    await run("direct", direct)
+    await run("gateway", gateway)
+    large = llm_gateway.stats()["models"][config.LLM_MODEL_LARGE]
+    print(f"gateway: {large.get('rerouted', 0)} deepen calls routed to {config.LLM_MODEL_SMALL}, "
+          f"{sum(m.get('rate_limited', 0) for m in llm_gateway.stats()['models'].values())} 429s seen")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Load test: GET /journals/ against a local PostgREST stand-in.
+
+Run from backend/:  python -m benchmarks.bench_load
+The stand-in answers every PostgREST call after a fixed delay
+(LOAD_BENCH_DB_MS), so the numbers show how much I/O overlaps rather than
+how fast a real database is. The "before" row is the old data path: the
+synchronous supabase-py client called from inside an async handler.
+"""
+import os
+import time
+import uuid
+import asyncio
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", f"http://127.0.0.1:{PORT}/functions/v1/embed")
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from main import app
+from dependencies import get_current_user
+
+DB_MS = float(os.getenv("LOAD_BENCH_DB_MS", "50"))
+REQUESTS_PER_USER = int(os.getenv("LOAD_BENCH_REQUESTS", "5"))
+
+ROWS = [
+    {
+        "id": str(uuid.uuid4()),
+        "mood_score": 4,
+        "summary": "A calm day",
+        "tags": ["calm"],
+        "created_at": "2026-01-05T10:00:00+00:00"
+    }
+    for _ in range(20)
+]
+
+async def rest_table(request):
+    await asyncio.sleep(DB_MS / 1000)
+    return JSONResponse(ROWS)
+
+standin_app = Starlette(routes=[Route("/rest/v1/{table}", rest_table, methods=["GET"])])
+
+@app.get("/bench/sync-journals")
+async def sync_journals():
+    # The pre-change data path, kept here only for comparison
+    res = config.get_supabase().table("journals").select("*").eq("user_id", "bench-user").execute()
+    return res.data
+
+async def run(label: str, path: str, users: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def user():
+            for _ in range(REQUESTS_PER_USER):
+                r = await client.get(path)
+                assert r.status_code == 200, r.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(users)))
+        elapsed = time.perf_counter() - start
+
+    total = users * REQUESTS_PER_USER
+    print(f"{label:<22} users={users:<4} {total / elapsed:8.1f} req/s")
+
+async def main():
+    app.dependency_overrides[get_current_user] = lambda: "bench-user"
+    for users in (50, 200):
+        await run("before (sync client)", "/bench/sync-journals", users)
+        await run("after (async repo)", "/journals/", users)
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    standin = standins.start(standin_app, PORT)
+    try:
+        asyncio.run(main())
+    finally:
+        standin.terminate()
@@ -0,0 +1,195 @@
+"""
+Parallel POST /moods/ (double taps, two devices, two workers) and
+/moods/today reads.
+
+Run from backend/:  python -m benchmarks.bench_mood_log
+MOOD_BENCH_USERS users each fire MOOD_BENCH_TAPS mood logs at once, half
+through the API and half through a second MoodDayIndex (another worker
+with its own memory). The PostgREST stand-in answers after
+MOOD_BENCH_DB_MS and enforces the primary key like Postgres. Before: the
+old check-then-insert. After: the per-user index. Reports moods stored
+per user, response mix, and the /moods/today check's latency and
+PostgREST calls. Exits non-zero unless, after, every user has exactly one
+stored mood.
+"""
+import os
+import sys
+import time
+import uuid
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", f"http://127.0.0.1:{PORT}/functions/v1/embed")
+
+import httpx
+from fastapi import Header
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from main import app
+from dependencies import get_current_user
+from repositories import moods as moods_repo
+from services.mood_index import MoodDayIndex, MoodAlreadyLogged, get_mood_index
+
+DB_MS = float(os.getenv("MOOD_BENCH_DB_MS", "40"))
+USERS = int(os.getenv("MOOD_BENCH_USERS", "50"))
+TAPS = int(os.getenv("MOOD_BENCH_TAPS", "8"))
+CHECKS = int(os.getenv("MOOD_BENCH_CHECKS", "20"))
+TZ = "Asia/Kolkata"
+
+rows = {}
+calls = Counter()
+
+def _filters(request) -> dict:
+    return {k: v.split(".", 1) for k, v in request.query_params.items() if k not in ("select", "order", "limit")}
+
+async def rest_select(request):
+    calls["select"] += 1
+    await asyncio.sleep(DB_MS / 1000)
+    found = list(rows.values())
+    for column, (op, value) in _filters(request).items():
+        if op == "eq":
+            found = [r for r in found if r[column] == value]
+        elif op == "gte":
+            found = [r for r in found if r[column] >= value]
+    found.sort(key=lambda r: r["created_at"], reverse=request.query_params.get("order", "").endswith(".desc"))
+    if "limit" in request.query_params:
+        found = found[:int(request.query_params["limit"])]
+    return JSONResponse(found)
+
+async def rest_insert(request):
+    calls["insert"] += 1
+    await asyncio.sleep(DB_MS / 1000)
+    body = await request.json()
+    row = {"id": str(uuid.uuid4()), **(body[0] if isinstance(body, list) else body),
+           "created_at": datetime.now(timezone.utc).isoformat()}
+    if row["id"] in rows:
+        return JSONResponse({"code": "23505", "details": f"Key (id)=({row['id']}) already exists.", "hint": None,
+                             "message": 'duplicate key value violates unique constraint "mood_entries_pkey"'}, status_code=409)
+    rows[row["id"]] = row
+    return JSONResponse([row], status_code=201)
+
+async def admin(request):
+    if request.path_params["action"] == "reset":
+        rows.clear()
+        calls.clear()
+        return JSONResponse({})
+    per_user = Counter(r["user_id"] for r in rows.values())
+    return JSONResponse({"per_user": Counter(per_user.values()), "calls": calls})
+
+standin_app = Starlette(routes=[
+    Route("/rest/v1/mood_entries", rest_select, methods=["GET"]),
+    Route("/rest/v1/mood_entries", rest_insert, methods=["POST"]),
+    Route("/admin/{action}", admin, methods=["GET"]),
+])
+
+def standin_admin(action: str) -> dict:
+    return httpx.get(f"http://127.0.0.1:{PORT}/admin/{action}").json()
+
+async def legacy_log(user_id: str, data: dict):
+    """The old handler: select today's rows, insert if there are none."""
+    db = await config.get_async_supabase()
+    today_start = datetime.utcnow().date().isoformat()
+    existing = await db.table("mood_entries").select("id").eq("user_id", user_id).gte("created_at", today_start).execute()
+    if existing.data:
+        return 400
+    await moods_repo.insert(data)
+    return 200
+
+async def legacy_today(user_id: str) -> bool:
+    db = await config.get_async_supabase()
+    today_start = datetime.utcnow().date().isoformat()
+    existing = await db.table("mood_entries").select("id").eq("user_id", user_id).gte("created_at", today_start).execute()
+    return len(existing.data) > 0
+
+def report_stored(label: str, statuses: Counter) -> bool:
+    """Prints the stored-moods mix; True if every user has exactly one."""
+    per_user = standin_admin("stats")["per_user"]
+    stored = ", ".join(f"{users} users x {n}" for n, users in sorted(per_user.items()))
+    print(f"{label:<8} moods stored: {stored:<28} responses {dict(statuses)}")
+    return per_user == {"1": USERS}
+
+async def hammer_before():
+    standin_admin("reset")
+    statuses = Counter()
+
+    async def tap(user_id):
+        statuses[await legacy_log(user_id, {"user_id": user_id, "mood_score": 4, "mood_label": "Good"})] += 1
+    await asyncio.gather(*(tap(f"user-{u}") for u in range(USERS) for _ in range(TAPS)))
+    report_stored("before", statuses)
+
+async def hammer_after(client):
+    standin_admin("reset")
+    statuses = Counter()
+    other_worker = MoodDayIndex(maxsize=config.MOOD_INDEX_USERS, ttl=config.MOOD_INDEX_TTL)
+
+    async def tap(user_id, through_api: bool):
+        if through_api:
+            r = await client.post("/moods/", json={"score": 4, "label": "Good"}, headers={"X-User": user_id, "X-Timezone": TZ})
+            statuses[r.status_code] += 1
+            return
+        try:
+            await other_worker.log(user_id, ZoneInfo(TZ), {"user_id": user_id, "mood_score": 4, "mood_label": "Good"})
+            statuses[200] += 1
+        except MoodAlreadyLogged:
+            statuses[400] += 1
+    await asyncio.gather(*(tap(f"user-{u}", t % 2 == 0) for u in range(USERS) for t in range(TAPS)))
+    one_each = report_stored("after", statuses)
+    print(f"{'':<8} index: API worker {get_mood_index().stats()}, other worker {other_worker.stats()}")
+    return one_each
+
+async def checks(label: str, check):
+    before = standin_admin("stats")["calls"].get("select", 0)
+    latencies = []
+
+    async def user(u):
+        for _ in range(CHECKS):
+            start = time.perf_counter()
+            assert await check(f"user-{u}")
+            latencies.append(time.perf_counter() - start)
+    await asyncio.gather(*(user(u) for u in range(USERS)))
+    latencies.sort()
+    selects = standin_admin("stats")["calls"].get("select", 0) - before
+    print(f"{label:<8} /moods/today p50 {latencies[len(latencies) // 2] * 1000:6.2f}ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f}ms  {selects / len(latencies):.2f} db calls/check")
+
+async def main() -> bool:
+    def bench_user(x_user: str = Header(...)):
+        return x_user
+    app.dependency_overrides[get_current_user] = bench_user
+    print(f"{USERS} users x {TAPS} parallel taps, {DB_MS:.0f}ms database")
+    await hammer_before()
+    await checks("before", legacy_today)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        one_each = await hammer_after(client)
+        r = await client.get("/moods/today", headers={"X-User": "user-0", "X-Timezone": TZ})
+        assert r.json() is True
+
+    # Both sides timed below the HTTP layer, like the old query
+    tz = ZoneInfo(TZ)
+    await checks("after", lambda user_id: get_mood_index().logged_today(user_id, tz))
+    await config.close_async_supabase()
+    if not one_each:
+        print("FAIL: some user does not have exactly one mood for today")
+    return one_each
+
+if __name__ == "__main__":
+    standin = standins.start(standin_app, PORT)
+    try:
+        ok = asyncio.run(main())
+    finally:
+        standin.terminate()
+    sys.exit(0 if ok else 1)
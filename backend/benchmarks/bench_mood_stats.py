@@ -0,0 +1,64 @@
+"""
+Mood analytics over synthetic multi-year histories.
+
+Run from backend/:  python -m benchmarks.bench_mood_stats
+For 1, 3, 5 and 10 years of 1-3 entries per day (with skipped days),
+reports the median time of compute_stats over the raw mood_entries rows,
+then checks trend classification on series with a known shape.
+"""
+import os
+import time
+import random
+import statistics
+from datetime import date, timedelta
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:54321/functions/v1/embed")
+
+from services.mood_analytics import compute_stats
+
+YEARS = [1, 3, 5, 10]
+RUNS = 20
+END = date(2026, 1, 11)
+
+def make_history(days: int, rng: random.Random, shape=lambda i, n: 3.0, skip: float = 0.15) -> list:
+    rows = []
+    start = END - timedelta(days=days - 1)
+    for i in range(days):
+        if rng.random() < skip:
+            continue
+        day = (start + timedelta(days=i)).isoformat()
+        for _ in range(rng.randint(1, 3)):
+            score = min(5, max(1, round(shape(i, days) + rng.gauss(0, 0.5))))
+            rows.append({"created_at": f"{day}T{rng.randint(0, 23):02d}:00:00+00:00", "mood_score": score})
+    return rows
+
+def main():
+    rng = random.Random(13)
+    print(f"{'years':>5} {'entries':>8} {'median':>9} {'p95':>9}")
+    for years in YEARS:
+        moods = make_history(years * 365, rng)
+        timings = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            compute_stats(moods, today=END.isoformat())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"{years:>5} {len(moods):>8} {statistics.median(timings):>7.2f}ms {timings[int(RUNS * 0.95) - 1]:>7.2f}ms")
+
+    print("\ntrend classification (one week, 20 trials each):")
+    shapes = {
+        "Rising": lambda i, n: 2 + 2.5 * i / (n - 1),
+        "Falling": lambda i, n: 4.5 - 2.5 * i / (n - 1),
+        "Stable": lambda i, n: 3.0,
+        "Volatile": lambda i, n: 1.5 if i % 2 else 4.5,
+    }
+    for expected, shape in shapes.items():
+        got = [compute_stats(make_history(7, rng, shape, skip=0), today=END.isoformat())["trend"] for _ in range(20)]
+        print(f"  {expected:<9} {got.count(expected):>2}/20 correct")
+
+if __name__ == "__main__":
+    main()
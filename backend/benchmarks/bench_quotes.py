@@ -0,0 +1,125 @@
+"""
+/quotes/daily at UTC midnight, across several API workers.
+
+Run from backend/:  python -m benchmarks.bench_quotes
+QUOTE_BENCH_WORKERS workers (providers sharing one SQLite file) take
+QUOTE_BENCH_REQUESTS concurrent requests for a day that isn't cached yet.
+Before: the old handler - a per-process cache and a blocking requests.get
+with no timeout on a threadpool slot. After: cold (nothing stored, as on a
+first deploy) and prefetched (tomorrow's quote stored the day before, as
+run_prefetch leaves it). Each runs against an API Ninjas stand-in that
+answers after QUOTE_BENCH_UPSTREAM_MS, then one that hangs for
+QUOTE_BENCH_HANG_S. Reports request latency and upstream calls.
+"""
+import os
+import time
+import asyncio
+import tempfile
+from datetime import datetime
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:9/functions/v1/embed")
+
+import anyio
+import requests
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from services.quote_service import QuoteProvider
+
+WORKERS = int(os.getenv("QUOTE_BENCH_WORKERS", "4"))
+REQUESTS = int(os.getenv("QUOTE_BENCH_REQUESTS", "400"))
+UPSTREAM_MS = float(os.getenv("QUOTE_BENCH_UPSTREAM_MS", "800"))
+HANG_S = float(os.getenv("QUOTE_BENCH_HANG_S", "10"))
+
+calls = {"count": 0}
+
+async def upstream(request):
+    calls["count"] += 1
+    await asyncio.sleep(HANG_S if request.path_params["mode"] == "hang" else UPSTREAM_MS / 1000)
+    return JSONResponse([{"quote": "Well begun is half done.", "author": "Aristotle", "category": "wisdom"}])
+
+async def count(request):
+    n, calls["count"] = calls["count"], 0
+    return JSONResponse({"count": n})
+
+standin_app = Starlette(routes=[
+    Route("/{mode}/v2/quotes", upstream, methods=["GET"]),
+    Route("/count", count, methods=["GET"]),
+])
+
+def upstream_calls() -> int:
+    return requests.get(f"http://127.0.0.1:{PORT}/count").json()["count"]
+
+class LegacyWorker:
+    """The old routers/quotes.py handler, run the way FastAPI runs a sync route."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.date = None
+        self.data = None
+        self.threadpool = anyio.CapacityLimiter(40)
+
+    def _handler(self):
+        today = datetime.utcnow().date().isoformat()
+        if self.date == today and self.data:
+            return self.data
+        response = requests.get(self.url, headers={"X-Api-Key": "bench"})
+        raw = response.json()[0]
+        self.date, self.data = today, {"quote": raw["quote"], "author": raw["author"]}
+        return self.data
+
+    async def get_daily_quote(self):
+        return await anyio.to_thread.run_sync(self._handler, limiter=self.threadpool)
+
+async def stampede(workers: list) -> list:
+    async def one(i: int):
+        start = time.perf_counter()
+        quote = await workers[i % len(workers)].get_daily_quote()
+        assert quote["quote"]
+        return time.perf_counter() - start
+    return sorted(await asyncio.gather(*(one(i) for i in range(REQUESTS))))
+
+def report(label: str, latencies: list):
+    print(f"{label:<34} p50 {latencies[len(latencies) // 2] * 1000:8.1f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.1f}ms  "
+          f"max {latencies[-1] * 1000:8.1f}ms  {upstream_calls():3d} upstream calls")
+
+async def run(mode: str):
+    url = f"http://127.0.0.1:{PORT}/{mode}/v2/quotes"
+
+    legacy = [LegacyWorker(url) for _ in range(WORKERS)]
+    report(f"{mode}: before", await stampede(legacy))
+
+    for label in ("cold", "prefetched"):
+        db_path = os.path.join(tempfile.mkdtemp(), "quotes.db")
+        workers = [QuoteProvider(db_path, url, api_key="bench", timeout=config.QUOTES_TIMEOUT) for _ in range(WORKERS)]
+        if label == "prefetched":
+            # What yesterday's run_prefetch left behind
+            workers[0]._store(datetime.utcnow().date().isoformat(), {"quote": "Well begun is half done.", "author": "Aristotle"})
+        latencies = await stampede(workers)
+        # Let the background refresh finish before counting upstream calls
+        await asyncio.gather(*(t for w in workers for t in w._refreshing.values()), return_exceptions=True)
+        report(f"{mode}: after ({label})", latencies)
+        served = {(await w.get_daily_quote())["quote"] for w in workers}
+        print(f"{'':<34} after the refresh, workers serve {len(served)} distinct quote(s)")
+
+async def main():
+    print(f"{WORKERS} workers, {REQUESTS} concurrent requests, upstream {UPSTREAM_MS:.0f}ms / hang {HANG_S:.0f}s, "
+          f"timeout {config.QUOTES_TIMEOUT:.0f}s")
+    await run("slow")
+    await run("hang")
+
+if __name__ == "__main__":
+    standin = standins.start(standin_app, PORT)
+    try:
+        asyncio.run(main())
+    finally:
+        standin.terminate()
@@ -0,0 +1,133 @@
+"""
+Retrieval: match_journals RPC vs the local index (flat and IVF).
+
+Run from backend/:  python -m benchmarks.bench_retrieval
+Synthetic 384-d embeddings (gte-small's size) clustered around topics, so
+similarities look like real chunk-vs-draft scores. Queries are perturbed
+copies of stored chunks. Recall@k is measured against an exact float64
+search with the same threshold.
+
+The RPC runs against a local PostgREST stand-in doing an exact NumPy scan,
+so its latency is the HTTP + JSON floor of the remote path (a real
+pgvector scan only adds to it).
+"""
+import os
+import time
+import asyncio
+import tempfile
+
+import numpy as np
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", f"http://127.0.0.1:{PORT}/functions/v1/embed")
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from services.retrieval import RpcRetriever, UserIndex, write_index, normalize
+
+DIMENSIONS = 384
+TOPICS = 64
+SIZES = [1_000, 10_000, 50_000]
+QUERIES = 100
+THRESHOLD = 0.5
+K = 3
+
+def make_corpus(n: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    topics = normalize(rng.standard_normal((TOPICS, DIMENSIONS)))
+    assign = rng.integers(0, TOPICS, n)
+    return normalize(topics[assign] + 0.9 * normalize(rng.standard_normal((n, DIMENSIONS))))
+
+def make_queries(corpus: np.ndarray, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    picks = corpus[rng.integers(0, len(corpus), QUERIES)]
+    return normalize(picks + 0.6 * normalize(rng.standard_normal((QUERIES, DIMENSIONS))))
+
+def exact(corpus: np.ndarray, query: np.ndarray, threshold: float, k: int) -> list:
+    scores = corpus.astype(np.float64) @ query.astype(np.float64)
+    order = [i for i in np.argsort(-scores)[:k] if scores[i] >= threshold]
+    return [f"c{i}" for i in order]
+
+def rows_for(corpus: np.ndarray) -> list:
+    return [
+        {"id": f"c{i}", "journal_id": f"j{i // 8}", "content_chunk_encrypted": "x", "embedding": v.tolist()}
+        for i, v in enumerate(corpus)
+    ]
+
+CORPORA = {n: make_corpus(n, seed=n) for n in SIZES}
+
+async def match_journals(request):
+    body = await request.json()
+    corpus = CORPORA[int(body["requesting_user_id"])]
+    query = np.asarray(body["query_embedding"])
+    scores = corpus @ query
+    top = [i for i in np.argsort(-scores)[:body["match_count"]] if scores[i] >= body["match_threshold"]]
+    return JSONResponse([
+        {"id": f"c{i}", "journal_id": f"j{i // 8}", "content": "x", "similarity": float(scores[i])}
+        for i in top
+    ])
+
+standin_app = Starlette(routes=[Route("/rest/v1/rpc/match_journals", match_journals, methods=["POST"])])
+
+def summarize(label: str, n: int, latencies: list, recalls: list, build_s: float = None):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    build = f"{build_s:>7.2f}s" if build_s is not None else f"{'-':>8}"
+    print(f"{n:>7} {label:<16} {build} {p50:>8.2f}ms {p99:>8.2f}ms {np.mean(recalls):>9.3f}")
+
+async def main():
+    standins.start(standin_app, PORT)
+    rpc = RpcRetriever()
+    print(f"{'chunks':>7} {'backend':<16} {'build':>8} {'p50':>10} {'p99':>10} {'recall@3':>9}")
+
+    with tempfile.TemporaryDirectory() as root:
+        for n in SIZES:
+            corpus = CORPORA[n]
+            queries = make_queries(corpus, seed=n)
+            truth = [exact(corpus, q, THRESHOLD, K) for q in queries]
+
+            def recall(found: list, expected: list) -> float:
+                return len(set(found) & set(expected)) / len(expected) if expected else 1.0
+
+            # Remote RPC
+            await rpc.search(str(n), queries[0].tolist(), THRESHOLD, K)
+            latencies, recalls = [], []
+            for q, expected in zip(queries, truth):
+                start = time.perf_counter()
+                found = await rpc.search(str(n), q.tolist(), THRESHOLD, K)
+                latencies.append(time.perf_counter() - start)
+                recalls.append(recall([r["id"] for r in found], expected))
+            summarize("rpc (stand-in)", n, latencies, recalls)
+
+            # Local index, flat and IVF
+            rows = rows_for(corpus)
+            for label, ivf_min, nprobes in (("local flat", n + 1, [None]), ("local ivf", 0, [4, 8, 16])):
+                path = os.path.join(root, f"{n}-{label.replace(' ', '-')}")
+                start = time.perf_counter()
+                write_index(path, rows, built_at=time.time(), ivf_min=ivf_min)
+                index = UserIndex(path)
+                build_s = time.perf_counter() - start
+                for nprobe in nprobes:
+                    latencies, recalls = [], []
+                    for q, expected in zip(queries, truth):
+                        start = time.perf_counter()
+                        kwargs = {"nprobe": nprobe} if nprobe else {}
+                        found = index.search(normalize(q.astype(np.float32)), THRESHOLD, K, **kwargs)
+                        latencies.append(time.perf_counter() - start)
+                        recalls.append(recall([r["id"] for r in found], expected))
+                    summarize(f"{label}" + (f" p={nprobe}" if nprobe else ""), n, latencies, recalls, build_s)
+
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
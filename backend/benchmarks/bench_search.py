@@ -0,0 +1,147 @@
+"""
+Journal search latency for a user with thousands of entries.
+
+Run from backend/:  python -m benchmarks.bench_search
+Indexes a synthetic user (SEARCH_BENCH_JOURNALS entries, Zipf vocabulary)
+into a PostgREST stand-in, then times GET /journals/search end to end:
+keyword only, and hybrid with the local retrieval index (query embedding
+stubbed - the edge function's latency is not part of this). The stand-in
+answers after SEARCH_BENCH_DB_MS per call, like a nearby database.
+Also checks that an entry with a planted rare phrase ranks first.
+"""
+import os
+import re
+import time
+import random
+import string
+import asyncio
+import tempfile
+from urllib.parse import unquote
+
+import numpy as np
+
+from benchmarks import standins
+
+PORT = standins.free_port()
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", f"http://127.0.0.1:{PORT}/functions/v1/embed")
+os.environ["RETRIEVAL_BACKEND"] = "local"
+os.environ["RETRIEVAL_INDEX_DIR"] = tempfile.mkdtemp()
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from main import app
+from dependencies import get_current_user
+from services import ai_service, search_index
+from services.retrieval import get_retriever
+
+JOURNALS = int(os.getenv("SEARCH_BENCH_JOURNALS", "3000"))
+DB_MS = float(os.getenv("SEARCH_BENCH_DB_MS", "2"))
+QUERIES = 50
+USER = "bench-user"
+DIMENSIONS = 384
+
+rng = random.Random(18)
+vocab = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(4000)]
+weights = [1 / (rank + 1) for rank in range(len(vocab))]
+
+def journal_text(n_words: int) -> str:
+    return " ".join(rng.choices(vocab, weights=weights, k=n_words))
+
+JOURNAL_ROWS = [
+    {"id": f"{i:08d}", "mood_score": 3, "summary": journal_text(12), "tags": rng.choices(vocab[:200], k=3),
+     "created_at": "2026-01-05T10:00:00+00:00", "content": journal_text(rng.randint(80, 400))}
+    for i in range(JOURNALS)
+]
+NEEDLE_ID = JOURNAL_ROWS[JOURNALS // 2]["id"]
+JOURNAL_ROWS[JOURNALS // 2]["content"] += " marmalade lighthouse"
+
+# term -> [(journal_id, weight)] sorted by weight desc
+POSTINGS = {}
+
+async def journal_search_terms(request):
+    await asyncio.sleep(DB_MS / 1000)
+    term = request.query_params["term"].removeprefix("eq.")
+    limit = int(request.query_params.get("limit", "1000"))
+    return JSONResponse([{"journal_id": j, "weight": w} for j, w in POSTINGS.get(term, [])[:limit]])
+
+async def journals(request):
+    await asyncio.sleep(DB_MS / 1000)
+    ids = request.query_params.get("id")
+    if ids:
+        wanted = set(re.sub(r"^in\.\((.*)\)$", r"\1", unquote(ids)).replace('"', "").split(","))
+        return JSONResponse([{k: r[k] for k in ("id", "mood_score", "summary", "tags", "created_at")} for r in JOURNAL_ROWS if r["id"] in wanted])
+    # count="exact" head request
+    return JSONResponse([{"id": JOURNAL_ROWS[0]["id"]}], headers={"Content-Range": f"0-0/{JOURNALS}"})
+
+async def journal_vectors(request):
+    await asyncio.sleep(DB_MS / 1000)
+    offset = int(request.query_params.get("offset", "0"))
+    limit = int(request.query_params.get("limit", "1000"))
+    return JSONResponse(VECTOR_ROWS[offset:offset + limit])
+
+standin_app = Starlette(routes=[
+    Route("/rest/v1/journal_search_terms", journal_search_terms, methods=["GET"]),
+    Route("/rest/v1/journals", journals, methods=["GET"]),
+    Route("/rest/v1/journal_vectors", journal_vectors, methods=["GET"]),
+])
+
+def build_index():
+    start = time.perf_counter()
+    for row in JOURNAL_ROWS:
+        for term, w in search_index.term_weights(USER, row["content"], row["summary"], row["tags"]).items():
+            POSTINGS.setdefault(term, []).append((row["id"], w))
+    for plist in POSTINGS.values():
+        plist.sort(key=lambda p: -p[1])
+    elapsed = time.perf_counter() - start
+    print(f"indexed {JOURNALS} journals, {sum(map(len, POSTINGS.values()))} postings "
+          f"({elapsed / JOURNALS * 1000:.2f}ms per journal)")
+
+vectors = np.random.default_rng(18).standard_normal((JOURNALS * 3, DIMENSIONS)).astype(np.float32)
+VECTOR_ROWS = [
+    {"id": f"v{i}", "journal_id": JOURNAL_ROWS[i // 3]["id"], "content_chunk_encrypted": "x", "embedding": vectors[i].round(4).tolist()}
+    for i in range(len(vectors))
+]
+
+async def fake_embed(text: str):
+    # A vector near the needle entry's first chunk
+    return (vectors[(JOURNALS // 2) * 3] + 0.5 * np.random.default_rng(len(text)).standard_normal(DIMENSIONS)).tolist()
+
+async def run(client, label: str, params: dict):
+    latencies = []
+    for i in range(QUERIES):
+        q = " ".join(rng.choices(vocab[50:2000], k=rng.randint(1, 3)))
+        start = time.perf_counter()
+        r = await client.get("/journals/search", params={**params, "q": q})
+        latencies.append(time.perf_counter() - start)
+        assert r.status_code == 200, r.text
+    latencies.sort()
+    r = await client.get("/journals/search", params={**params, "q": "marmalade lighthouse"})
+    top = r.json()["items"][0]
+    print(f"{label:<24} p50 {latencies[len(latencies) // 2] * 1000:6.1f}ms  p99 {latencies[-1] * 1000:6.1f}ms  "
+          f"needle first: {top['id'] == NEEDLE_ID} {top['matched_by']}")
+
+async def main():
+    build_index()
+    standins.start(standin_app, PORT)
+    app.dependency_overrides[get_current_user] = lambda: USER
+    ai_service.embed_query = fake_embed
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run(client, "keyword only", {"semantic": "false"})
+        start = time.perf_counter()
+        await get_retriever().index_for(USER)
+        print(f"local vector index built in {time.perf_counter() - start:.2f}s ({len(VECTOR_ROWS)} chunks)")
+        await run(client, "hybrid (local vectors)", {})
+    await config.close_async_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+API cold start: import cost and time to the first served request.
+
+Run from backend/:  python -m benchmarks.bench_startup
+1. `python -X importtime -c "import main"` - total, and the slowest
+   top-level packages.
+2. STARTUP_BENCH_RUNS times: start uvicorn on main:app (PostgREST
+   stand-in answering after STARTUP_BENCH_DB_MS) and time until the
+   socket answers, until /health says ready, and the first authenticated
+   request (/moods/today, which goes to the database) after that.
+With STARTUP_BENCH_BUDGET_MS set, exits non-zero when importing main
+takes longer - cheap to run in CI to catch import-time regressions.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import subprocess
+import statistics
+
+import jwt
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks import standins
+
+RUNS = int(os.getenv("STARTUP_BENCH_RUNS", "5"))
+DB_MS = float(os.getenv("STARTUP_BENCH_DB_MS", "40"))
+BUDGET_MS = float(os.getenv("STARTUP_BENCH_BUDGET_MS", "0"))
+JWT_SECRET = "bench-secret-bench-secret-bench-secret"
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def rest_table(request):
+    await asyncio.sleep(DB_MS / 1000)
+    return JSONResponse([])
+
+standin_app = Starlette(routes=[Route("/rest/v1/{table}", rest_table, methods=["GET", "HEAD"])])
+
+def app_env(db_port: int) -> dict:
+    tmp = tempfile.mkdtemp()
+    return {
+        **os.environ,
+        "SUPABASE_URL": f"http://127.0.0.1:{db_port}",
+        "SUPABASE_SERVICE_ROLE_KEY": "bench",
+        "SUPABASE_JWT_SECRET": JWT_SECRET,
+        "GROQ_API_KEY": "bench",
+        "ENCRYPTION_KEY": "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=",
+        "EDGE_FUNCTION_URL": f"http://127.0.0.1:{db_port}/functions/v1/embed",
+        "JOB_DB_PATH": os.path.join(tmp, "jobs.db"),
+        "LLM_CACHE_DB_PATH": os.path.join(tmp, "llm_cache.db"),
+        "QUOTES_DB_PATH": os.path.join(tmp, "quotes.db"),
+        "API_NINJAS_KEY": "",
+    }
+
+def import_profile(env: dict) -> tuple:
+    """(total ms, [(ms, package)] slowest top-level imports)"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    packages = {}
+    total = 0.0
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nesting is two spaces per level after the bar: main, then what main imports
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name, ms = name.strip(), int(cumulative) / 1000
+        if depth == 0 and name == "main":
+            total = ms
+        elif depth == 1:
+            packages[name] = ms
+    return total, sorted(((ms, name) for name, ms in packages.items()), reverse=True)
+
+def cold_start(env: dict) -> tuple:
+    """(listening s, ready s, first request ms) for one uvicorn start."""
+    port = standins.free_port()
+    token = jwt.encode({"sub": "bench-user", "aud": "authenticated", "exp": int(time.time()) + 3600}, JWT_SECRET, algorithm="HS256")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    listening = ready = None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while ready is None:
+                try:
+                    status = client.get("/health").status_code
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                now = time.perf_counter() - start
+                listening = listening or now
+                if status == 200:
+                    ready = now
+                else:
+                    time.sleep(0.005)
+            first = time.perf_counter()
+            r = client.get("/moods/today", headers={"Authorization": f"Bearer {token}"})
+            assert r.status_code == 200, r.text
+            first_ms = (time.perf_counter() - first) * 1000
+    finally:
+        server.terminate()
+        server.wait()
+    return listening, ready, first_ms
+
+def main():
+    standin_port = standins.free_port()
+    standin = standins.start(standin_app, standin_port)
+    try:
+        env = app_env(standin_port)
+        total, packages = import_profile(env)
+        print(f"import main: {total:.0f}ms")
+        for ms, name in packages[:8]:
+            print(f"  {name:<28} {ms:7.1f}ms")
+
+        runs = [cold_start(env) for _ in range(RUNS)]
+        listening, ready, first = (statistics.median(values) for values in zip(*runs))
+        print(f"cold start (median of {RUNS}): socket answers {listening * 1000:.0f}ms, "
+              f"/health ready {ready * 1000:.0f}ms, first request {first:.1f}ms")
+    finally:
+        standin.terminate()
+
+    if BUDGET_MS and total > BUDGET_MS:
+        print(f"import main took {total:.0f}ms, over the {BUDGET_MS:.0f}ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+SqliteHub.run_relay survives errors instead of silently going quiet.
+
+Run from backend/:  python -m benchmarks.check_relay
+Starts the relay on a scratch events table with one subscriber, then
+makes one _read_after raise "database is locked" and writes a row whose
+data isn't JSON. Events published after each failure must still arrive;
+exits non-zero if any doesn't.
+"""
+import os
+import sys
+import time
+import sqlite3
+import asyncio
+import tempfile
+
+os.environ["JOB_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "jobs.db")
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("ENCRYPTION_KEY", "n1fX9Wq0p7Zq8m3u1v0qJ6mQyH1y2oXjvV2yQ9b9z7A=")
+os.environ.setdefault("EDGE_FUNCTION_URL", "http://127.0.0.1:9/functions/v1/embed")
+
+from services.event_hub import SqliteHub
+from services.job_queue import get_db
+
+USER = "check-user"
+TIMEOUT = 5.0
+
+class FlakyHub(SqliteHub):
+    """Fails the next read when armed."""
+    fail_next = False
+
+    def _read_after(self, last_id: int) -> list:
+        if self.fail_next:
+            self.fail_next = False
+            raise sqlite3.OperationalError("database is locked")
+        return super()._read_after(last_id)
+
+async def expect(queue: asyncio.Queue, n: int) -> bool:
+    try:
+        event = await asyncio.wait_for(queue.get(), TIMEOUT)
+    except asyncio.TimeoutError:
+        return False
+    return event["data"] == {"n": n}
+
+async def main() -> bool:
+    hub = FlakyHub(poll_interval=0.05)
+    queue = hub.subscribe(USER)
+    relay = asyncio.create_task(hub.run_relay())
+    # Let the relay pick its starting point before anything is published
+    await asyncio.sleep(0.2)
+    results = {}
+    try:
+        await hub.publish(USER, "check", {"n": 1})
+        results["before any failure"] = await expect(queue, 1)
+
+        hub.fail_next = True
+        await asyncio.sleep(0.2)
+        await hub.publish(USER, "check", {"n": 2})
+        results["after a failed read"] = await expect(queue, 2)
+
+        await asyncio.to_thread(lambda: get_db().execute(
+            "INSERT INTO events (user_id, event, data, created_at) VALUES (?, 'check', '{not json', ?)",
+            (USER, time.time())
+        ))
+        await hub.publish(USER, "check", {"n": 3})
+        results["after a malformed row"] = await expect(queue, 3)
+        results["relay still running"] = not relay.done()
+    finally:
+        relay.cancel()
+
+    for name, ok in results.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
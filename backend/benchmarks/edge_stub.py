@@ -0,0 +1,38 @@
+"""
+Local stand-in for the embedding Edge Function.
+
+    uvicorn benchmarks.edge_stub:app --port 54329
+
+Implements both contracts used by ai_service:
+  {"input": "text"}         -> {"vector": [...]}
+  {"inputs": ["a", "b"]}    -> {"vectors": [[...], [...]]}
+Vectors are deterministic (seeded by the text) and unit-length.
+Latency is EDGE_STUB_MS per request plus EDGE_STUB_ITEM_MS per input.
+"""
+import os
+import asyncio
+import hashlib
+import random
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DIMENSIONS = int(os.getenv("EDGE_STUB_DIMENSIONS", "384"))
+REQUEST_MS = float(os.getenv("EDGE_STUB_MS", "30"))
+ITEM_MS = float(os.getenv("EDGE_STUB_ITEM_MS", "1"))
+
+def fake_vector(text: str) -> list:
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    v = [rng.gauss(0, 1) for _ in range(DIMENSIONS)]
+    norm = sum(x * x for x in v) ** 0.5
+    return [x / norm for x in v]
+
+async def embed(request):
+    body = await request.json()
+    if "inputs" in body:
+        await asyncio.sleep((REQUEST_MS + ITEM_MS * len(body["inputs"])) / 1000)
+        return JSONResponse({"vectors": [fake_vector(t) for t in body["inputs"]]})
+    await asyncio.sleep((REQUEST_MS + ITEM_MS) / 1000)
+    return JSONResponse({"vector": fake_vector(body["input"])})
+
+app = Starlette(routes=[Route("/", embed, methods=["POST"]), Route("/functions/v1/embed", embed, methods=["POST"])])
@@ -0,0 +1,25 @@
+"""Helpers for running local stand-in services in a separate process."""
+import time
+import socket
+import multiprocessing
+import uvicorn
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _serve(app, port: int):
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096, timeout_keep_alive=60)
+
+def start(app, port: int) -> multiprocessing.Process:
+    # Separate process so the stand-in doesn't compete with the API for the GIL
+    proc = multiprocessing.Process(target=_serve, args=(app, port), daemon=True)
+    proc.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return proc
@@ -1,33 +1,265 @@
 import os
-from supabase import create_client, Client
-from groq import Groq
-from cryptography.fernet import Fernet
+import asyncio
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
+# The SDKs are slow to import (supabase alone pulls in storage3/pyiceberg),
+# so they're imported by the getters below, on first use
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client, AsyncClient
+    from groq import AsyncGroq
+    from cryptography.fernet import MultiFernet
+
 # Load .env file
 load_dotenv()
 
-# Environment Variables
+# Environment Variables - checked when a client first needs them (require_env),
+# so scripts that only touch part of the stack start without the rest
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
 EDGE_FUNCTION_URL = os.getenv("EDGE_FUNCTION_URL")
 
-if not all([SUPABASE_URL, SUPABASE_KEY, GROQ_API_KEY, ENCRYPTION_KEY, EDGE_FUNCTION_URL]):
-    raise ValueError("Missing environment variables! Check .env")
+def require_env(name: str) -> str:
+    value = os.getenv(name)
+    if not value:
+        raise ValueError(f"Missing environment variable {name}! Check .env")
+    return value
+
+# Auth (optional) - with a JWT secret set, tokens are verified locally (HS256).
+# Without it we fall back to the project's JWKS for asymmetric signing keys.
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+
+# /metrics - sent as "Authorization: Bearer <token>"; unset disables the endpoint
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Async data path - one pooled HTTP/2 connection per process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "100"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+
+# Journal list pagination
+JOURNALS_PAGE_SIZE = int(os.getenv("JOURNALS_PAGE_SIZE", "20"))
+JOURNALS_MAX_PAGE_SIZE = int(os.getenv("JOURNALS_MAX_PAGE_SIZE", "100"))
+
+# Server-sent events
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+# Background jobs (see worker.py)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "journaly_jobs.db")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+# "sqlite" relays events from the worker process, "memory" is single-process only
+EVENT_BROKER = os.getenv("EVENT_BROKER", "sqlite")
+EVENT_RETENTION_SECONDS = float(os.getenv("EVENT_RETENTION_SECONDS", "600"))
+
+# Embedding cache - set EMBEDDING_CACHE_DB_PATH to add the persistent tier
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "gte-small")
+EMBEDDING_CACHE_MB = int(os.getenv("EMBEDDING_CACHE_MB", "64"))
+EMBEDDING_CACHE_DB_PATH = os.getenv("EMBEDDING_CACHE_DB_PATH")
+EMBEDDING_CACHE_DB_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_DB_MAX_ROWS", "100000"))
+
+# Edge-function embeddings
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", "10"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "3"))
+# Batch mode needs an edge function that accepts {"inputs": [...]}
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "0"))
+
+# Chunking for embeddings (token estimates, see services/chunker.py)
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "48"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+
+# Re-summarize an edited journal only past this share of changed text
+SUMMARY_REFRESH_RATIO = float(os.getenv("SUMMARY_REFRESH_RATIO", "0.25"))
+
+# Go Deeper: identical drafts within this window reuse the last prompt
+DEEPEN_CACHE_TTL = float(os.getenv("DEEPEN_CACHE_TTL", "120"))
+
+# Retrieval for Go Deeper - "rpc" (match_journals in Postgres) or "local"
+# (per-user in-process index, memory-mapped from RETRIEVAL_INDEX_DIR)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "rpc")
+RETRIEVAL_THRESHOLD = float(os.getenv("RETRIEVAL_THRESHOLD", "0.5"))
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "3"))
+RETRIEVAL_INDEX_DIR = os.getenv("RETRIEVAL_INDEX_DIR", "journaly_index")
+RETRIEVAL_INDEX_TTL = float(os.getenv("RETRIEVAL_INDEX_TTL", "3600"))
+RETRIEVAL_INDEX_CACHE_USERS = int(os.getenv("RETRIEVAL_INDEX_CACHE_USERS", "256"))
+RETRIEVAL_IVF_MIN_VECTORS = int(os.getenv("RETRIEVAL_IVF_MIN_VECTORS", "20000"))
+RETRIEVAL_IVF_NPROBE = int(os.getenv("RETRIEVAL_IVF_NPROBE", "8"))
+
+# Journal search - terms are stored as HMACs (blind index). Pin
+# SEARCH_INDEX_KEY if ENCRYPTION_KEY may rotate; by default it's derived
+# from it, and a rotation means running reindex_search.py again.
+SEARCH_INDEX_KEY = os.getenv("SEARCH_INDEX_KEY")
+SEARCH_POSTINGS_PER_TERM = int(os.getenv("SEARCH_POSTINGS_PER_TERM", "1000"))
+SEARCH_VECTOR_THRESHOLD = float(os.getenv("SEARCH_VECTOR_THRESHOLD", "0.3"))
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "50"))
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
 
-# Initialize Clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-groq_client = Groq(api_key=GROQ_API_KEY)
-cipher_suite = Fernet(ENCRYPTION_KEY.encode())
+# Go Deeper query: "mean" (one search with the normalised mean of the
+# draft's chunks) or "maxsim" (one search per chunk, best score wins)
+DEEPEN_QUERY_MODE = os.getenv("DEEPEN_QUERY_MODE", "mean")
+
+# Weekly insight batch precompute (precompute_insights.py)
+PRECOMPUTE_CONCURRENCY = int(os.getenv("PRECOMPUTE_CONCURRENCY", "4"))
+PRECOMPUTE_LLM_RPM = float(os.getenv("PRECOMPUTE_LLM_RPM", "30"))
+
+# LLM gateway (services/llm_gateway.py) - every Groq call goes through it.
+# Per-model request/token budgets should match the Groq plan's RPM/TPM.
+LLM_MODEL_LARGE = os.getenv("LLM_MODEL_LARGE", "llama-3.3-70b-versatile")
+LLM_MODEL_SMALL = os.getenv("LLM_MODEL_SMALL", "llama-3.1-8b-instant")
+LLM_RPM_LARGE = float(os.getenv("LLM_RPM_LARGE", "30"))
+LLM_TPM_LARGE = float(os.getenv("LLM_TPM_LARGE", "12000"))
+LLM_RPM_SMALL = float(os.getenv("LLM_RPM_SMALL", "30"))
+LLM_TPM_SMALL = float(os.getenv("LLM_TPM_SMALL", "6000"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+# Consecutive failures that open a model's breaker, and how long it stays open
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+# Interactive calls go to the fallback model past this expected queue wait (seconds)
+LLM_ROUTE_MAX_WAIT = float(os.getenv("LLM_ROUTE_MAX_WAIT", "2"))
+# Response cache for deterministic calls (summaries, insights), encrypted
+# on disk. Prices are USD per million input,output tokens - for the
+# savings figure in /metrics only.
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "journaly_llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "50000"))
+LLM_PRICES = {
+    LLM_MODEL_LARGE: tuple(float(p) for p in os.getenv("LLM_PRICE_LARGE", "0.59,0.79").split(",")),
+    LLM_MODEL_SMALL: tuple(float(p) for p in os.getenv("LLM_PRICE_SMALL", "0.05,0.08").split(",")),
+}
+
+# Per-user "last mood logged" index (services/mood_index.py). An entry is
+# reloaded after MOOD_INDEX_TTL, so a mood logged through another worker shows up.
+MOOD_INDEX_USERS = int(os.getenv("MOOD_INDEX_USERS", "50000"))
+MOOD_INDEX_TTL = float(os.getenv("MOOD_INDEX_TTL", "300"))
+# How long the timezone of a user's first log keeps deciding their "today"
+MOOD_ZONE_TTL = float(os.getenv("MOOD_ZONE_TTL", "86400"))
+
+# Quote of the day (services/quote_service.py) - fetched in the background
+# and shared by every worker through QUOTES_DB_PATH; requests never wait on it.
+# Without API_NINJAS_KEY the local fallback pool is used.
+API_NINJAS_KEY = os.getenv("API_NINJAS_KEY")
+QUOTES_API_URL = os.getenv("QUOTES_API_URL", "https://api.api-ninjas.com/v2/quotes?category=inspirational%2Cwisdom")
+QUOTES_DB_PATH = os.getenv("QUOTES_DB_PATH", "journaly_quotes.db")
+QUOTES_TIMEOUT = float(os.getenv("QUOTES_TIMEOUT", "3"))
+# Prefetch loop interval, and the minimum gap between fetches of one day's quote (across workers)
+QUOTES_REFRESH_SECONDS = float(os.getenv("QUOTES_REFRESH_SECONDS", "600"))
+QUOTES_RETRY_SECONDS = float(os.getenv("QUOTES_RETRY_SECONDS", "60"))
+QUOTES_POOL_MAX = int(os.getenv("QUOTES_POOL_MAX", "365"))
+
+# Encryption keys - ENCRYPTION_KEY encrypts; older keys listed here (comma
+# separated) still decrypt until reencrypt.py has rotated every row
+ENCRYPTION_KEYS_PREVIOUS = [k.strip() for k in os.getenv("ENCRYPTION_KEYS_PREVIOUS", "").split(",") if k.strip()]
+CRYPTO_THREADS = int(os.getenv("CRYPTO_THREADS", "4"))
+CRYPTO_PARALLEL_MIN_ROWS = int(os.getenv("CRYPTO_PARALLEL_MIN_ROWS", "64"))
+# Stored format: 2 = compressed then encrypted ("v2:" envelope), 1 = plain
+# Fernet. Every release reads both; writers stay on 1 until every instance
+# runs a v2-reading release, then set ENCRYPTION_FORMAT=2 explicitly.
+ENCRYPTION_FORMAT = int(os.getenv("ENCRYPTION_FORMAT", "1"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+REENCRYPT_BATCH_SIZE = int(os.getenv("REENCRYPT_BATCH_SIZE", "200"))
+REENCRYPT_PAUSE_SECONDS = float(os.getenv("REENCRYPT_PAUSE_SECONDS", "0.5"))
+
+# Clients - built on first use, one per process
+_supabase: "Client" = None
+_async_groq: "AsyncGroq" = None
+_cipher: "MultiFernet" = None
+_clients_lock = threading.Lock()
 
 # Dependency Getters
-def get_supabase() -> Client:
-    return supabase
+def get_supabase() -> "Client":
+    global _supabase
+    if _supabase is None:
+        with _clients_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(require_env("SUPABASE_URL"), require_env("SUPABASE_SERVICE_ROLE_KEY"))
+    return _supabase
+
+def get_async_groq() -> "AsyncGroq":
+    """Used by services/llm_gateway.py for every completion."""
+    global _async_groq
+    if _async_groq is None:
+        with _clients_lock:
+            if _async_groq is None:
+                from groq import AsyncGroq
+                _async_groq = AsyncGroq(api_key=require_env("GROQ_API_KEY"))
+    return _async_groq
+
+def get_cipher() -> "MultiFernet":
+    global _cipher
+    if _cipher is None:
+        with _clients_lock:
+            if _cipher is None:
+                from cryptography.fernet import Fernet, MultiFernet
+                keys = [require_env("ENCRYPTION_KEY"), *ENCRYPTION_KEYS_PREVIOUS]
+                _cipher = MultiFernet([Fernet(k.encode()) for k in keys])
+    return _cipher
+
+def warm_clients():
+    """
+    Imports the SDKs and builds the clients the API uses, so the first
+    request doesn't pay for it. Blocking - run it in a thread.
+    """
+    import supabase  # noqa: F401 - the import is the slow part; get_async_supabase reuses it
+    get_cipher()
+    get_async_groq()
+
+_async_supabase: "AsyncClient" = None
+_http_client: "httpx.AsyncClient" = None
+_async_lock = asyncio.Lock()
+
+async def get_async_supabase() -> "AsyncClient":
+    """
+    Returns the process-wide async Supabase client.
+    Every PostgREST call shares a single pooled HTTP/2 httpx client.
+    """
+    global _async_supabase, _http_client
+    if _async_supabase is not None:
+        return _async_supabase
+
+    async with _async_lock:
+        if _async_supabase is None:
+            import httpx
+            from supabase import acreate_client, AsyncClientOptions
+            _http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=DB_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=DB_POOL_SIZE,
+                    max_keepalive_connections=DB_POOL_SIZE
+                )
+            )
+            _async_supabase = await acreate_client(
+                require_env("SUPABASE_URL"),
+                require_env("SUPABASE_SERVICE_ROLE_KEY"),
+                options=AsyncClientOptions(httpx_client=_http_client)
+            )
+    return _async_supabase
+
+async def get_http_client() -> "httpx.AsyncClient":
+    """The same pooled HTTP/2 client, for other Supabase calls (e.g. Edge Functions)."""
+    await get_async_supabase()
+    return _http_client
 
-def get_groq() -> Groq:
-    return groq_client
+async def close_async_supabase():
+    global _async_supabase, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _async_supabase = None
+    _http_client = None
 
-def get_cipher() -> Fernet:
-    return cipher_suite
\ No newline at end of file
@@ -1,20 +1,44 @@
+import hmac
+from typing import Optional
+from datetime import timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from fastapi import Header, HTTPException
-from config import get_supabase
+from config import METRICS_TOKEN
+from services import auth_service
 
 async def get_current_user(authorization: str = Header(...)):
     """
-    Validates the Supabase JWT sent by the frontend 
+    Validates the Supabase JWT sent by the frontend
     and returns the user_id.
     """
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid auth header")
-    
+
     token = authorization.split(" ")[1]
-    supabase = get_supabase()
-    
-    user_response = supabase.auth.get_user(token)
-    
-    if not user_response.user:
+
+    try:
+        return await auth_service.verify_token_async(token)
+    except auth_service.AuthError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-        
-    return user_response.user.id
\ No newline at end of file
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """
+    Guards internal endpoints (cache and traffic stats) with METRICS_TOKEN.
+    Without a token configured they don't exist.
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+def get_user_timezone(x_timezone: Optional[str] = Header(None)) -> tzinfo:
+    """
+    The browser's IANA timezone (X-Timezone header) for day boundaries.
+    Falls back to UTC when missing or unknown.
+    """
+    if x_timezone:
+        try:
+            return ZoneInfo(x_timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.utc
@@ -1,8 +1,66 @@
-from fastapi import FastAPI
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from routers import profiles, journals, moods, quotes, insights
+from config import get_async_supabase, close_async_supabase, warm_clients
+from routers import profiles, journals, moods, quotes, insights, dashboard
+from services.event_hub import get_hub
+from services.embedding_cache import get_embedding_cache
+from services.retrieval import get_retriever
+from services.llm_cache import get_llm_cache
+from services.quote_service import get_quote_provider
+from services.mood_index import get_mood_index
+from services import ai_service, llm_gateway
+from dependencies import require_metrics_token
 
-app = FastAPI(title="Journaly API")
+async def warm_up(app: FastAPI):
+    """
+    Readiness phase: import the SDKs, build the clients and open the
+    Supabase connection, then let /health report ready. Retried with
+    backoff - a worker that can't reach Supabase stays not-ready.
+    """
+    started = time.perf_counter()
+    delay = 1.0
+    while True:
+        try:
+            # Imports and client setup are CPU-bound - keep them off the event loop
+            await asyncio.to_thread(warm_clients)
+            db = await get_async_supabase()
+            # One round trip opens the pooled HTTP/2 connection
+            await db.table("profiles").select("id").limit(1).execute()
+            break
+        except Exception as e:
+            app.state.startup_error = repr(e)
+            print(f"⚠️ [Startup] Warm-up failed, retrying in {delay:.0f}s: {e!r}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+    app.state.startup_error = None
+    app.state.ready = True
+    print(f"[Startup] Ready in {time.perf_counter() - started:.2f}s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve /health right away; it reports ready once warm_up has finished
+    app.state.ready = False
+    app.state.startup_error = None
+    warming = asyncio.create_task(warm_up(app))
+
+    # Forward events published by worker.py to this process's SSE clients
+    hub = get_hub()
+    relay = asyncio.create_task(hub.run_relay()) if hasattr(hub, "run_relay") else None
+    # Keep today's and tomorrow's quote in the shared cache
+    prefetch = asyncio.create_task(get_quote_provider().run_prefetch())
+
+    yield
+
+    warming.cancel()
+    if relay:
+        relay.cancel()
+    prefetch.cancel()
+    await close_async_supabase()
+
+app = FastAPI(title="Journaly API", lifespan=lifespan)
 
 # CORS - Update allow_origins with your frontend URL (e.g. EC2 IP or Netlify URL)
 origins = [
@@ -23,11 +81,28 @@ app.include_router(journals.router)
 app.include_router(moods.router)
 app.include_router(quotes.router)
 app.include_router(insights.router)
+app.include_router(dashboard.router)
 
 @app.get("/health")
-def health_check():
+def health_check(response: Response):
+    if not app.state.ready:
+        response.status_code = 503
+        return {"status": "starting", "error": app.state.startup_error}
     return {"status": "ok"}
 
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def metrics():
+    return {
+        "embedding_cache": get_embedding_cache().stats(),
+        "deepen_cache": journals.deepen_cache.stats(),
+        "retrieval": get_retriever().stats(),
+        "deepen_vectors": ai_service.deepen_counters,
+        "llm": llm_gateway.stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "quotes": get_quote_provider().stats(),
+        "mood_index": get_mood_index().stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     # Run on 0.0.0.0 to expose it to the outside world (EC2)
@@ -0,0 +1,77 @@
+"""
+Precomputes last week's insight for every active user. Run it on a
+schedule shortly after the week closes (e.g. Monday 01:00 UTC):
+
+    python precompute_insights.py [--offset 0] [--concurrency 4] [--rpm 30]
+
+Progress is checkpointed per (week, user) in the job queue's SQLite file,
+so an interrupted run picks up where it stopped. Users who already have
+an insight, or didn't log enough that week, are skipped; failed users
+are retried on the next run.
+"""
+import argparse
+import asyncio
+from config import PRECOMPUTE_CONCURRENCY, PRECOMPUTE_LLM_RPM, close_async_supabase
+from repositories import insights as insights_repo
+from repositories import journals as journals_repo
+from repositories import moods as moods_repo
+from services import ai_service, job_queue
+from services.insight_service import week_range, load_week, has_enough_data, save_weekly
+from services.rate_limit import AsyncTokenBucket
+
+FINISHED = ("done", "skipped_existing", "skipped_empty")
+
+async def precompute_user(user_id: str, start_iso: str, end_iso: str, run: str, slots, llm_bucket) -> str:
+    async with slots:
+        try:
+            if await insights_repo.find(user_id, "weekly_summary", start_iso):
+                status = "skipped_existing"
+            else:
+                moods, journals = await load_week(user_id, start_iso, end_iso)
+                if not has_enough_data(moods, journals):
+                    status = "skipped_empty"
+                else:
+                    await llm_bucket.acquire()
+                    # The raising variant: a failed call is retried next run, not saved as a fallback
+                    payload = await ai_service.request_weekly_insight(moods, journals, start_iso, end_iso, task="weekly_batch")
+                    await save_weekly(user_id, start_iso, end_iso, payload)
+                    status = "done"
+        except Exception as e:
+            print(f"❌ [Precompute] {user_id}: {e}")
+            status = "failed"
+
+        await asyncio.to_thread(job_queue.mark_checkpoint, run, user_id, status)
+        return status
+
+async def main(offset: int, concurrency: int, rpm: float):
+    start_iso, end_iso = week_range(offset)
+    run = f"weekly_summary:{start_iso}"
+
+    mood_users, journal_users = await asyncio.gather(
+        moods_repo.active_user_ids(start_iso, end_iso),
+        journals_repo.active_user_ids(start_iso, end_iso)
+    )
+    finished = await asyncio.to_thread(job_queue.finished_items, run, FINISHED)
+    pending = sorted((mood_users | journal_users) - finished)
+    print(f"[Precompute] week {start_iso}: {len(pending)} users to process ({len(finished)} already finished)")
+
+    slots = asyncio.Semaphore(concurrency)
+    llm_bucket = AsyncTokenBucket(rate=rpm / 60, capacity=max(1, concurrency))
+
+    try:
+        await asyncio.gather(*(
+            precompute_user(user_id, start_iso, end_iso, run, slots, llm_bucket)
+            for user_id in pending
+        ))
+    finally:
+        await close_async_supabase()
+
+    print(f"[Precompute] week {start_iso}: {job_queue.checkpoint_summary(run)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offset", type=int, default=0, help="0 = last completed week")
+    parser.add_argument("--concurrency", type=int, default=PRECOMPUTE_CONCURRENCY)
+    parser.add_argument("--rpm", type=float, default=PRECOMPUTE_LLM_RPM, help="LLM requests per minute")
+    args = parser.parse_args()
+    asyncio.run(main(args.offset, args.concurrency, args.rpm))
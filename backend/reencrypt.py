@@ -0,0 +1,104 @@
+"""
+Re-encrypts stored journal text under the current ENCRYPTION_KEY and
+ENCRYPTION_FORMAT while the app keeps running. To rotate:
+
+  1. Set the new key as ENCRYPTION_KEY and move the old one to
+     ENCRYPTION_KEYS_PREVIOUS; deploy. Old rows stay readable.
+  2. python reencrypt.py [--table all] [--batch-size 200] [--pause 0.5]
+  3. Once a --restart pass reports nothing rotated, unreadable or failed,
+     drop the old key from ENCRYPTION_KEYS_PREVIOUS.
+
+Each table is walked in id order in throttled batches, with the cursor
+checkpointed per (key, format, table) in the job queue's SQLite file, so
+an interrupted run resumes where it stopped. Rows already on the current
+key and format are left alone, and every write is a compare-and-set on
+the old ciphertext, so an edit made during the run is never overwritten.
+A row whose write fails is recorded as "failed" in the checkpoints and
+skipped; the next --restart pass picks it up again.
+
+The same job migrates legacy rows to the compressed v2 envelope: once
+every instance runs a release that reads v2, set ENCRYPTION_FORMAT=2
+(the default is still 1) and run it. Bytes before/after are reported per table.
+
+Note that the embedding cache is keyed with ENCRYPTION_KEY too; it simply
+starts cold after a rotation.
+"""
+import time
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from config import require_env, ENCRYPTION_FORMAT, REENCRYPT_BATCH_SIZE, REENCRYPT_PAUSE_SECONDS, close_async_supabase
+from repositories import journals as journals_repo
+from services import crypto_service, job_queue
+
+TABLES = list(journals_repo.ENCRYPTED_COLUMNS)
+
+async def swap(table: str, row_id: str, old: str, new: str) -> tuple:
+    """(row_id, replace_ciphertext result or the error) - one bad row mustn't sink its batch."""
+    try:
+        return row_id, await journals_repo.replace_ciphertext(table, row_id, old, new)
+    except Exception as e:
+        print(f"⚠️ [Reencrypt] {table} {row_id}: {e!r}")
+        return row_id, e
+
+async def rotate_table(table: str, batch_size: int, pause: float, restart: bool) -> Counter:
+    column = journals_repo.ENCRYPTED_COLUMNS[table]
+    key_id = hashlib.sha256(require_env("ENCRYPTION_KEY").encode()).hexdigest()[:12]
+    run = f"reencrypt:{key_id}:v{ENCRYPTION_FORMAT}:{table}"
+    cursor = None if restart else await asyncio.to_thread(job_queue.get_checkpoint, run, "cursor")
+    totals = Counter()
+    scanned = 0
+    started = time.perf_counter()
+
+    while True:
+        rows = await journals_repo.list_encrypted_page(table, cursor, batch_size)
+        if not rows:
+            break
+
+        results = await asyncio.to_thread(crypto_service.rotate_many, [r[column] for r in rows])
+        writes = []
+        for row, result in zip(rows, results):
+            if result is None:
+                totals["current"] += 1
+            elif isinstance(result, Exception):
+                totals["unreadable"] += 1
+                await asyncio.to_thread(job_queue.mark_checkpoint, run, row["id"], "unreadable")
+            else:
+                totals["bytes_before"] += len(row[column])
+                totals["bytes_after"] += len(result)
+                writes.append(swap(table, row["id"], row[column], result))
+        for row_id, swapped in await asyncio.gather(*writes):
+            if isinstance(swapped, Exception):
+                totals["failed"] += 1
+                await asyncio.to_thread(job_queue.mark_checkpoint, run, row_id, "failed")
+            else:
+                totals["rotated" if swapped else "edited_during_run"] += 1
+
+        cursor = rows[-1]["id"]
+        await asyncio.to_thread(job_queue.mark_checkpoint, run, "cursor", cursor)
+        scanned += len(rows)
+        print(f"[Reencrypt] {table}: {scanned} rows ({scanned / (time.perf_counter() - started):.0f} rows/s) {dict(totals)}")
+
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    return totals
+
+async def main(tables: list, batch_size: int, pause: float, restart: bool):
+    try:
+        for table in tables:
+            totals = await rotate_table(table, batch_size, pause, restart)
+            print(f"✅ [Reencrypt] {table} done: {dict(totals) or 'nothing to scan'}")
+    finally:
+        await close_async_supabase()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", choices=TABLES + ["all"], default="all")
+    parser.add_argument("--batch-size", type=int, default=REENCRYPT_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=REENCRYPT_PAUSE_SECONDS, help="Seconds between batches")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved cursor and scan from the start")
+    args = parser.parse_args()
+    asyncio.run(main(TABLES if args.table == "all" else [args.table], args.batch_size, args.pause, args.restart))
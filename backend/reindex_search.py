@@ -0,0 +1,57 @@
+"""
+Builds the journal search index for existing entries (new and edited
+journals are indexed by the worker as they are processed):
+
+    python reindex_search.py [--batch-size 200] [--pause 0.5] [--restart]
+
+Run it once after creating journal_search_terms, and again if the search
+key changes (SEARCH_INDEX_KEY, or ENCRYPTION_KEY when it isn't pinned).
+Journals are walked in id order with the cursor checkpointed in the job
+queue's SQLite file; only changed terms are written, so reruns are cheap.
+"""
+import time
+import asyncio
+import argparse
+from config import REENCRYPT_BATCH_SIZE, REENCRYPT_PAUSE_SECONDS, close_async_supabase
+from repositories import journals as journals_repo
+from services import crypto_service, job_queue, search_index
+
+RUN = "reindex_search"
+
+async def main(batch_size: int, pause: float, restart: bool):
+    cursor = None if restart else await asyncio.to_thread(job_queue.get_checkpoint, RUN, "cursor")
+    scanned = written = removed = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            rows = await journals_repo.list_for_reindex(cursor, batch_size)
+            if not rows:
+                break
+            contents = await asyncio.to_thread(crypto_service.decrypt_many, [r["content_encrypted"] for r in rows])
+            results = await asyncio.gather(*(
+                search_index.index_journal(r["id"], r["user_id"], content, r.get("summary"), r.get("tags"))
+                for r, content in zip(rows, contents)
+                if content != crypto_service.DECRYPTION_ERROR
+            ))
+            scanned += len(rows)
+            written += sum(w for w, _ in results)
+            removed += sum(r for _, r in results)
+
+            cursor = rows[-1]["id"]
+            await asyncio.to_thread(job_queue.mark_checkpoint, RUN, "cursor", cursor)
+            print(f"[Reindex] {scanned} journals ({scanned / (time.perf_counter() - started):.0f}/s), "
+                  f"{written} terms written, {removed} removed")
+            if len(rows) < batch_size:
+                break
+            await asyncio.sleep(pause)
+    finally:
+        await close_async_supabase()
+    print(f"✅ [Reindex] done: {scanned} journals")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=REENCRYPT_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=REENCRYPT_PAUSE_SECONDS, help="Seconds between batches")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved cursor and scan from the start")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.pause, args.restart))
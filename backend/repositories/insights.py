@@ -0,0 +1,53 @@
+from config import get_async_supabase
+
+async def find(user_id: str, insight_type: str, valid_from: str):
+    db = await get_async_supabase()
+    res = await db.table("user_insights").select("*")\
+        .eq("user_id", user_id)\
+        .eq("insight_type", insight_type)\
+        .eq("valid_from", valid_from)\
+        .execute()
+    return res.data[0] if res.data else None
+
+async def list_range(user_id: str, insight_types: list, start_iso: str, end_iso: str) -> list:
+    """Rows of the given types whose period starts within [start_iso, end_iso]."""
+    db = await get_async_supabase()
+    res = await db.table("user_insights").select("id, insight_type, valid_from, valid_until, payload")\
+        .eq("user_id", user_id)\
+        .in_("insight_type", insight_types)\
+        .gte("valid_from", start_iso)\
+        .lte("valid_from", end_iso)\
+        .execute()
+    return res.data
+
+async def insert(data: dict) -> dict:
+    db = await get_async_supabase()
+    res = await db.table("user_insights").insert(data).execute()
+    return res.data[0]
+
+
+async def insert_if_absent(data: dict) -> dict:
+    """
+    Inserts unless a row for (user_id, insight_type, valid_from) already
+    exists, in which case the existing row is returned. Relies on:
+        CREATE UNIQUE INDEX user_insights_unique
+            ON user_insights (user_id, insight_type, valid_from);
+    """
+    db = await get_async_supabase()
+    res = await db.table("user_insights").upsert(
+        data,
+        on_conflict="user_id,insight_type,valid_from",
+        ignore_duplicates=True
+    ).execute()
+    if res.data:
+        return res.data[0]
+    return await find(data["user_id"], data["insight_type"], data["valid_from"])
+
+async def upsert(data: dict) -> dict:
+    """Inserts or replaces the row for (user_id, insight_type, valid_from)."""
+    db = await get_async_supabase()
+    res = await db.table("user_insights").upsert(
+        data,
+        on_conflict="user_id,insight_type,valid_from"
+    ).execute()
+    return res.data[0]
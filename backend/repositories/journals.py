@@ -0,0 +1,194 @@
+from config import get_async_supabase
+
+# Columns the list view needs - never the ciphertext
+LIST_COLUMNS = "id, mood_score, summary, tags, created_at"
+
+async def list_page(user_id: str, limit: int, after: tuple = None) -> list:
+    """
+    One page of a user's journals, newest first.
+    `after` is the (created_at, id) keyset of the last row already seen,
+    so each page is an index range scan no matter how deep the history goes.
+    It must be a (datetime, UUID) pair: the filter is rebuilt from those,
+    never from the raw cursor text.
+    """
+    db = await get_async_supabase()
+    query = db.table("journals").select(LIST_COLUMNS).eq("user_id", user_id)
+
+    if after:
+        created_at, last_id = after[0].isoformat(), str(after[1])
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt.{last_id})'
+        )
+
+    res = await query\
+        .order("created_at", desc=True)\
+        .order("id", desc=True)\
+        .limit(limit)\
+        .execute()
+    return res.data
+
+async def list_between(user_id: str, start_iso: str, end_iso: str) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journals").select("*")\
+        .eq("user_id", user_id)\
+        .gte("created_at", start_iso)\
+        .lte("created_at", end_iso)\
+        .execute()
+    return res.data
+
+async def get(journal_id: str, user_id: str):
+    db = await get_async_supabase()
+    res = await db.table("journals").select("*")\
+        .eq("id", journal_id)\
+        .eq("user_id", user_id)\
+        .limit(1)\
+        .execute()
+    return res.data[0] if res.data else None
+
+async def list_by_ids(user_id: str, ids: list) -> list:
+    """List-view rows for the given ids (unordered)."""
+    db = await get_async_supabase()
+    res = await db.table("journals").select(LIST_COLUMNS)\
+        .eq("user_id", user_id)\
+        .in_("id", ids)\
+        .execute()
+    return res.data
+
+async def count(user_id: str) -> int:
+    db = await get_async_supabase()
+    res = await db.table("journals").select("id", count="exact")\
+        .eq("user_id", user_id)\
+        .limit(1)\
+        .execute()
+    return res.count or 0
+
+async def insert(data: dict) -> dict:
+    db = await get_async_supabase()
+    res = await db.table("journals").insert(data).execute()
+    return res.data[0]
+
+async def update(journal_id: str, data: dict, user_id: str = None) -> list:
+    db = await get_async_supabase()
+    query = db.table("journals").update(data).eq("id", journal_id)
+    if user_id:
+        query = query.eq("user_id", user_id)
+    res = await query.execute()
+    return res.data
+
+async def delete(journal_id: str, user_id: str) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journals").delete()\
+        .eq("id", journal_id)\
+        .eq("user_id", user_id)\
+        .execute()
+    return res.data
+
+# --- journal_vectors ---
+async def insert_vectors(rows: list) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journal_vectors").insert(rows).execute()
+    return res.data
+
+async def list_vectors(journal_id: str, with_embeddings: bool = False, user_id: str = None) -> list:
+    db = await get_async_supabase()
+    query = db.table("journal_vectors")\
+        .select("id, content_chunk_encrypted, embedding" if with_embeddings else "id, content_chunk_encrypted")\
+        .eq("journal_id", journal_id)
+    if user_id:
+        query = query.eq("user_id", user_id)
+    res = await query.execute()
+    return res.data
+
+async def delete_vectors_by_ids(ids: list) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journal_vectors").delete().in_("id", ids).execute()
+    return res.data
+
+async def delete_vectors(journal_id: str) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journal_vectors").delete().eq("journal_id", journal_id).execute()
+    return res.data
+
+async def list_user_vectors(user_id: str, page_size: int = 1000) -> list:
+    """All of a user's chunks with embeddings, for building a local index."""
+    db = await get_async_supabase()
+    rows = []
+    while True:
+        res = await db.table("journal_vectors")\
+            .select("id, journal_id, content_chunk_encrypted, embedding")\
+            .eq("user_id", user_id)\
+            .order("id")\
+            .range(len(rows), len(rows) + page_size - 1)\
+            .execute()
+        rows += res.data
+        if len(res.data) < page_size:
+            return rows
+
+async def match(query_embedding: list, user_id: str, threshold: float, count: int) -> list:
+    db = await get_async_supabase()
+    res = await db.rpc("match_journals", {
+        "query_embedding": query_embedding,
+        "match_threshold": threshold,
+        "match_count": count,
+        "requesting_user_id": user_id
+    }).execute()
+    return res.data
+
+
+async def active_user_ids(start_iso: str, end_iso: str, page_size: int = 1000) -> set:
+    """Distinct users with at least one journals row in the range."""
+    db = await get_async_supabase()
+    user_ids, offset = set(), 0
+    # `id` breaks created_at ties, so pages don't overlap or skip rows
+    while True:
+        res = await db.table("journals").select("user_id")\
+            .gte("created_at", start_iso)\
+            .lte("created_at", end_iso)\
+            .order("created_at")\
+            .order("id")\
+            .range(offset, offset + page_size - 1)\
+            .execute()
+        user_ids.update(row["user_id"] for row in res.data)
+        if len(res.data) < page_size:
+            return user_ids
+        offset += page_size
+
+# --- Key rotation (reencrypt.py) ---
+ENCRYPTED_COLUMNS = {"journals": "content_encrypted", "journal_vectors": "content_chunk_encrypted"}
+
+async def list_encrypted_page(table: str, after_id: str = None, limit: int = 200) -> list:
+    """{id, <ciphertext column>} rows in id order, across all users."""
+    column = ENCRYPTED_COLUMNS[table]
+    db = await get_async_supabase()
+    query = db.table(table).select(f"id, {column}")
+    if after_id:
+        query = query.gt("id", after_id)
+    res = await query.order("id").limit(limit).execute()
+    return res.data
+
+# Leading characters of a token that identify it: past the Fernet IV (bytes
+# 9-25), which is random per encryption, so an edit or a rotation never
+# shares them. Comparing the whole token would put it in the URL.
+CIPHERTEXT_MATCH_CHARS = 48
+
+async def replace_ciphertext(table: str, row_id: str, old: str, new: str) -> bool:
+    """Swaps the ciphertext only if the row still holds `old`, so a concurrent edit always wins."""
+    column = ENCRYPTED_COLUMNS[table]
+    # "_" is a LIKE wildcard and part of the base64url alphabet
+    prefix = old[:CIPHERTEXT_MATCH_CHARS].replace("_", "\\_")
+    db = await get_async_supabase()
+    res = await db.table(table).update({column: new})\
+        .eq("id", row_id)\
+        .like(column, f"{prefix}*")\
+        .execute()
+    return bool(res.data)
+
+async def list_for_reindex(after_id: str = None, limit: int = 200) -> list:
+    """Journals in id order across all users, with what the search index needs."""
+    db = await get_async_supabase()
+    query = db.table("journals").select("id, user_id, content_encrypted, summary, tags")
+    if after_id:
+        query = query.gt("id", after_id)
+    res = await query.order("id").limit(limit).execute()
+    return res.data
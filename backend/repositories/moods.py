@@ -0,0 +1,66 @@
+from config import get_async_supabase
+
+async def latest(user_id: str):
+    """The user's most recent {created_at}, or None."""
+    db = await get_async_supabase()
+    res = await db.table("mood_entries")\
+        .select("created_at")\
+        .eq("user_id", user_id)\
+        .order("created_at", desc=True)\
+        .limit(1)\
+        .execute()
+    return res.data[0] if res.data else None
+
+async def list_between(user_id: str, start_iso: str, end_iso: str, columns: str = "*") -> list:
+    db = await get_async_supabase()
+    res = await db.table("mood_entries")\
+        .select(columns)\
+        .eq("user_id", user_id)\
+        .gte("created_at", start_iso)\
+        .lte("created_at", end_iso)\
+        .order("created_at", desc=False)\
+        .execute()
+    return res.data
+
+async def list_scores(user_id: str, since_iso: str, before_iso: str = None, page_size: int = 1000) -> list:
+    """Just {created_at, mood_score} from a date (and before another), oldest first, paged past PostgREST's row cap."""
+    db = await get_async_supabase()
+    rows = []
+    while True:
+        query = db.table("mood_entries")\
+            .select("created_at, mood_score")\
+            .eq("user_id", user_id)\
+            .gte("created_at", since_iso)
+        if before_iso:
+            query = query.lt("created_at", before_iso)
+        res = await query\
+            .order("created_at", desc=False)\
+            .range(len(rows), len(rows) + page_size - 1)\
+            .execute()
+        rows += res.data
+        if len(res.data) < page_size:
+            return rows
+
+async def insert(data: dict):
+    db = await get_async_supabase()
+    res = await db.table("mood_entries").insert(data).execute()
+    return res.data[0] if res.data else None
+
+
+async def active_user_ids(start_iso: str, end_iso: str, page_size: int = 1000) -> set:
+    """Distinct users with at least one mood_entries row in the range."""
+    db = await get_async_supabase()
+    user_ids, offset = set(), 0
+    # `id` breaks created_at ties, so pages don't overlap or skip rows
+    while True:
+        res = await db.table("mood_entries").select("user_id")\
+            .gte("created_at", start_iso)\
+            .lte("created_at", end_iso)\
+            .order("created_at")\
+            .order("id")\
+            .range(offset, offset + page_size - 1)\
+            .execute()
+        user_ids.update(row["user_id"] for row in res.data)
+        if len(res.data) < page_size:
+            return user_ids
+        offset += page_size
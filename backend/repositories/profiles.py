@@ -0,0 +1,6 @@
+from config import get_async_supabase
+
+async def get(user_id: str):
+    db = await get_async_supabase()
+    res = await db.table("profiles").select("*").eq("id", user_id).limit(1).execute()
+    return res.data[0] if res.data else None
@@ -0,0 +1,51 @@
+from config import get_async_supabase
+
+# Blind inverted index for journal search. Terms are HMACs, never words:
+#   CREATE TABLE journal_search_terms (
+#       journal_id uuid NOT NULL REFERENCES journals(id) ON DELETE CASCADE,
+#       user_id uuid NOT NULL,
+#       term text NOT NULL,
+#       weight real NOT NULL,
+#       PRIMARY KEY (journal_id, term)
+#   );
+#   CREATE INDEX journal_search_terms_lookup
+#       ON journal_search_terms (user_id, term, weight DESC);
+
+async def list_for_journal(journal_id: str) -> dict:
+    db = await get_async_supabase()
+    res = await db.table("journal_search_terms")\
+        .select("term, weight")\
+        .eq("journal_id", journal_id)\
+        .execute()
+    return {row["term"]: row["weight"] for row in res.data}
+
+async def upsert(rows: list) -> list:
+    db = await get_async_supabase()
+    res = await db.table("journal_search_terms").upsert(rows, on_conflict="journal_id,term").execute()
+    return res.data
+
+# Terms per DELETE: they go in the query string, which proxies cap at ~8 KB
+DELETE_BATCH = 100
+
+async def delete_terms(journal_id: str, terms: list) -> list:
+    db = await get_async_supabase()
+    deleted = []
+    for i in range(0, len(terms), DELETE_BATCH):
+        res = await db.table("journal_search_terms").delete()\
+            .eq("journal_id", journal_id)\
+            .in_("term", terms[i:i + DELETE_BATCH])\
+            .execute()
+        deleted += res.data
+    return deleted
+
+async def postings(user_id: str, term: str, limit: int) -> list:
+    """Highest-weight journals for one term."""
+    db = await get_async_supabase()
+    res = await db.table("journal_search_terms")\
+        .select("journal_id, weight")\
+        .eq("user_id", user_id)\
+        .eq("term", term)\
+        .order("weight", desc=True)\
+        .limit(limit)\
+        .execute()
+    return res.data
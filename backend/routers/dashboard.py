@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response
+from dependencies import get_current_user, get_user_timezone
+from repositories import insights as insights_repo
+from repositories import moods as moods_repo
+from schemas import DashboardResponse
+from services.insight_service import week_range
+from services.mood_index import get_mood_index
+from services.quote_service import get_quote_provider
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+def _utc_iso(moment: datetime) -> str:
+    # "Z" rather than "+00:00": a bare "+" in a query string reads as a space
+    return moment.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def default_range(tz: tzinfo, days: int = 42) -> tuple:
+    """The last `days` local days, today included, as UTC bounds for created_at."""
+    today = datetime.now(tz).date()
+    start = datetime.combine(today - timedelta(days=days - 1), time.min, tzinfo=tz)
+    end = datetime.combine(today + timedelta(days=1), time.min, tzinfo=tz) - timedelta(microseconds=1)
+    return _utc_iso(start), _utc_iso(end)
+
+# Everything the home and insights pages show on load, in one request:
+# mood range (calendar + chart), today's status, the stored weekly insight
+# (null if it hasn't been generated - /insights/weekly builds it) and the quote.
+# Revalidate with If-None-Match; an unchanged dashboard is a bodiless 304.
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    user_id: str = Depends(get_current_user),
+    tz: tzinfo = Depends(get_user_timezone)
+):
+    if not (start_date and end_date):
+        default_start, default_end = default_range(tz)
+        start_date, end_date = start_date or default_start, end_date or default_end
+    week_start, week_end = week_range(0)
+
+    moods, logged_today, weekly, quote = await asyncio.gather(
+        moods_repo.list_between(user_id, start_date, end_date, columns="id, mood_score, mood_label, created_at"),
+        get_mood_index().logged_today(user_id, tz),
+        insights_repo.find(user_id, "weekly_summary", week_start),
+        get_quote_provider().get_daily_quote()
+    )
+
+    body = DashboardResponse(
+        logged_today=logged_today,
+        moods=moods,
+        weekly={"id": weekly["id"], "week_start": week_start, "week_end": week_end, "payload": weekly["payload"]} if weekly else None,
+        quote=quote
+    ).model_dump_json(exclude_none=True)
+
+    etag = '"' + hashlib.sha256(f"{user_id}\x00{body}".encode()).hexdigest()[:32] + '"'
+    # Private: per user. no-cache: the browser keeps it but always revalidates
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,11 +1,25 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query, Path
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
 
 from dependencies import get_current_user
-from config import get_supabase
-from services import ai_service
+from repositories import insights as insights_repo
+from repositories import moods as moods_repo
+from services import ai_service, mood_analytics
+from services.event_hub import sse_event
+from services.insight_service import (
+    EMPTY_WEEK_PAYLOAD,
+    EMPTY_PERIOD_PAYLOAD,
+    week_range,
+    period_range,
+    get_rollup,
+    load_week,
+    has_enough_data,
+    save_weekly,
+)
+from services.response_cache import SingleFlightCache
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
@@ -15,35 +29,45 @@ class WeeklySummaryResponse(BaseModel):
     week_end: str
     payload: Dict[str, Any]
 
+class MoodStatsResponse(BaseModel):
+    entries: int
+    days_logged: int
+    first_day: Optional[str] = None
+    last_day: Optional[str] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    rolling_mean: Dict[str, Optional[float]] = {}
+    volatility: Optional[float] = None
+    current_streak: int = 0
+    longest_streak: int = 0
+    weekday_means: Dict[str, Optional[float]] = {}
+    best_weekday: Optional[str] = None
+    worst_weekday: Optional[str] = None
+    trend: Optional[str] = None
+    trend_change: Optional[float] = None
+
+class RollupResponse(BaseModel):
+    id: Optional[str]
+    insight_type: str
+    period_start: str
+    period_end: str
+    payload: Dict[str, Any]
+
+# Concurrent first views of the same week share one generation
+weekly_flight = SingleFlightCache(ttl=30)
+rollup_flight = SingleFlightCache(ttl=30)
+
 @router.get("/weekly", response_model=WeeklySummaryResponse)
 async def get_weekly_summary(
     offset: int = 0, # 0 = Last completed week, 1 = Week before that, etc.
     user_id: str = Depends(get_current_user)
 ):
-    supabase = get_supabase()
-    
-    # Calculate the Date Range (Monday to Sunday of the requested week)
-    today = datetime.utcnow().date()
-    # Find start of current week (Monday)
-    current_week_start = today - timedelta(days=today.weekday())
-    
-    # Calculate target week based on offset
-    # If offset=0, we look for the LAST COMPLETED week (so, 1 week ago)
-    target_week_start = current_week_start - timedelta(weeks=(offset + 1))
-    target_week_end = target_week_start + timedelta(days=6)
-    
-    start_iso = target_week_start.isoformat() # e.g. "2026-01-05"
-    end_iso = target_week_end.isoformat()     # e.g. "2026-01-11"
+    start_iso, end_iso = week_range(offset)
 
     # CHECK DB: Do we already have this insight?
-    existing = supabase.table("user_insights").select("*")\
-        .eq("user_id", user_id)\
-        .eq("insight_type", "weekly_summary")\
-        .eq("valid_from", start_iso)\
-        .execute()
-
-    if existing.data:
-        row = existing.data[0]
+    row = await insights_repo.find(user_id, "weekly_summary", start_iso)
+
+    if row:
         return WeeklySummaryResponse(
             id=row['id'],
             week_start=start_iso,
@@ -52,53 +76,111 @@ async def get_weekly_summary(
         )
 
     # GENERATE: If not found, we build it.
-    
-    moods = supabase.table("mood_entries").select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", start_iso)\
-        .lte("created_at", end_iso)\
-        .execute()
-        
-    journals = supabase.table("journals").select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", start_iso)\
-        .lte("created_at", end_iso)\
-        .execute()
-
-    if len(moods.data) < 2 and len(journals.data) < 1:
-        return WeeklySummaryResponse(
-            id=None,
-            week_start=start_iso,
-            week_end=end_iso,
-            payload={
-                "headline": "A Quiet Week",
-                "summary": "You didn't log much this week. Try journaling more to uncover patterns!",
-                "is_empty": True
-            }
+    async def generate():
+        moods, journals = await load_week(user_id, start_iso, end_iso)
+
+        if not has_enough_data(moods, journals):
+            return None, EMPTY_WEEK_PAYLOAD
+
+        # Call AI Service
+        ai_payload = await ai_service.generate_weekly_insight(
+            moods, 
+            journals, 
+            start_iso, 
+            end_iso
         )
 
-    # Call AI Service
-    ai_payload = await ai_service.generate_weekly_insight(
-        moods.data, 
-        journals.data, 
-        start_iso, 
-        end_iso
-    )
+        # Save to DB (if another worker got there first, theirs wins)
+        saved = await save_weekly(user_id, start_iso, end_iso, ai_payload)
+        return saved['id'], saved['payload']
 
-    # Save to DB 
-    new_insight = {
-        "user_id": user_id,
-        "insight_type": "weekly_summary",
-        "valid_from": start_iso,
-        "valid_until": end_iso,
-        "payload": ai_payload
-    }
-    
-    res = supabase.table("user_insights").insert(new_insight).execute()
+    insight_id, payload = await weekly_flight.get_or_compute((user_id, start_iso), generate)
     
     return WeeklySummaryResponse(
-        id=res.data[0]['id'],
+        id=insight_id,
         week_start=start_iso,
         week_end=end_iso,
-        payload=ai_payload
-    )
\ No newline at end of file
+        payload=payload
+    )
+
+# Streaming variant - SSE: "token" {text}... while the model writes, then
+# "done" with the same shape as /weekly once the JSON is validated and saved
+@router.get("/weekly/stream")
+async def stream_weekly_summary(
+    offset: int = 0,
+    user_id: str = Depends(get_current_user)
+):
+    start_iso, end_iso = week_range(offset)
+    row = await insights_repo.find(user_id, "weekly_summary", start_iso)
+    moods, journals = ([], []) if row else await load_week(user_id, start_iso, end_iso)
+
+    def done(insight_id, payload) -> str:
+        return sse_event("done", WeeklySummaryResponse(
+            id=insight_id,
+            week_start=start_iso,
+            week_end=end_iso,
+            payload=payload
+        ).model_dump())
+
+    async def stream():
+        if row:
+            yield done(row['id'], row['payload'])
+            return
+        if not has_enough_data(moods, journals):
+            yield done(None, EMPTY_WEEK_PAYLOAD)
+            return
+
+        parts = []
+        try:
+            async for delta in ai_service.stream_weekly_insight(moods, journals, start_iso, end_iso):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+            trend = mood_analytics.compute_stats(moods, today=end_iso)["trend"]
+            payload = ai_service.parse_weekly_payload("".join(parts), trend)
+        except Exception as e:
+            print(f"Error streaming weekly insight: {e}")
+            payload = ai_service.weekly_fallback(moods, end_iso)
+
+        saved = await save_weekly(user_id, start_iso, end_iso, payload)
+        yield done(saved['id'], saved['payload'])
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Deterministic mood statistics - no LLM involved
+@router.get("/stats", response_model=MoodStatsResponse)
+async def get_mood_stats(
+    days: int = Query(90, ge=7, le=3660), # History window, up to ~10 years
+    user_id: str = Depends(get_current_user)
+):
+    today = datetime.utcnow().date()
+    since_iso = (today - timedelta(days=days - 1)).isoformat()
+    moods = await moods_repo.list_scores(user_id, since_iso)
+    return mood_analytics.compute_stats(moods, today=today.isoformat())
+
+# Long-range reflections built from stored weekly insights (declared last so
+# /weekly and /stats take precedence)
+@router.get("/{period}", response_model=RollupResponse)
+async def get_rollup_summary(
+    period: str = Path(pattern="^(monthly|quarterly|yearly)$"),
+    offset: int = 0, # 0 = Last completed period
+    user_id: str = Depends(get_current_user)
+):
+    insight_type = f"{period}_summary"
+    start_iso, end_iso = period_range(insight_type, offset)
+
+    row = await rollup_flight.get_or_compute(
+        (user_id, insight_type, start_iso),
+        lambda: get_rollup(user_id, insight_type, start_iso, end_iso)
+    )
+
+    return RollupResponse(
+        id=row['id'] if row else None,
+        insight_type=insight_type,
+        period_start=start_iso,
+        period_end=end_iso,
+        payload=row['payload'] if row else EMPTY_PERIOD_PAYLOAD
+    )
@@ -1,11 +1,22 @@
+import json
+import uuid
+import base64
+import time
+import asyncio
+import hashlib
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dependencies import get_current_user
-from config import get_supabase
-from schemas import JournalCreate, JournalResponse
-from services import ai_service, crypto_service
+from repositories import journals as journals_repo
+from config import JOURNALS_PAGE_SIZE, JOURNALS_MAX_PAGE_SIZE, SSE_KEEPALIVE_SECONDS, DEEPEN_CACHE_TTL
+from schemas import JournalCreate, JournalResponse, JournalListItem, JournalPage, JournalSearchHit, JournalSearchResults
+from services import ai_service, crypto_service, job_queue, search_index, llm_gateway
+from services.event_hub import get_hub, sse_event
+from services.retrieval import get_retriever
+from services.response_cache import SingleFlightCache
 
 router = APIRouter(prefix="/journals", tags=["Journals"])
 
@@ -13,34 +24,57 @@ class DeepenRequest(BaseModel):
     content: str
     journal_id: Optional[str] = None
 
-# Get All Journals 
-@router.get("/", response_model=list[JournalResponse])
-def get_journals(user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-    
-    response = supabase.table("journals").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-    
-    journals = []
-    for item in response.data:
-        journals.append(JournalResponse(
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row['created_at'], row['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, id) parsed back into typed values - the cursor is client input."""
+    try:
+        created_at, journal_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is None:
+            raise ValueError("naive timestamp")
+        return created_at, uuid.UUID(journal_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Get Journals (paginated, newest first)
+@router.get("/", response_model=JournalPage)
+async def get_journals(
+    cursor: Optional[str] = None,
+    limit: int = Query(JOURNALS_PAGE_SIZE, ge=1, le=JOURNALS_MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user)
+):
+    after = decode_cursor(cursor) if cursor else None
+
+    # Fetch one extra row to know whether another page exists
+    rows = await journals_repo.list_page(user_id, limit + 1, after)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        JournalListItem(
             id=item['id'],
             mood_score=item['mood_score'],
             summary=item.get('summary'),
             tags=item.get('tags') or [],
-            created_at=item['created_at'],
-            content=""
-        ))
-    return journals
+            created_at=item['created_at']
+        )
+        for item in rows
+    ]
+
+    return JournalPage(
+        items=items,
+        next_cursor=encode_cursor(rows[-1]) if has_more else None
+    )
 
 # Save Journal
 @router.post("/", response_model=JournalResponse)
 async def create_journal(
     entry: JournalCreate,
-    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user)
 ):
-    supabase = get_supabase()
-
     try:
         
         encrypted_content = crypto_service.encrypt(entry.content)
@@ -53,14 +87,14 @@ async def create_journal(
             "tags": []
         }
 
-        res = supabase.table("journals").insert(journal_data).execute()
-        new_journal = res.data[0]
+        new_journal = await journals_repo.insert(journal_data)
 
-        background_tasks.add_task(
-            ai_service.process_journal_background,
-            new_journal['id'],
-            entry.content,
-            user_id
+        # Summaries/embeddings run in worker.py, keyed so a journal is only queued once
+        await asyncio.to_thread(
+            job_queue.enqueue,
+            "process_journal",
+            f"journal:{new_journal['id']}",
+            {"journal_id": new_journal['id'], "user_id": user_id}
         )
 
         return JournalResponse(
@@ -78,31 +112,77 @@ async def create_journal(
 
 # Delete Journal    
 @router.delete("/{journal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_journal(journal_id: str, user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-    
-    # We explicitly add .eq('user_id', user_id) for extra safety, 
+async def delete_journal(journal_id: str, user_id: str = Depends(get_current_user)):
+    # The repository always scopes by user_id for extra safety,
     # ensuring a user can never delete someone else's journal.
-    result = supabase.table("journals").delete().eq("id", journal_id).eq("user_id", user_id).execute()
+    deleted = await journals_repo.delete(journal_id, user_id)
     
     # Check if a row was actually deleted
-    if not result.data:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Journal not found or not authorized")
+
+    # Rebuild the local retrieval index (if used) without this entry's chunks
+    get_retriever().invalidate(user_id)
     
     return None
 
+# Search - keyword (blind index) and semantic results fused by rank.
+# Declared before /{journal_id} so "search" isn't treated as an id
+@router.get("/search", response_model=JournalSearchResults)
+async def search_journals(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=JOURNALS_MAX_PAGE_SIZE),
+    semantic: bool = True,
+    user_id: str = Depends(get_current_user)
+):
+    hits = await search_index.search(user_id, q, embed=ai_service.embed_query if semantic else None, limit=limit)
+    if not hits:
+        return JournalSearchResults(query=q, items=[])
+
+    rows = {row['id']: row for row in await journals_repo.list_by_ids(user_id, [journal_id for journal_id, _, _ in hits])}
+    items = [
+        JournalSearchHit(**rows[journal_id], score=round(score, 6), matched_by=sources)
+        for journal_id, score, sources in hits
+        # Index rows can briefly outlive a deleted journal
+        if journal_id in rows
+    ]
+    return JournalSearchResults(query=q, items=items)
+
+# Live Events (SSE) - pushes "journal.processed" / "journal.failed"
+# Declared before /{journal_id} so "events" isn't treated as an id
+@router.get("/events")
+async def journal_events(request: Request, user_id: str = Depends(get_current_user)):
+    hub = get_hub()
+    queue = hub.subscribe(user_id)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(message['event'], message['data'])
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Get Journal by Id
 @router.get("/{journal_id}", response_model=JournalResponse)
-def get_journal_detail(journal_id: str, user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-    
+async def get_journal_detail(journal_id: str, user_id: str = Depends(get_current_user)):
     # Fetch specific row
-    response = supabase.table("journals").select("*").eq("id", journal_id).eq("user_id", user_id).single().execute()
+    data = await journals_repo.get(journal_id, user_id)
     
-    if not response.data:
+    if not data:
         raise HTTPException(status_code=404, detail="Journal not found")
-        
-    data = response.data
     
     # Decrypt the content for the editor
     decrypted_content = crypto_service.decrypt(data['content_encrypted'])
@@ -118,57 +198,121 @@ def get_journal_detail(journal_id: str, user_id: str = Depends(get_current_user)
 
 # Update Journal By Id
 @router.put("/{journal_id}", response_model=JournalResponse)
-def update_journal(journal_id: str, entry: JournalCreate, user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-
+async def update_journal(journal_id: str, entry: JournalCreate, user_id: str = Depends(get_current_user)):
     # Encrypt new content
     encrypted_content = crypto_service.encrypt(entry.content)
     
-    # Update DB (For now, we are NOT re-running AI to save resources, but you could)
     data = {
         "content_encrypted": encrypted_content,
         "mood_score": entry.mood_score
     }
     
-    res = supabase.table("journals").update(data).eq("id", journal_id).eq("user_id", user_id).execute()
+    updated = await journals_repo.update(journal_id, data, user_id)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Journal not found")
+    row = updated[0]
+
+    # Re-embed only the changed chunks; the summary refreshes if the edit is large enough
+    await asyncio.to_thread(
+        job_queue.enqueue,
+        "process_journal",
+        f"journal:{journal_id}",
+        {"journal_id": journal_id, "user_id": user_id, "incremental": True}
+    )
     
     # Return updated object
     return JournalResponse(
         id=journal_id,
         mood_score=entry.mood_score,
-        summary="Updated...", # Placeholder until AI runs again
-        created_at=datetime.now(),
+        summary=row.get('summary'),
+        tags=row.get('tags') or [],
+        created_at=row['created_at'],
         content=entry.content
     )
 
 # Go Deeper
-@router.post("/deepen")
-async def go_deeper(req: DeepenRequest, user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-    
-    # We must ensure the entry exists/is updated before we run analysis
-    journal_id = req.journal_id
+# Only the prompt is cached, keyed on (user, journal, draft hash): repeated
+# clicks on an unchanged draft reuse the last answer, and concurrent
+# identical clicks share one run. The draft itself is saved on every click,
+# so the stored entry always holds the text the prompt was made for.
+deepen_cache = SingleFlightCache(ttl=DEEPEN_CACHE_TTL)
+
+def deepen_key(req: DeepenRequest, user_id: str) -> tuple:
+    draft_hash = hashlib.sha256(req.content.encode()).hexdigest()
+    return (user_id, req.journal_id or "", draft_hash)
+
+async def save_deepen_draft(req: DeepenRequest, user_id: str) -> str:
+    """Makes sure the entry exists and holds the current draft; returns its id."""
     encrypted_content = crypto_service.encrypt(req.content)
 
-    if journal_id:
+    if req.journal_id:
         # Update existing
-        supabase.table("journals").update({
+        await journals_repo.update(req.journal_id, {
             "content_encrypted": encrypted_content
-        }).eq("id", journal_id).eq("user_id", user_id).execute()
-    else:
-        # Create new (Draft)
-        res = supabase.table("journals").insert({
-            "user_id": user_id,
-            "mood_score": 5, # Default, user can change later
-            "content_encrypted": encrypted_content,
-            "summary": "Draft...",
-        }).execute()
-        journal_id = res.data[0]['id']
+        }, user_id)
+        return req.journal_id
 
-    # RUN "GO DEEPER" AI
-    prompt = await ai_service.get_deepen_prompt(user_id, req.content)
+    # Create new (Draft)
+    new_journal = await journals_repo.insert({
+        "user_id": user_id,
+        "mood_score": 5, # Default, user can change later
+        "content_encrypted": encrypted_content,
+        "summary": "Draft...",
+    })
+    return new_journal['id']
 
+@router.post("/deepen")
+async def go_deeper(req: DeepenRequest, user_id: str = Depends(get_current_user)):
+    # We must ensure the entry exists/is updated before we run analysis
+    journal_id = await save_deepen_draft(req, user_id)
+
+    async def run_deepen():
+        # RUN "GO DEEPER" AI
+        try:
+            return await ai_service.get_deepen_prompt(user_id, req.content, req.journal_id)
+        except llm_gateway.LLMUnavailable as e:
+            print(f"Error getting deepen prompt: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="AI is unavailable, try again.")
+
+    prompt = await deepen_cache.get_or_compute(deepen_key(req, user_id), run_deepen)
     return {
         "journal_id": journal_id, # Return ID so frontend can update URL if it was new
         "prompt": prompt
-    }
\ No newline at end of file
+    }
+
+# Go Deeper (streaming) - SSE: "meta" {journal_id}, "token" {text}..., then "done" {journal_id, prompt}
+@router.post("/deepen/stream")
+async def go_deeper_stream(req: DeepenRequest, user_id: str = Depends(get_current_user)):
+    journal_id = await save_deepen_draft(req, user_id)
+    key = deepen_key(req, user_id)
+    cached = deepen_cache.peek(key)
+
+    if cached:
+        async def replay():
+            yield sse_event("meta", {"journal_id": journal_id})
+            yield sse_event("token", {"text": cached})
+            yield sse_event("done", {"journal_id": journal_id, "prompt": cached})
+        return StreamingResponse(replay(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    async def stream():
+        yield sse_event("meta", {"journal_id": journal_id})
+        start = time.perf_counter()
+        parts = []
+        try:
+            async for delta in ai_service.stream_deepen_prompt(user_id, req.content, req.journal_id):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            print(f"Error streaming deepen prompt: {e}")
+            yield sse_event("error", {"detail": "AI is unavailable, try again."})
+            return
+
+        prompt = "".join(parts)
+        deepen_cache.put(key, prompt, time.perf_counter() - start)
+        yield sse_event("done", {"journal_id": journal_id, "prompt": prompt})
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,41 +1,34 @@
-from datetime import datetime, timedelta
+from datetime import tzinfo
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from dependencies import get_current_user
-from config import get_supabase
+from dependencies import get_current_user, get_user_timezone
+from repositories import moods as moods_repo
 from schemas import MoodCreate, MoodResponse
+from services.mood_index import get_mood_index, MoodAlreadyLogged
 
 router = APIRouter(prefix="/moods", tags=["Moods"])
 
 # Save Mood
 @router.post("/", response_model=MoodResponse)
-def log_mood(entry: MoodCreate, user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
-    
-    # Check if already logged today to prevent spamming
-    today_start = datetime.utcnow().date().isoformat()
-    existing = supabase.table("mood_entries")\
-        .select("id")\
-        .eq("user_id", user_id)\
-        .gte("created_at", today_start)\
-        .execute()
-        
-    if existing.data:
-        raise HTTPException(status_code=400, detail="Mood already logged today")
-
-    # Insert Data
+async def log_mood(
+    entry: MoodCreate,
+    user_id: str = Depends(get_current_user),
+    tz: tzinfo = Depends(get_user_timezone)
+):
     data = {
         "user_id": user_id,
         "mood_score": entry.score,
         "mood_label": entry.label
     }
+
+    # One mood per local day - checked in memory, enforced by the row id
+    try:
+        new_mood = await get_mood_index().log(user_id, tz, data)
+    except MoodAlreadyLogged:
+        raise HTTPException(status_code=400, detail="Mood already logged today")
     
-    res = supabase.table("mood_entries").insert(data).execute()
-    
-    if not res.data:
+    if not new_mood:
         raise HTTPException(status_code=500, detail="Failed to save mood")
-        
-    new_mood = res.data[0]
     
     return MoodResponse(
         id=new_mood['id'],
@@ -46,35 +39,19 @@ def log_mood(entry: MoodCreate, user_id: str = Depends(get_current_user)):
 
 # Get Today Mood
 @router.get("/today", response_model=bool)
-def check_mood_logged_today(user_id: str = Depends(get_current_user)):
-    # Returns True if the user has already logged a mood today
-    supabase = get_supabase()
-    today_start = datetime.utcnow().date().isoformat()
-    
-    res = supabase.table("mood_entries")\
-        .select("id")\
-        .eq("user_id", user_id)\
-        .gte("created_at", today_start)\
-        .execute()
-        
-    return len(res.data) > 0
+async def check_mood_logged_today(
+    user_id: str = Depends(get_current_user),
+    tz: tzinfo = Depends(get_user_timezone)
+):
+    # Returns True if the user has already logged a mood today (their timezone)
+    return await get_mood_index().logged_today(user_id, tz)
 
 # Get Mood for Current Month
 @router.get("/history", response_model=List[MoodResponse])
-def get_mood_history(
+async def get_mood_history(
     start_date: str, 
     end_date: str, 
     user_id: str = Depends(get_current_user)
 ):
-    supabase = get_supabase()
-    
     # Fetch moods within the date range
-    res = supabase.table("mood_entries")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", start_date)\
-        .lte("created_at", end_date)\
-        .order("created_at", desc=False)\
-        .execute()
-        
-    return res.data
\ No newline at end of file
+    return await moods_repo.list_between(user_id, start_date, end_date)
\ No newline at end of file
@@ -1,21 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from dependencies import get_current_user
-from config import get_supabase
+from repositories import profiles as profiles_repo
 from schemas import ProfileResponse
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
 # Get User Profile
 @router.get("/", response_model=ProfileResponse)
-def get_my_profile(user_id: str = Depends(get_current_user)):
-    supabase = get_supabase()
+async def get_my_profile(user_id: str = Depends(get_current_user)):
+    data = await profiles_repo.get(user_id)
     
-    response = supabase.table("profiles").select("*").eq("id", user_id).single().execute()
-    
-    if not response.data:
+    if not data:
         raise HTTPException(status_code=404, detail="Profile not found")
-        
-    data = response.data
+
     return ProfileResponse(
         id=data['id'],
         display_name=data.get('display_name'),
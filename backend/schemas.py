@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # --- Profile ---
@@ -22,6 +22,25 @@ class JournalResponse(BaseModel):
     created_at: datetime
     content: Optional[str] = None
 
+class JournalListItem(BaseModel):
+    id: str
+    mood_score: int
+    summary: Optional[str]
+    tags: List[str] = []
+    created_at: datetime
+
+class JournalPage(BaseModel):
+    items: List[JournalListItem]
+    next_cursor: Optional[str] = None
+
+class JournalSearchHit(JournalListItem):
+    score: float
+    matched_by: List[str] = []
+
+class JournalSearchResults(BaseModel):
+    query: str
+    items: List[JournalSearchHit]
+
 # --- Mood ---
 class MoodCreate(BaseModel):
     score: int
@@ -31,4 +50,21 @@ class MoodResponse(BaseModel):
     id: str
     mood_score: int
     mood_label: str
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+# --- Dashboard ---
+class DashboardQuote(BaseModel):
+    quote: str
+    author: str
+
+class DashboardWeekly(BaseModel):
+    id: str
+    week_start: str
+    week_end: str
+    payload: Dict[str, Any]
+
+class DashboardResponse(BaseModel):
+    logged_today: bool
+    moods: List[MoodResponse]
+    weekly: Optional[DashboardWeekly] = None
+    quote: Optional[DashboardQuote] = None
@@ -1,54 +1,130 @@
 import json
-import httpx
+import random
 import asyncio
-from config import get_groq, EDGE_FUNCTION_URL, SUPABASE_KEY, get_supabase, SUPABASE_URL
+import numpy as np
+from config import (
+    get_http_client,
+    require_env,
+    EDGE_FUNCTION_URL,
+    SUPABASE_KEY,
+    EMBED_CONCURRENCY,
+    EMBED_TIMEOUT,
+    EMBED_MAX_RETRIES,
+    EMBED_BATCH_SIZE,
+    SUMMARY_REFRESH_RATIO,
+    RETRIEVAL_THRESHOLD,
+    RETRIEVAL_K,
+    DEEPEN_QUERY_MODE,
+)
+from collections import Counter, defaultdict
 import services.crypto_service as crypto_service
+from services import mood_analytics
+from repositories import journals as journals_repo
+from services.event_hub import get_hub
+from services.retrieval import get_retriever, parse_embedding, normalize
+from services import search_index
+from services import llm_gateway
+from services.embedding_cache import get_embedding_cache, chunk_key
+from services.chunker import chunk_text
 
-def generate_summary(text: str):
-    client = get_groq()
-    
-    completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system", 
-                "content": "Write a concise, emotionally-aware summary in 10 to 15 words. Return JSON: { \"summary\": string, \"tags\": string[] }"
-            },
-            {"role": "user", "content": text}
-        ],
-        model="llama-3.1-8b-instant",
-        response_format={"type": "json_object"}
-    )
-    return json.loads(completion.choices[0].message.content)
+async def generate_summary(text: str):
+    # Duplicate saves, job retries and re-saved drafts are answered from the cache
+    return await llm_gateway.complete("summary", [
+        {
+            "role": "system", 
+            "content": "Write a concise, emotionally-aware summary in 10 to 15 words. Return JSON: { \"summary\": string, \"tags\": string[] }"
+        },
+        {"role": "user", "content": text}
+    ], json_mode=True, parse=json.loads, cache=True)
 
-async def generate_embeddings_via_edge(text: str):
+# Caps in-flight edge-function requests per process, however many chunks arrive
+_embed_slots = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+async def _post_edge(body: dict):
     """
-    Splits text into chunks and calls the Supabase Edge Function 
-    for each chunk in parallel.
+    One edge-function call with retry on timeouts, 429 and 5xx.
+    Returns the decoded JSON, or None once retries are exhausted.
     """
-    
-    chunks = [c for c in text.split('\n\n') if c.strip()]
-    if not chunks:
-        chunks = [text]
-
-    async with httpx.AsyncClient() as client:
-        async def fetch_vector(chunk_text):
-            response = await client.post(
-                EDGE_FUNCTION_URL,
-                json={"input": chunk_text},
-                headers={
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "Content-Type": "application/json"
-                },
-                timeout=10.0
-            )
-            if response.status_code != 200:
+    import httpx
+    client = await get_http_client()
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            async with _embed_slots:
+                response = await client.post(
+                    EDGE_FUNCTION_URL or require_env("EDGE_FUNCTION_URL"),
+                    json=body,
+                    headers={
+                        "Authorization": f"Bearer {SUPABASE_KEY}",
+                        "Content-Type": "application/json"
+                    },
+                    timeout=EMBED_TIMEOUT
+                )
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code != 429 and response.status_code < 500:
                 print(f"Embedding Error: {response.text}")
                 return None
-            return response.json()['vector']
+            error = f"HTTP {response.status_code}"
+        except httpx.TransportError as e:
+            error = repr(e)
+
+        if attempt < EMBED_MAX_RETRIES:
+            await asyncio.sleep(0.5 * 2 ** attempt + random.uniform(0, 0.25))
+
+    print(f"Embedding Error: giving up after {EMBED_MAX_RETRIES + 1} attempts ({error})")
+    return None
+
+async def _embed_one(chunk_text: str):
+    data = await _post_edge({"input": chunk_text})
+    return data['vector'] if data else None
+
+async def _embed_batch(batch: list) -> list:
+    data = await _post_edge({"inputs": batch})
+    if data and len(data.get('vectors', [])) == len(batch):
+        return data['vectors']
+    # Batch failed as a whole - fall back to per-chunk so one bad chunk doesn't sink the rest
+    return await asyncio.gather(*(_embed_one(c) for c in batch))
+
+async def embed_chunks(chunks: list) -> list:
+    """Vectors for `chunks` in order, None where a chunk could not be embedded."""
+    if EMBED_BATCH_SIZE > 1:
+        batches = [chunks[i:i + EMBED_BATCH_SIZE] for i in range(0, len(chunks), EMBED_BATCH_SIZE)]
+        results = await asyncio.gather(*(_embed_batch(b) for b in batches))
+        return [v for batch in results for v in batch]
+    return await asyncio.gather(*(_embed_one(c) for c in chunks))
+
+def split_chunks(text: str) -> list:
+    """The chunking used for every stored and queried embedding."""
+    return chunk_text(text) or [text]
+
+async def embed_cached(chunks: list) -> list:
+    """Like embed_chunks, but only chunks missing from the embedding cache go to the edge function."""
+    cache = get_embedding_cache()
+    keys = [chunk_key(c) for c in chunks]
+    cached = await asyncio.to_thread(cache.get_many, keys)
+
+    # Unchanged paragraphs of an evolving draft never go back to the edge function
+    to_fetch = {k: c for k, c in zip(keys, chunks) if k not in cached}
 
-        # Run all chunks in parallel (Async Fan-Out)
-        tasks = [fetch_vector(chunk) for chunk in chunks]
-        vectors = await asyncio.gather(*tasks)
+    if to_fetch:
+        vectors = await embed_chunks(list(to_fetch.values()))
+        fetched = {k: v for k, v in zip(to_fetch, vectors) if v is not None}
+        await asyncio.to_thread(cache.put_many, fetched)
+        cached.update(fetched)
+
+    return [cached.get(k) for k in keys]
+
+async def embed_query(text: str):
+    """One vector for a short query (e.g. search), or None if the edge function failed."""
+    return (await embed_cached([text]))[0]
+
+async def generate_embeddings_via_edge(text: str):
+    """
+    Splits text into chunks and embeds every chunk that isn't already in
+    the embedding cache via the Supabase Edge Function.
+    """
+    chunks = split_chunks(text)
+    vectors = await embed_cached(chunks)
 
     valid_results = [(c, v) for c, v in zip(chunks, vectors) if v is not None]
     
@@ -58,40 +134,73 @@ async def generate_embeddings_via_edge(text: str):
     final_chunks, final_vectors = zip(*valid_results)
     return list(final_chunks), list(final_vectors)
 
-async def get_deepen_prompt(user_id: str, current_content: str):
-    supabase = get_supabase()
-    
-    _, vectors = await generate_embeddings_via_edge(current_content)
+DEEPEN_SYSTEM_PROMPT = (
+    "You are an empathetic, psychological journaling assistant. "
+    "The user is writing a journal entry. You have access to snippets of their past memories that are semantically similar. "
+    "Your goal is to provide ONE single, short, profound question that connects their current thought to their past patterns "
+    "or encourages them to dig deeper into the 'Why'. "
+    "Do not be preachy. Just ask the question."
+)
+
+# Where Go Deeper's chunk vectors came from (stored rows vs. the embedding path)
+deepen_counters = {"reused": 0, "embedded": 0}
+
+async def draft_vectors(user_id: str, current_content: str, journal_id: str = None) -> tuple:
+    """
+    (vectors, own_chunk_ids) for a Go Deeper draft. For a saved journal,
+    chunks identical to a stored one reuse its embedding, so only new or
+    edited paragraphs are embedded; vectors of failed chunks are dropped.
+    """
+    chunks = split_chunks(current_content)
+    stored = await journals_repo.list_vectors(journal_id, with_embeddings=True, user_id=user_id) if journal_id else []
+
+    # Same multiset matching as process_journal_update
+    reusable = defaultdict(list)
+    for row, text in zip(stored, crypto_service.decrypt_many(row['content_chunk_encrypted'] for row in stored)):
+        reusable[text].append(row['embedding'])
+
+    vectors = [parse_embedding(reusable[c].pop()) if reusable[c] else None for c in chunks]
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        for i, vector in zip(missing, await embed_cached([chunks[i] for i in missing])):
+            vectors[i] = vector
+
+    deepen_counters["reused"] += len(chunks) - len(missing)
+    deepen_counters["embedded"] += len(missing)
+    return [v for v in vectors if v is not None], {row['id'] for row in stored}
+
+async def related_chunks(user_id: str, vectors: list, journal_id: str = None, own_ids: set = ()) -> list:
+    """Past chunks closest to the whole draft, never from the draft's own entry."""
+    retriever = get_retriever()
+    # Over-fetch: the entry's own stored chunks are its nearest neighbours
+    k = RETRIEVAL_K + len(own_ids)
+
+    if DEEPEN_QUERY_MODE == "maxsim" and len(vectors) > 1:
+        results = await asyncio.gather(*(retriever.search(user_id, v, RETRIEVAL_THRESHOLD, k) for v in vectors))
+        best = {}
+        for hit in (hit for hits in results for hit in hits):
+            if hit['id'] not in best or hit['similarity'] > best[hit['id']]['similarity']:
+                best[hit['id']] = hit
+        hits = sorted(best.values(), key=lambda hit: -hit['similarity'])
+    else:
+        query = normalize(normalize(np.asarray(vectors, dtype=np.float32)).mean(axis=0))
+        hits = await retriever.search(user_id, query.tolist(), RETRIEVAL_THRESHOLD, k)
+
+    hits = [h for h in hits if h['id'] not in own_ids and (journal_id is None or h.get('journal_id') != journal_id)]
+    return hits[:RETRIEVAL_K]
+
+async def build_deepen_messages(user_id: str, current_content: str, journal_id: str = None):
+    """Retrieves related past entries and builds the chat messages, or None if the draft can't be embedded."""
+    vectors, own_ids = await draft_vectors(user_id, current_content, journal_id)
     if not vectors:
-        return "Could not analyze text."
-    
-    query_vector = vectors[0]
-
-    rpc_params = {
-        "query_embedding": query_vector,
-        "match_threshold": 0.5,
-        "match_count": 3,
-        "requesting_user_id": user_id
-    }
-    
-    related_response = supabase.rpc("match_journals", rpc_params).execute()
-    
+        return None
+
+    related = await related_chunks(user_id, vectors, journal_id, own_ids)
+
     related_context = ""
-    for item in related_response.data:
-        # Skip if it's the exact same entry we are currently writing
-        decrypted = crypto_service.decrypt(item['content'])
+    for decrypted in crypto_service.decrypt_many(item['content'] for item in related):
         related_context += f"- Past Entry: {decrypted[:300]}...\n"
 
-    client = get_groq()
-    
-    system_prompt = (
-        "You are an empathetic, psychological journaling assistant. "
-        "The user is writing a journal entry. You have access to snippets of their past memories that are semantically similar. "
-        "Your goal is to provide ONE single, short, profound question that connects their current thought to their past patterns "
-        "or encourages them to dig deeper into the 'Why'. "
-        "Do not be preachy. Just ask the question."
-    )
-
     user_prompt = f"""
     CURRENT DRAFT:
     "{current_content}"
@@ -102,74 +211,209 @@ async def get_deepen_prompt(user_id: str, current_content: str):
     Based on this, what should I ask myself next?
     """
 
-    completion = client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        model="llama-3.3-70b-versatile",
-    )
-    
-    return completion.choices[0].message.content
+    return [
+        {"role": "system", "content": DEEPEN_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+async def get_deepen_prompt(user_id: str, current_content: str, journal_id: str = None):
+    messages = await build_deepen_messages(user_id, current_content, journal_id)
+    if not messages:
+        return "Could not analyze text."
+
+    return await llm_gateway.complete("deepen", messages)
+
+async def stream_deepen_prompt(user_id: str, current_content: str, journal_id: str = None):
+    messages = await build_deepen_messages(user_id, current_content, journal_id)
+    if not messages:
+        yield "Could not analyze text."
+        return
+    async for delta in llm_gateway.stream("deepen", messages):
+        yield delta
+
+async def update_search_index(journal_id: str, user_id: str, content: str, summary: str, tags: list):
+    # Search is secondary - don't fail (and re-run the LLM for) the whole job;
+    # reindex_search.py repairs anything missed
+    try:
+        await search_index.index_journal(journal_id, user_id, content, summary, tags)
+    except Exception as e:
+        print(f"⚠️ [Background] Search index update failed for {journal_id}: {e}")
 
 async def process_journal_background(journal_id: str, content: str, user_id: str):
-    supabase = get_supabase()
+    """
+    Summarizes and embeds one journal. Raises on failure so the job
+    worker can retry it; running it twice for the same journal is safe.
+    """
+    # We run both Groq (Summary) and Edge Function (Vectors) at the same time
+    ai_task = generate_summary(content)
+    vector_task = generate_embeddings_via_edge(content)
     
-    try:
-        # We run both Groq (Summary) and Edge Function (Vectors) at the same time
-        ai_task = asyncio.to_thread(generate_summary, content)
-        vector_task = generate_embeddings_via_edge(content)
+    ai_data, (chunks, vectors) = await asyncio.gather(ai_task, vector_task)
+
+    if not vectors:
+        raise RuntimeError("Edge function returned no embeddings")
+
+    # 2. Update Journal with Summary
+    await journals_repo.update(journal_id, {
+        "summary": ai_data.get("summary"),
+        "tags": ai_data.get("tags")
+    })
+
+    # 3. Replace Vectors (a retried job must not leave duplicate chunks)
+    vector_rows = []
+    encrypted_chunks = crypto_service.encrypt_many(chunks[:len(vectors)])
+    for i, vector in enumerate(vectors):
+        vector_rows.append({
+            "journal_id": journal_id,
+            "user_id": user_id,
+            "content_chunk_encrypted": encrypted_chunks[i],
+            "embedding": vector
+        })
+    await journals_repo.delete_vectors(journal_id)
+    await journals_repo.insert_vectors(vector_rows)
+    get_retriever().invalidate(user_id)
+    await update_search_index(journal_id, user_id, content, ai_data.get("summary"), ai_data.get("tags"))
         
-        ai_data, (chunks, vectors) = await asyncio.gather(ai_task, vector_task)
+    print(f"✅ [Background] AI processing complete for {journal_id}")
+    await get_hub().publish(user_id, "journal.processed", {
+        "journal_id": journal_id,
+        "summary": ai_data.get("summary"),
+        "tags": ai_data.get("tags") or []
+    })
 
-        # 2. Update Journal with Summary
-        supabase.table("journals").update({
+def _changed_ratio(old_chunks: list, new_chunks: list) -> float:
+    """Share of characters added or removed between two chunk lists (0 = identical)."""
+    old, new = Counter(old_chunks), Counter(new_chunks)
+    kept = sum(len(c) * n for c, n in (old & new).items())
+    total = max(sum(len(c) * n for c, n in old.items()), sum(len(c) * n for c, n in new.items()), 1)
+    return 1 - kept / total
+
+async def process_journal_update(journal_id: str, content: str, user_id: str, summary: str = None, tags: list = None):
+    """
+    Brings summary, tags and journal_vectors up to date after an edit,
+    re-embedding only added/changed chunks and dropping removed ones.
+    """
+    stored = await journals_repo.list_vectors(journal_id)
+    if not stored:
+        # Never processed (or processing failed) - do the full pipeline
+        return await process_journal_background(journal_id, content, user_id)
+
+    stored_texts = crypto_service.decrypt_many(row['content_chunk_encrypted'] for row in stored)
+    stored_chunks = [(row['id'], text) for row, text in zip(stored, stored_texts)]
+    new_chunks = split_chunks(content)
+
+    # Multiset diff: each stored chunk can satisfy one identical new chunk
+    remaining = Counter(new_chunks)
+    removed_ids = []
+    for row_id, text in stored_chunks:
+        if remaining[text] > 0:
+            remaining[text] -= 1
+        else:
+            removed_ids.append(row_id)
+    added = list(remaining.elements())
+
+    ratio = _changed_ratio([t for _, t in stored_chunks], new_chunks)
+    refresh_summary = ratio >= SUMMARY_REFRESH_RATIO or summary in (None, "Generating summary...", "Summary unavailable")
+
+    async def no_summary():
+        return None
+
+    # Summary (if needed) and the changed chunks' embeddings run at the same time
+    ai_data, vectors = await asyncio.gather(
+        generate_summary(content) if refresh_summary else no_summary(),
+        embed_cached(added)
+    )
+    if added and any(v is None for v in vectors):
+        raise RuntimeError("Edge function failed for some changed chunks")
+
+    if ai_data:
+        await journals_repo.update(journal_id, {
             "summary": ai_data.get("summary"),
             "tags": ai_data.get("tags")
-        }).eq("id", journal_id).execute()
-
-        # 3. Insert Vectors
-        if vectors:
-            vector_rows = []
-            for i, vector in enumerate(vectors):
-                vector_rows.append({
-                    "journal_id": journal_id,
-                    "user_id": user_id,
-                    "content_chunk_encrypted": crypto_service.encrypt(chunks[i]),
-                    "embedding": vector
-                })
-            supabase.table("journal_vectors").insert(vector_rows).execute()
-            
-        print(f"✅ [Background] AI processing complete for {journal_id}")
+        })
 
-    except Exception as e:
-        print(f"❌ [Background Error] {str(e)}")
+    if removed_ids:
+        await journals_repo.delete_vectors_by_ids(removed_ids)
+    if added:
+        await journals_repo.insert_vectors([
+            {
+                "journal_id": journal_id,
+                "user_id": user_id,
+                "content_chunk_encrypted": encrypted_chunk,
+                "embedding": vector
+            }
+            for encrypted_chunk, vector in zip(crypto_service.encrypt_many(added), vectors)
+        ])
+    if removed_ids or added:
+        get_retriever().invalidate(user_id)
+    if ai_data:
+        summary, tags = ai_data.get("summary"), ai_data.get("tags")
+    await update_search_index(journal_id, user_id, content, summary, tags)
+
+    print(f"✅ [Background] Incremental update for {journal_id}: "
+          f"+{len(added)} -{len(removed_ids)} chunks, summary {'refreshed' if ai_data else 'kept'}")
+    if ai_data:
+        await get_hub().publish(user_id, "journal.processed", {
+            "journal_id": journal_id,
+            "summary": ai_data.get("summary"),
+            "tags": ai_data.get("tags") or []
+        })
+
+async def run_journal_job(payload: dict):
+    """Job handler: loads the journal (content is never stored in the queue) and processes it."""
+    journal = await journals_repo.get(payload["journal_id"], payload["user_id"])
+    if not journal:
+        # Deleted before we got to it
+        return
+    content = crypto_service.decrypt(journal["content_encrypted"])
+    if payload.get("incremental"):
+        await process_journal_update(journal["id"], content, payload["user_id"], journal.get("summary"), journal.get("tags"))
+    else:
+        await process_journal_background(journal["id"], content, payload["user_id"])
+
+async def mark_journal_failed(payload: dict, error: str):
+    """Called once a journal job has used up its retries."""
+    print(f"❌ [Background Error] {payload['journal_id']}: {error}")
+    await journals_repo.update(payload["journal_id"], {"summary": "Summary unavailable"})
+    await get_hub().publish(payload["user_id"], "journal.failed", {
+        "journal_id": payload["journal_id"],
+        "error": "AI processing failed"
+    })
 
 WEEKLY_PROMPT = """
 You are an empathetic, wise AI journaling assistant. Your role is to analyze a user's week and provide a "Weekly Harvest" summary.
 Tone: Warm, grounded, insightful, like a gardener observing growth. Avoid clinical or robotic language.
 
-INPUT: A list of mood entries and journal entries for the week.
+INPUT: Precomputed mood facts, plus the mood entries and journal entries for the week.
 OUTPUT: Strictly valid JSON with the following fields:
 1. "headline": A 3-6 word poetic title for the week (e.g. "A Week of Quiet Resilience").
 2. "summary": A 2-3 sentence warm reflection on their week.
 3. "pattern": A specific observation connecting their mood to an activity or topic (e.g. "You felt lighter on days you walked").
-4. "sentiment_trend": One of ["Rising", "Falling", "Stable", "Volatile"].
+4. "sentiment_trend": One of ["Rising", "Falling", "Stable", "Volatile"]. If the facts give a sentiment trend, use it exactly.
 5. "actionable_tip": A gentle suggestion for next week based on their lows/highs.
 
+The facts are computed from the data and are accurate; build on them rather than re-deriving numbers.
 Do not include markdown formatting. Return raw JSON.
 """
 
-async def generate_weekly_insight(moods: list, journals: list, start_date: str, end_date: str):
-    """
-    Analyzes moods and journals for a specific week to generate a summary.
-    """
-    client = get_groq()
-    
-    # 1. Pre-process Data for the LLM
-    # We need to decrypt journals and format moods into a readable string
-    
+WEEKLY_FIELDS = ["headline", "summary", "pattern", "sentiment_trend", "actionable_tip"]
+WEEKLY_TRENDS = ["Rising", "Falling", "Stable", "Volatile"]
+
+WEEKLY_FALLBACK = {
+    "headline": "A Quiet Week",
+    "summary": "We couldn't fully analyze your week, but every day is a new beginning.",
+    "pattern": "Keep tracking to see more patterns.",
+    "sentiment_trend": "Stable",
+    "actionable_tip": "Take a moment to breathe deeply today."
+}
+
+def build_weekly_context(moods: list, journals: list, start_date: str, end_date: str, stats: dict = None) -> str:
+    """Decrypts journals and formats moods into a readable string for the LLM."""
     context_str = f"Timeframe: {start_date} to {end_date}\n\n"
+
+    # Numbers the model would otherwise guess at
+    stats = stats or mood_analytics.compute_stats(moods, today=end_date)
+    context_str += "MOOD FACTS:\n" + mood_analytics.describe(stats) + "\n"
     
     # Format Moods
     context_str += "MOOD HISTORY:\n"
@@ -183,35 +427,110 @@ async def generate_weekly_insight(moods: list, journals: list, start_date: str,
     context_str += "\nJOURNAL ENTRIES:\n"
     if not journals:
         context_str += "No journals written this week.\n"
-    for j in journals:
-        try:
-            date_str = j['created_at'].split('T')[0]
-            # Decrypt content for analysis
-            decrypted_content = crypto_service.decrypt(j['content_encrypted'])
-            # We truncate to 500 chars to save context window, focusing on the core message
-            context_str += f"- {date_str}: {decrypted_content[:500]}...\n"
-        except Exception:
+    # Decrypt content for analysis (one batch for the whole week)
+    decrypted = crypto_service.decrypt_many(j['content_encrypted'] for j in journals)
+    for j, decrypted_content in zip(journals, decrypted):
+        date_str = j['created_at'].split('T')[0]
+        if decrypted_content == crypto_service.DECRYPTION_ERROR:
             context_str += f"- {date_str}: [Content Unreadable]\n"
+            continue
+        # We truncate to 500 chars to save context window, focusing on the core message
+        context_str += f"- {date_str}: {decrypted_content[:500]}...\n"
+
+    return context_str
+
+def weekly_messages(context_str: str) -> list:
+    return [
+        {"role": "system", "content": WEEKLY_PROMPT},
+        {"role": "user", "content": f"Analyze this user data:\n\n{context_str}"}
+    ]
+
+def parse_weekly_payload(raw: str, trend: str = None) -> dict:
+    """
+    Validates the model's JSON. Raises ValueError if it is unusable;
+    unknown trends fall back to "Stable". A computed `trend` always wins.
+    """
+    text = raw.strip()
+    # Streamed output has no JSON mode, so tolerate a stray code fence
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    payload = json.loads(text)
+    if not isinstance(payload, dict) or any(not payload.get(f) for f in WEEKLY_FIELDS):
+        raise ValueError("Weekly insight is missing fields")
+    if trend:
+        payload["sentiment_trend"] = trend
+    elif payload["sentiment_trend"] not in WEEKLY_TRENDS:
+        payload["sentiment_trend"] = "Stable"
+    return payload
+
+async def request_weekly_insight(moods: list, journals: list, start_date: str, end_date: str, task: str = "weekly"):
+    """
+    Calls the LLM for a weekly insight. Raises if the call fails or returns
+    unusable JSON. Batch callers pass task="weekly_batch" to queue behind users.
+    """
+    # 1. Pre-process Data for the LLM
+    stats = mood_analytics.compute_stats(moods, today=end_date)
+    context_str = build_weekly_context(moods, journals, start_date, end_date, stats)
 
     # 2. Call LLM
+    return await llm_gateway.complete(
+        task, weekly_messages(context_str), json_mode=True,
+        parse=lambda content: parse_weekly_payload(content, stats["trend"]), cache=True
+    )
+
+async def generate_weekly_insight(moods: list, journals: list, start_date: str, end_date: str):
+    """
+    Analyzes moods and journals for a specific week to generate a summary.
+    """
     try:
-        completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": WEEKLY_PROMPT},
-                {"role": "user", "content": f"Analyze this user data:\n\n{context_str}"}
-            ],
-            model="llama-3.3-70b-versatile",
-            response_format={"type": "json_object"}
-        )
-        
-        return json.loads(completion.choices[0].message.content)
-        
+        return await request_weekly_insight(moods, journals, start_date, end_date)
     except Exception as e:
         print(f"Error generating weekly insight: {e}")
-        return {
-            "headline": "A Quiet Week",
-            "summary": "We couldn't fully analyze your week, but every day is a new beginning.",
-            "pattern": "Keep tracking to see more patterns.",
-            "sentiment_trend": "Stable",
-            "actionable_tip": "Take a moment to breathe deeply today."
-        }
\ No newline at end of file
+        return weekly_fallback(moods, end_date)
+
+def weekly_fallback(moods: list, end_date: str) -> dict:
+    """The canned payload, with the computed trend when there is one."""
+    trend = mood_analytics.compute_stats(moods, today=end_date)["trend"]
+    return {**WEEKLY_FALLBACK, "sentiment_trend": trend or WEEKLY_FALLBACK["sentiment_trend"]}
+
+async def stream_weekly_insight(moods: list, journals: list, start_date: str, end_date: str):
+    """Yields the raw JSON text of the weekly insight as the model writes it."""
+    context_str = build_weekly_context(moods, journals, start_date, end_date)
+    async for delta in llm_gateway.stream("weekly", weekly_messages(context_str)):
+        yield delta
+
+ROLLUP_PROMPT = """
+You are an empathetic, wise AI journaling assistant. Your role is to reflect on a longer stretch of a user's life ({period}) from the shorter reflections you already wrote for them.
+Tone: Warm, grounded, insightful, like a gardener looking back over a season. Avoid clinical or robotic language.
+
+INPUT: Precomputed mood facts for the whole {period}, and the earlier reflections in order.
+OUTPUT: Strictly valid JSON with the following fields:
+1. "headline": A 3-6 word poetic title for the {period}.
+2. "summary": A 2-4 sentence reflection on how the {period} unfolded.
+3. "pattern": A recurring theme or change that only shows up across several reflections.
+4. "sentiment_trend": One of ["Rising", "Falling", "Stable", "Volatile"]. If the facts give a sentiment trend, use it exactly.
+5. "actionable_tip": A gentle intention for the {period} ahead.
+
+The facts are computed from the data and are accurate; build on them rather than re-deriving numbers.
+Do not include markdown formatting. Return raw JSON.
+"""
+
+def build_rollup_context(children: list, stats: dict, start_date: str, end_date: str) -> str:
+    """Formats child insights (oldest first) and mood facts; no raw journal text is read."""
+    context_str = f"Timeframe: {start_date} to {end_date}\n\n"
+    context_str += "MOOD FACTS:\n" + mood_analytics.describe(stats) + "\n"
+    context_str += "EARLIER REFLECTIONS:\n"
+    for child in children:
+        p = child["payload"]
+        context_str += (
+            f"- {child['valid_from']}: {p.get('headline')}. {p.get('summary')} "
+            f"Pattern: {p.get('pattern')} Trend: {p.get('sentiment_trend')}\n"
+        )
+    return context_str
+
+async def request_rollup_insight(period: str, children: list, stats: dict, start_date: str, end_date: str) -> dict:
+    """Calls the LLM for a month/quarter/year insight. Raises if the call fails or returns unusable JSON."""
+    return await llm_gateway.complete("rollup", [
+        {"role": "system", "content": ROLLUP_PROMPT.format(period=period)},
+        {"role": "user", "content": build_rollup_context(children, stats, start_date, end_date)}
+    ], json_mode=True, parse=lambda content: parse_weekly_payload(content, stats["trend"]), cache=True)
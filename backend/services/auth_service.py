@@ -0,0 +1,137 @@
+import time
+import asyncio
+import hashlib
+import threading
+import jwt
+from cachetools import TTLCache
+from config import (
+    get_supabase,
+    SUPABASE_URL,
+    SUPABASE_JWT_SECRET,
+    SUPABASE_JWT_AUDIENCE,
+    AUTH_CACHE_TTL,
+    AUTH_CACHE_SIZE,
+    AUTH_REMOTE_FALLBACK,
+)
+
+class AuthError(Exception):
+    pass
+
+# Tokens we've already verified: sha256(token) -> (user_id, exp)
+_verified = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_lock = threading.Lock()
+
+# PyJWKClient keeps its own cache of signing keys, so we only hit the
+# JWKS endpoint when a token arrives with an unknown `kid`.
+_jwks_client = jwt.PyJWKClient(
+    f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+    cache_keys=True,
+    lifespan=3600
+)
+
+def _cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# Asymmetric algorithms Supabase signs with; the key itself comes from the JWKS
+JWKS_ALGORITHMS = {"RS256", "ES256"}
+# An unknown `kid` refetches the JWKS at most this often
+JWKS_REFRESH_COOLDOWN = 30.0
+_last_jwks_refresh = 0.0
+
+def _jwks_key(kid: str):
+    global _last_jwks_refresh
+    for key in _jwks_client.get_signing_keys():
+        if key.key_id == kid:
+            return key
+    with _lock:
+        if time.monotonic() - _last_jwks_refresh < JWKS_REFRESH_COOLDOWN:
+            raise AuthError(f"Unknown signing key: {kid!r}")
+        _last_jwks_refresh = time.monotonic()
+    # Rotated keys show up here; forged ids are capped by the cooldown above
+    return _jwks_client.get_signing_key(kid)
+
+def _decode_local(token: str) -> dict:
+    """
+    Verifies signature, `exp` and `aud` without leaving the process.
+    The header only picks the key type: HS256 is checked against the
+    project secret, anything else must be a JWKS algorithm and is
+    checked with the algorithm of the key the JWKS resolves to.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        alg = header.get("alg")
+        if alg == "HS256":
+            if not SUPABASE_JWT_SECRET:
+                raise AuthError("HS256 token but SUPABASE_JWT_SECRET is not set")
+            key, algorithms = SUPABASE_JWT_SECRET, ["HS256"]
+        elif alg in JWKS_ALGORITHMS:
+            signing_key = _jwks_key(header.get("kid"))
+            key, algorithms = signing_key.key, [signing_key.algorithm_name]
+        else:
+            # Rejected before the JWKS is consulted, so junk never costs a fetch
+            raise AuthError(f"Unsupported token algorithm: {alg!r}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]}
+        )
+    except (AuthError, jwt.ExpiredSignatureError):
+        raise
+    except Exception as e:
+        raise AuthError(str(e)) from e
+
+def _verify_remote(token: str) -> str:
+    try:
+        user_response = get_supabase().auth.get_user(token)
+    except Exception as e:
+        raise AuthError(str(e))
+    if not user_response or not user_response.user:
+        raise AuthError("Invalid or expired token")
+    return user_response.user.id
+
+def verify_token(token: str) -> str:
+    """
+    Returns the user_id for a Supabase access token.
+    Raises AuthError if the token is invalid or expired.
+    """
+    key = _cache_key(token)
+    now = time.time()
+
+    # 1. CHECK CACHE: entries never outlive the token's own `exp`
+    with _lock:
+        hit = _verified.get(key)
+    if hit and hit[1] > now:
+        return hit[0]
+
+    # 2. VERIFY LOCALLY
+    try:
+        claims = _decode_local(token)
+        user_id, exp = claims["sub"], claims["exp"]
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token expired")
+    except (jwt.PyJWTError, AuthError) as e:
+        if not AUTH_REMOTE_FALLBACK:
+            raise AuthError(str(e))
+        # 3. FALLBACK: ask the auth server (e.g. while the JWKS is unreachable)
+        user_id = _verify_remote(token)
+        exp = now + AUTH_CACHE_TTL
+
+    with _lock:
+        _verified[key] = (user_id, exp)
+    return user_id
+
+async def verify_token_async(token: str) -> str:
+    key = _cache_key(token)
+    with _lock:
+        hit = _verified.get(key)
+    if hit and hit[1] > time.time():
+        return hit[0]
+    # A JWKS refresh or remote fallback is blocking I/O, keep it off the loop
+    return await asyncio.to_thread(verify_token, token)
+
+def cache_stats() -> dict:
+    with _lock:
+        return {"size": len(_verified), "maxsize": _verified.maxsize}
@@ -0,0 +1,96 @@
+import re
+from config import CHUNK_MIN_TOKENS, CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+
+# Sentence-aware, token-budgeted chunking for embeddings.
+# Paragraph breaks are preferred cut points, sentences are never split
+# unless a single sentence is over budget, and tiny tail chunks are merged
+# back into their neighbour. Everything is streamed, so a 1MB entry never
+# materialises more than one window at a time.
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+
+def count_tokens(text: str) -> int:
+    """Cheap, model-agnostic token estimate (words + punctuation)."""
+    return len(_TOKEN.findall(text))
+
+def _iter_sentences(text: str):
+    """Yields (sentence, tokens, starts_paragraph)."""
+    start = 0
+    for match in _PARAGRAPH.finditer(text + "\n\n"):
+        paragraph = text[start:match.start()]
+        start = match.end()
+        first = True
+        for s in _SENTENCE.finditer(paragraph):
+            sentence = s.group().strip()
+            if not sentence:
+                continue
+            yield sentence, count_tokens(sentence), first
+            first = False
+
+def _split_long(sentence: str, max_tokens: int):
+    """Hard-wraps a single over-budget sentence on word boundaries."""
+    words = sentence.split()
+    piece, tokens = [], 0
+    for word in words:
+        t = count_tokens(word)
+        if piece and tokens + t > max_tokens:
+            yield " ".join(piece), tokens
+            piece, tokens = [], 0
+        piece.append(word)
+        tokens += t
+    if piece:
+        yield " ".join(piece), tokens
+
+def _iter_windows(text: str, min_tokens: int, max_tokens: int, overlap_tokens: int):
+    """Yields (sentences, tokens, carried) where `carried` leading sentences are overlap."""
+    window, size, carried_n = [], 0, 0
+
+    for sentence, tokens, new_paragraph in _iter_sentences(text):
+        pieces = _split_long(sentence, max_tokens) if tokens > max_tokens else [(sentence, tokens)]
+        for piece, t in pieces:
+            # Cut at a paragraph break once we have enough, or when the budget is full
+            if window and ((new_paragraph and size >= min_tokens) or size + t > max_tokens):
+                yield window, size, carried_n
+                carry, carried = [], 0
+                for prev, prev_t in reversed(window):
+                    if carried + prev_t > overlap_tokens:
+                        break
+                    carry.insert(0, (prev, prev_t))
+                    carried += prev_t
+                window, size, carried_n = carry, carried, len(carry)
+            window.append((piece, t))
+            size += t
+            new_paragraph = False
+
+    if window:
+        yield window, size, carried_n
+
+def iter_chunks(
+    text: str,
+    min_tokens: int = CHUNK_MIN_TOKENS,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+):
+    """Streams chunks of roughly min_tokens..max_tokens tokens."""
+    pending = None
+    for window, size, carried_n in _iter_windows(text, min_tokens, max_tokens, overlap_tokens):
+        if pending is None:
+            pending = (window, size)
+            continue
+        prev_window, prev_size = pending
+        fresh = window[carried_n:]
+        fresh_size = sum(t for _, t in fresh)
+        if size < min_tokens and prev_size + fresh_size <= max_tokens:
+            # Tiny follow-up (e.g. a one-line list item) - fold it into the previous chunk
+            pending = (prev_window + fresh, prev_size + fresh_size)
+            continue
+        yield " ".join(s for s, _ in prev_window)
+        pending = (window, size)
+
+    if pending:
+        yield " ".join(s for s, _ in pending[0])
+
+def chunk_text(text: str, **kwargs) -> list:
+    return list(iter_chunks(text, **kwargs))
@@ -1,12 +1,112 @@
-from config import get_cipher
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet, InvalidToken
+from config import (
+    get_cipher,
+    require_env,
+    ENCRYPTION_FORMAT,
+    COMPRESSION_LEVEL,
+    CRYPTO_THREADS,
+    CRYPTO_PARALLEL_MIN_ROWS,
+)
+
+DECRYPTION_ERROR = "[Decryption Error]"
+
+# Stored formats:
+#   legacy: Fernet(utf-8 text), always starts "gAAAAA"
+#   v2:     "v2:" + Fernet(codec byte + body); codec 0 = raw, 1 = zlib.
+#           Raw is used when compressing doesn't help (short texts).
+# The prefix can't occur in a legacy token (":" isn't in the base64url
+# alphabet), so both decrypt transparently.
+V2_PREFIX = "v2:"
+CODEC_RAW = b"\x00"
+CODEC_ZLIB = b"\x01"
+
+# get_cipher() is a MultiFernet: it encrypts with the current key and
+# decrypts with any configured key. The current key alone tells us whether
+# a token still needs rotating.
+_current = None
+_pool = ThreadPoolExecutor(max_workers=CRYPTO_THREADS, thread_name_prefix="crypto")
+
+def _current_key() -> Fernet:
+    global _current
+    if _current is None:
+        _current = Fernet(require_env("ENCRYPTION_KEY").encode())
+    return _current
+
+def _map(fn, items) -> list:
+    """Applies fn in order; large row sets are split across the crypto thread pool."""
+    items = list(items)
+    if len(items) < CRYPTO_PARALLEL_MIN_ROWS or CRYPTO_THREADS <= 1:
+        return [fn(item) for item in items]
+    size = -(-len(items) // CRYPTO_THREADS)
+    parts = [items[i:i + size] for i in range(0, len(items), size)]
+    return [result for part in _pool.map(lambda part: [fn(item) for item in part], parts) for result in part]
+
+def _pack(text: str) -> bytes:
+    raw = text.encode()
+    packed = zlib.compress(raw, COMPRESSION_LEVEL)
+    return CODEC_ZLIB + packed if len(packed) < len(raw) else CODEC_RAW + raw
+
+def _unpack(payload: bytes) -> str:
+    codec, body = payload[:1], payload[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(body).decode()
+    if codec == CODEC_RAW:
+        return body.decode()
+    raise InvalidToken
 
 def encrypt(text: str) -> str:
-    """Encrypts text to a base64 string"""
+    """Encrypts text to a base64 string (in the configured storage format)"""
+    if ENCRYPTION_FORMAT >= 2:
+        return V2_PREFIX + get_cipher().encrypt(_pack(text)).decode()
     return get_cipher().encrypt(text.encode()).decode()
 
-def decrypt(text: str) -> str:
-    """Decrypts base64 string back to text"""
+def decrypt(text: str, strict: bool = False) -> str:
+    """Decrypts base64 string back to text. Tokens no key can open become DECRYPTION_ERROR unless strict."""
     try:
+        if text.startswith(V2_PREFIX):
+            return _unpack(get_cipher().decrypt(text[len(V2_PREFIX):].encode()))
         return get_cipher().decrypt(text.encode()).decode()
-    except Exception:
-        return "[Decryption Error]"
\ No newline at end of file
+    except (InvalidToken, zlib.error, UnicodeDecodeError):
+        if strict:
+            raise InvalidToken
+        return DECRYPTION_ERROR
+
+def encrypt_many(texts) -> list:
+    return _map(encrypt, texts)
+
+def decrypt_many(tokens, strict: bool = False) -> list:
+    return _map(lambda token: decrypt(token, strict), tokens)
+
+def is_current(token: str) -> bool:
+    """True if the token uses the configured format and the current key."""
+    v2 = token.startswith(V2_PREFIX)
+    if v2 != (ENCRYPTION_FORMAT >= 2):
+        return False
+    try:
+        _current_key().decrypt(token[len(V2_PREFIX):].encode() if v2 else token.encode())
+        return True
+    except InvalidToken:
+        return False
+
+def rotate(token: str):
+    """
+    The token re-encrypted under the current key and format, or None if it
+    already is. Raises InvalidToken if no key opens it.
+    """
+    if is_current(token):
+        return None
+    if token.startswith(V2_PREFIX) and ENCRYPTION_FORMAT >= 2:
+        # Same format, old key - keeps the original timestamp
+        return V2_PREFIX + get_cipher().rotate(token[len(V2_PREFIX):].encode()).decode()
+    return encrypt(decrypt(token, strict=True))
+
+def rotate_many(tokens) -> list:
+    """rotate() per token; tokens no key opens come back as the InvalidToken instance."""
+    def safe_rotate(token):
+        try:
+            return rotate(token)
+        except InvalidToken as e:
+            return e
+    return _map(safe_rotate, tokens)
@@ -0,0 +1,135 @@
+import hmac
+import time
+import array
+import sqlite3
+import hashlib
+import threading
+from cachetools import LRUCache
+from config import (
+    require_env,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_MB,
+    EMBEDDING_CACHE_DB_PATH,
+    EMBEDDING_CACHE_DB_MAX_ROWS,
+)
+
+# Two-tier cache of chunk embeddings: an in-process LRU bounded by bytes,
+# and an optional SQLite file shared by the API and worker processes.
+# Keys are an HMAC of (model, chunk) so the cache never reveals journal text.
+# Vectors are held as array('d') (8 bytes a float, where a list of floats
+# costs ~32), so EMBEDDING_CACHE_MB is close to what the process really uses.
+
+# Per entry on top of the floats: the array object, the 64-char key, the LRU links
+ENTRY_OVERHEAD = 256
+
+def chunk_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    msg = f"{model}\x00{text}".encode()
+    return hmac.new(require_env("ENCRYPTION_KEY").encode(), msg, hashlib.sha256).hexdigest()
+
+def _vector_size(vector: array.array) -> int:
+    return vector.itemsize * len(vector) + ENTRY_OVERHEAD
+
+class EmbeddingCache:
+    def __init__(self, max_bytes: int, db_path: str = None, max_rows: int = 100_000):
+        self.memory = LRUCache(maxsize=max_bytes, getsizeof=_vector_size)
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- persistent tier ---
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)")
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, keys: list) -> dict:
+        db = self._db()
+        rows = []
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows += db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch).fetchall()
+        if rows:
+            db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(time.time(), k) for k, _ in rows])
+        return {k: array.array("d", blob) for k, blob in rows}
+
+    def _disk_put(self, items: dict):
+        db = self._db()
+        now = time.time()
+        db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(k, v.tobytes(), now) for k, v in items.items()]
+        )
+        count = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_rows
+        if overflow > 0:
+            db.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            with self._lock:
+                self.counters["evictions"] += overflow
+
+    # --- public API (blocking; call via asyncio.to_thread from async code) ---
+    def get_many(self, keys: list) -> dict:
+        """key -> vector (as a list) for every key cached in either tier."""
+        found = {}
+        with self._lock:
+            for k in keys:
+                vector = self.memory.get(k)
+                if vector is not None:
+                    found[k] = vector
+            self.counters["memory_hits"] += len(found)
+
+        missing = [k for k in keys if k not in found]
+        if missing and self.db_path:
+            from_disk = self._disk_get(missing)
+            with self._lock:
+                for k, vector in from_disk.items():
+                    self.memory[k] = vector
+                self.counters["disk_hits"] += len(from_disk)
+            found.update(from_disk)
+
+        with self._lock:
+            self.counters["misses"] += len(keys) - len(found)
+        return {k: vector.tolist() for k, vector in found.items()}
+
+    def put_many(self, items: dict):
+        if not items:
+            return
+        items = {k: array.array("d", vector) for k, vector in items.items()}
+        with self._lock:
+            for k, vector in items.items():
+                self.memory[k] = vector
+        if self.db_path:
+            self._disk_put(items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.currsize,
+            }
+
+cache = EmbeddingCache(
+    max_bytes=EMBEDDING_CACHE_MB * 1024 * 1024,
+    db_path=EMBEDDING_CACHE_DB_PATH,
+    max_rows=EMBEDDING_CACHE_DB_MAX_ROWS
+)
+
+def get_embedding_cache() -> EmbeddingCache:
+    return cache
@@ -0,0 +1,108 @@
+import json
+import time
+import asyncio
+from collections import defaultdict
+from config import EVENT_BROKER, EVENT_RETENTION_SECONDS
+from services.job_queue import get_db
+
+def sse_event(event: str, data: dict) -> str:
+    """Formats one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class InProcessHub:
+    """
+    Per-user pub/sub for server-push events.
+    Subscribers live in this worker only; a broker-backed hub (e.g. Redis or
+    Postgres LISTEN/NOTIFY) can replace it as long as it keeps the same
+    publish / subscribe / unsubscribe methods.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    async def publish(self, user_id: str, event: str, data: dict):
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait({"event": event, "data": data})
+            except asyncio.QueueFull:
+                # A stalled client shouldn't block the publisher, drop its oldest event
+                queue.get_nowait()
+                queue.put_nowait({"event": event, "data": data})
+
+class SqliteHub(InProcessHub):
+    """
+    Cross-process hub: publish() appends to an events table in the job
+    queue's SQLite file, and run_relay() (in each web worker) tails that
+    table and fans new rows out to the local subscribers. This is how
+    events from the separate AI worker process reach SSE clients.
+    """
+
+    def __init__(self, queue_size: int = 100, poll_interval: float = 0.5):
+        super().__init__(queue_size)
+        self.poll_interval = poll_interval
+
+    def _append(self, user_id: str, event: str, data: dict):
+        get_db().execute(
+            "INSERT INTO events (user_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+            (user_id, event, json.dumps(data), time.time())
+        )
+
+    def _read_after(self, last_id: int) -> list:
+        return get_db().execute(
+            "SELECT id, user_id, event, data FROM events WHERE id > ? ORDER BY id",
+            (last_id,)
+        ).fetchall()
+
+    def _latest_id(self) -> int:
+        row = get_db().execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def _prune(self):
+        get_db().execute(
+            "DELETE FROM events WHERE created_at < ?",
+            (time.time() - EVENT_RETENTION_SECONDS,)
+        )
+
+    async def publish(self, user_id: str, event: str, data: dict):
+        await asyncio.to_thread(self._append, user_id, event, data)
+
+    async def run_relay(self):
+        last_id = None
+        last_prune = time.time()
+        while True:
+            try:
+                if last_id is None:
+                    last_id = await asyncio.to_thread(self._latest_id)
+                rows = await asyncio.to_thread(self._read_after, last_id)
+                for row in rows:
+                    # Advance first, so a row that can't be delivered is skipped, not retried forever
+                    last_id = row["id"]
+                    await super().publish(row["user_id"], row["event"], json.loads(row["data"]))
+                if not rows:
+                    await asyncio.sleep(self.poll_interval)
+                if time.time() - last_prune > EVENT_RETENTION_SECONDS:
+                    await asyncio.to_thread(self._prune)
+                    last_prune = time.time()
+            except Exception as e:
+                # e.g. "database is locked" - the relay must outlive it, or SSE goes quiet
+                print(f"⚠️ [Events] Relay error: {e!r}")
+                await asyncio.sleep(self.poll_interval)
+
+hub = SqliteHub() if EVENT_BROKER == "sqlite" else InProcessHub()
+
+def get_hub() -> InProcessHub:
+    return hub
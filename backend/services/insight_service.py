@@ -0,0 +1,171 @@
+import json
+import asyncio
+import hashlib
+from datetime import date, datetime, timedelta
+from repositories import insights as insights_repo
+from repositories import journals as journals_repo
+from repositories import moods as moods_repo
+from services import ai_service, mood_analytics
+
+EMPTY_WEEK_PAYLOAD = {
+    "headline": "A Quiet Week",
+    "summary": "You didn't log much this week. Try journaling more to uncover patterns!",
+    "is_empty": True
+}
+
+def week_range(offset: int, today: date = None) -> tuple:
+    # Calculate the Date Range (Monday to Sunday of the requested week)
+    today = today or datetime.utcnow().date()
+    # Find start of current week (Monday)
+    current_week_start = today - timedelta(days=today.weekday())
+    
+    # Calculate target week based on offset
+    # If offset=0, we look for the LAST COMPLETED week (so, 1 week ago)
+    target_week_start = current_week_start - timedelta(weeks=(offset + 1))
+    target_week_end = target_week_start + timedelta(days=6)
+    
+    start_iso = target_week_start.isoformat() # e.g. "2026-01-05"
+    end_iso = target_week_end.isoformat()     # e.g. "2026-01-11"
+    return start_iso, end_iso
+
+async def load_week(user_id: str, start_iso: str, end_iso: str) -> tuple:
+    # Both range reads overlap on the shared connection pool
+    return await asyncio.gather(
+        moods_repo.list_between(user_id, start_iso, end_iso),
+        journals_repo.list_between(user_id, start_iso, end_iso)
+    )
+
+def has_enough_data(moods: list, journals: list) -> bool:
+    return not (len(moods) < 2 and len(journals) < 1)
+
+async def save_weekly(user_id: str, start_iso: str, end_iso: str, payload: dict) -> dict:
+    """Stores the insight unless one already exists for that week; returns the stored row."""
+    return await insights_repo.insert_if_absent({
+        "user_id": user_id,
+        "insight_type": "weekly_summary",
+        "valid_from": start_iso,
+        "valid_until": end_iso,
+        "payload": payload
+    })
+
+
+# --- Rollups: month <- weeks, quarter <- months, year <- quarters ---
+# Each rollup row stores a digest of the children it was built from. On
+# read, the stored children are re-digested; only levels whose inputs
+# changed (e.g. a week got its insight later) are rebuilt, bottom-up.
+
+ROLLUP_MONTHS = {"monthly_summary": 1, "quarterly_summary": 3, "yearly_summary": 12}
+ROLLUP_CHILD = {
+    "monthly_summary": "weekly_summary",
+    "quarterly_summary": "monthly_summary",
+    "yearly_summary": "quarterly_summary",
+}
+ROLLUP_PERIOD = {"monthly_summary": "month", "quarterly_summary": "quarter", "yearly_summary": "year"}
+
+EMPTY_PERIOD_PAYLOAD = {
+    "headline": "Nothing Gathered Yet",
+    "summary": "There are no weekly reflections for this period yet. Keep journaling and they'll add up here.",
+    "is_empty": True
+}
+
+def _month_index_date(index: int) -> date:
+    return date(index // 12, index % 12 + 1, 1)
+
+def _range_from_index(start_index: int, months: int) -> tuple:
+    start = _month_index_date(start_index)
+    end = _month_index_date(start_index + months) - timedelta(days=1)
+    return start.isoformat(), end.isoformat()
+
+def period_range(insight_type: str, offset: int, today: date = None) -> tuple:
+    """Start/end of the last completed month/quarter/year, `offset` periods back."""
+    months = ROLLUP_MONTHS[insight_type]
+    today = today or datetime.utcnow().date()
+    current = (today.year * 12 + today.month - 1) // months * months
+    return _range_from_index(current - (offset + 1) * months, months)
+
+def child_ranges(insight_type: str, start_iso: str) -> list:
+    """Periods of the child rollup type inside a rollup (not used for weeks)."""
+    child_months = ROLLUP_MONTHS[ROLLUP_CHILD[insight_type]]
+    start = date.fromisoformat(start_iso)
+    first = start.year * 12 + start.month - 1
+    return [
+        _range_from_index(i, child_months)
+        for i in range(first, first + ROLLUP_MONTHS[insight_type], child_months)
+    ]
+
+def _digest(sources: dict) -> str:
+    return hashlib.sha256(json.dumps(sources, sort_keys=True).encode()).hexdigest()[:16]
+
+def _source_version(row: dict) -> str:
+    # Weekly rows are write-once, so their id identifies the content
+    return row["payload"].get("digest") or row["id"]
+
+class _RollupBuild:
+    """One rollup request: a single read of stored insights, moods fetched only if something is rebuilt."""
+
+    def __init__(self, user_id: str, start_iso: str, end_iso: str, rows: list):
+        self.user_id = user_id
+        self.start_iso = start_iso
+        self.end_iso = end_iso
+        self.rows = {(r["insight_type"], r["valid_from"]): r for r in rows}
+        self._moods = None
+
+    async def moods_between(self, start_iso: str, end_iso: str) -> list:
+        if self._moods is None:
+            before = (date.fromisoformat(self.end_iso) + timedelta(days=1)).isoformat()
+            self._moods = asyncio.ensure_future(moods_repo.list_scores(self.user_id, self.start_iso, before))
+        moods = await self._moods
+        return [m for m in moods if start_iso <= m["created_at"][:10] <= end_iso]
+
+    def children(self, insight_type: str, start_iso: str, end_iso: str) -> list:
+        child_type = ROLLUP_CHILD[insight_type]
+        return sorted(
+            (r for (t, valid_from), r in self.rows.items() if t == child_type and start_iso <= valid_from <= end_iso),
+            key=lambda r: r["valid_from"]
+        )
+
+    async def resolve(self, insight_type: str, start_iso: str, end_iso: str):
+        """The up-to-date rollup row, rebuilding it (and stale children) if needed; None if there is nothing to roll up."""
+        if ROLLUP_CHILD[insight_type] != "weekly_summary":
+            await asyncio.gather(*(
+                self.resolve(ROLLUP_CHILD[insight_type], s, e)
+                for s, e in child_ranges(insight_type, start_iso)
+            ))
+        children = [c for c in self.children(insight_type, start_iso, end_iso) if not c["payload"].get("is_empty")]
+        if not children:
+            return None
+
+        sources = {c["valid_from"]: _source_version(c) for c in children}
+        digest = _digest(sources)
+        row = self.rows.get((insight_type, start_iso))
+        if row and row["payload"].get("digest") == digest:
+            return row
+
+        moods = await self.moods_between(start_iso, end_iso)
+        stats = mood_analytics.compute_stats(moods, today=end_iso)
+        try:
+            payload = await ai_service.request_rollup_insight(
+                ROLLUP_PERIOD[insight_type], children, stats, start_iso, end_iso
+            )
+        except Exception as e:
+            print(f"Error generating {insight_type}: {e}")
+            # Serve the stale row if there is one; nothing is stored, so the next read retries
+            return row
+
+        row = await insights_repo.upsert({
+            "user_id": self.user_id,
+            "insight_type": insight_type,
+            "valid_from": start_iso,
+            "valid_until": end_iso,
+            "payload": {**payload, "mood_stats": stats, "digest": digest, "sources": sorted(sources)}
+        })
+        self.rows[(insight_type, start_iso)] = row
+        return row
+
+async def get_rollup(user_id: str, insight_type: str, start_iso: str, end_iso: str):
+    """Stored-or-rebuilt rollup row for the period, or None if it has no weekly insights yet."""
+    types = [insight_type]
+    while ROLLUP_CHILD.get(types[-1]):
+        types.append(ROLLUP_CHILD[types[-1]])
+    rows = await insights_repo.list_range(user_id, types, start_iso, end_iso)
+    return await _RollupBuild(user_id, start_iso, end_iso, rows).resolve(insight_type, start_iso, end_iso)
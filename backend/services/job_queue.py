@@ -0,0 +1,191 @@
+import json
+import time
+import random
+import sqlite3
+import threading
+from config import JOB_DB_PATH, JOB_MAX_ATTEMPTS, JOB_BACKOFF_BASE, JOB_LEASE_SECONDS
+
+# Durable job queue on a local SQLite file (WAL mode, safe across the web
+# and worker processes). Jobs are keyed, so enqueueing the same key twice
+# never creates a second job.
+
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL,
+    locked_until REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run, item)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+def get_db() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(JOB_DB_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+def enqueue(kind: str, key: str, payload: dict):
+    """
+    Adds a job, or re-queues an existing job with the same key.
+    If that job is running right now it is flagged 'rerun' and goes back
+    on the queue as soon as the current attempt finishes.
+    """
+    now = time.time()
+    get_db().execute(
+        """
+        INSERT INTO jobs (key, kind, payload, status, attempts, run_after, updated_at)
+        VALUES (?, ?, ?, 'queued', 0, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            kind = excluded.kind,
+            payload = excluded.payload,
+            status = CASE WHEN jobs.status IN ('running', 'rerun') THEN 'rerun' ELSE 'queued' END,
+            attempts = 0,
+            run_after = excluded.run_after,
+            last_error = NULL,
+            updated_at = excluded.updated_at
+        """,
+        (key, kind, json.dumps(payload), now, now)
+    )
+
+def claim(limit: int) -> list:
+    """
+    Leases up to `limit` ready jobs to the caller.
+    Running jobs whose lease expired (worker crashed) are picked up again.
+    """
+    if limit <= 0:
+        return []
+
+    now = time.time()
+    db = get_db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        rows = db.execute(
+            """
+            SELECT key, kind, payload, attempts FROM jobs
+            WHERE (status = 'queued' AND run_after <= ?)
+               OR (status IN ('running', 'rerun') AND locked_until < ?)
+            ORDER BY run_after
+            LIMIT ?
+            """,
+            (now, now, limit)
+        ).fetchall()
+
+        for row in rows:
+            db.execute(
+                "UPDATE jobs SET status = 'running', locked_until = ?, updated_at = ? WHERE key = ?",
+                (now + JOB_LEASE_SECONDS, now, row["key"])
+            )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+    return [
+        {"key": r["key"], "kind": r["kind"], "payload": json.loads(r["payload"]), "attempts": r["attempts"]}
+        for r in rows
+    ]
+
+def complete(key: str):
+    get_db().execute(
+        """
+        UPDATE jobs SET
+            status = CASE WHEN status = 'rerun' THEN 'queued' ELSE 'done' END,
+            locked_until = NULL,
+            updated_at = ?
+        WHERE key = ?
+        """,
+        (time.time(), key)
+    )
+
+def fail(key: str, error: str) -> bool:
+    """
+    Records a failed attempt. Returns True if the job will be retried,
+    False once it has used up JOB_MAX_ATTEMPTS.
+    """
+    db = get_db()
+    row = db.execute("SELECT attempts, status FROM jobs WHERE key = ?", (key,)).fetchone()
+    now = time.time()
+
+    if row and row["status"] == "rerun":
+        # Newer work arrived while this attempt ran - start that fresh
+        db.execute(
+            "UPDATE jobs SET status = 'queued', last_error = ?, locked_until = NULL, updated_at = ? WHERE key = ?",
+            (error, now, key)
+        )
+        return True
+
+    attempts = (row["attempts"] if row else 0) + 1
+
+    if attempts >= JOB_MAX_ATTEMPTS:
+        db.execute(
+            "UPDATE jobs SET status = 'failed', attempts = ?, last_error = ?, locked_until = NULL, updated_at = ? WHERE key = ?",
+            (attempts, error, now, key)
+        )
+        return False
+
+    # Exponential backoff with jitter: ~2s, 4s, 8s, ...
+    delay = JOB_BACKOFF_BASE ** attempts + random.uniform(0, 1)
+    db.execute(
+        "UPDATE jobs SET status = 'queued', attempts = ?, last_error = ?, run_after = ?, locked_until = NULL, updated_at = ? WHERE key = ?",
+        (attempts, error, now + delay, now, key)
+    )
+    return True
+
+def stats() -> dict:
+    rows = get_db().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    return {r["status"]: r["n"] for r in rows}
+
+
+# --- Batch checkpoints (resumable batch commands) ---
+def mark_checkpoint(run: str, item: str, status: str):
+    get_db().execute(
+        "INSERT OR REPLACE INTO checkpoints (run, item, status, updated_at) VALUES (?, ?, ?, ?)",
+        (run, item, status, time.time())
+    )
+
+def finished_items(run: str, statuses: tuple) -> set:
+    placeholders = ",".join("?" * len(statuses))
+    rows = get_db().execute(
+        f"SELECT item FROM checkpoints WHERE run = ? AND status IN ({placeholders})",
+        (run, *statuses)
+    ).fetchall()
+    return {r["item"] for r in rows}
+
+def get_checkpoint(run: str, item: str):
+    """Status stored for one item (batch jobs also use it to keep a resume cursor)."""
+    row = get_db().execute(
+        "SELECT status FROM checkpoints WHERE run = ? AND item = ?", (run, item)
+    ).fetchone()
+    return row["status"] if row else None
+
+def checkpoint_summary(run: str) -> dict:
+    rows = get_db().execute(
+        "SELECT status, COUNT(*) AS n FROM checkpoints WHERE run = ? GROUP BY status", (run,)
+    ).fetchall()
+    return {r["status"]: r["n"] for r in rows}
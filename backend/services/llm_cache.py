@@ -0,0 +1,150 @@
+import hmac
+import time
+import sqlite3
+import hashlib
+import threading
+from cachetools import TTLCache
+from config import (
+    require_env,
+    LLM_CACHE_DB_PATH,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_MAX_ROWS,
+    LLM_PRICES,
+)
+import services.crypto_service as crypto_service
+
+# Cache of deterministic LLM responses (summaries, insights): same model,
+# same prompts, same input modulo whitespace -> same answer. In-process
+# TTL/LRU tier plus a SQLite file shared by the API and worker. Keys are an
+# HMAC, and stored responses are encrypted with the journal cipher.
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+def response_key(model: str, messages: list, json_mode: bool = False) -> str:
+    parts = [model, "json" if json_mode else "text"]
+    parts += [f"{m['role']}:{_normalize(m['content'])}" for m in messages]
+    return hmac.new(require_env("ENCRYPTION_KEY").encode(), "\x00".join(parts).encode(), hashlib.sha256).hexdigest()
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = LLM_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+class LLMResponseCache:
+    def __init__(self, db_path: str = None, ttl: float = LLM_CACHE_TTL, memory_entries: int = 2048, max_rows: int = 50_000):
+        # entry: (content, model, prompt_tokens, completion_tokens)
+        self.memory = TTLCache(maxsize=memory_entries, ttl=ttl)
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0, "evictions": 0}
+        self.tokens_saved = 0
+        self.usd_saved = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- persistent tier ---
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_lru ON llm_responses (last_used)")
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str):
+        db = self._db()
+        row = db.execute(
+            "SELECT response, model, prompt_tokens, completion_tokens, created_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[4] > self.ttl:
+            db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            with self._lock:
+                self.counters["expired"] += 1
+            return None
+        content = crypto_service.decrypt(row[0])
+        if content == crypto_service.DECRYPTION_ERROR:
+            return None
+        db.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return (content, row[1], row[2], row[3])
+
+    def _disk_put(self, key: str, entry: tuple):
+        db = self._db()
+        now = time.time()
+        content, model, prompt_tokens, completion_tokens = entry
+        db.execute(
+            "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, model, crypto_service.encrypt(content), prompt_tokens, completion_tokens, now, now)
+        )
+        overflow = db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_rows
+        if overflow > 0:
+            db.execute(
+                "DELETE FROM llm_responses WHERE key IN (SELECT key FROM llm_responses ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            with self._lock:
+                self.counters["evictions"] += overflow
+
+    # --- public API (blocking; call via asyncio.to_thread from async code) ---
+    def get(self, key: str):
+        """Cached response text, or None."""
+        with self._lock:
+            entry = self.memory.get(key)
+            tier = "memory_hits"
+        if entry is None and self.db_path:
+            entry = self._disk_get(key)
+            tier = "disk_hits"
+        with self._lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.memory[key] = entry
+            self.counters[tier] += 1
+            content, model, prompt_tokens, completion_tokens = entry
+            self.tokens_saved += prompt_tokens + completion_tokens
+            self.usd_saved += cost_usd(model, prompt_tokens, completion_tokens)
+            return content
+
+    def put(self, key: str, content: str, model: str, prompt_tokens: int, completion_tokens: int):
+        entry = (content, model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self.memory[key] = entry
+            self.counters["stores"] += 1
+        if self.db_path:
+            self._disk_put(key, entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "usd_saved": round(self.usd_saved, 4),
+                "memory_entries": len(self.memory),
+            }
+
+cache = LLMResponseCache(
+    db_path=LLM_CACHE_DB_PATH or None,
+    memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+    max_rows=LLM_CACHE_MAX_ROWS
+)
+
+def get_llm_cache() -> LLMResponseCache:
+    return cache
@@ -0,0 +1,261 @@
+import time
+import random
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from config import (
+    get_async_groq,
+    LLM_MODEL_LARGE,
+    LLM_MODEL_SMALL,
+    LLM_RPM_LARGE,
+    LLM_TPM_LARGE,
+    LLM_RPM_SMALL,
+    LLM_TPM_SMALL,
+    LLM_CONCURRENCY,
+    LLM_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_COOLDOWN,
+    LLM_ROUTE_MAX_WAIT,
+)
+from services.rate_limit import AsyncTokenBucket, PrioritySemaphore
+from services.llm_cache import get_llm_cache, response_key
+
+# Single entry point for Groq. Each model has request and token budgets
+# (waiters served by priority), a circuit breaker and counters; calls are
+# retried with jittered backoff on 429/5xx/timeouts, and routes with a
+# fallback model move to it while the primary is saturated or open.
+
+INTERACTIVE, BACKGROUND, BATCH = 0, 1, 2
+
+# task -> (model, fallback model, priority)
+ROUTES = {
+    "deepen": (LLM_MODEL_LARGE, LLM_MODEL_SMALL, INTERACTIVE),
+    "weekly": (LLM_MODEL_LARGE, LLM_MODEL_SMALL, INTERACTIVE),
+    "rollup": (LLM_MODEL_LARGE, LLM_MODEL_SMALL, INTERACTIVE),
+    "summary": (LLM_MODEL_SMALL, None, BACKGROUND),
+    # The precompute retries failed users on its next run - no need to degrade
+    "weekly_batch": (LLM_MODEL_LARGE, None, BATCH),
+}
+
+# Rough budget for the reply when estimating a call's tokens
+OUTPUT_TOKENS = 300
+
+def _retryable() -> tuple:
+    # groq is imported with the client (config.get_async_groq), not at startup
+    import groq
+    return (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+
+class LLMUnavailable(Exception):
+    """Retries exhausted or every candidate model's breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures; after `cooldown` one
+    trial call is let through (half-open) and its outcome decides.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.cooldown else "half_open"
+
+    def is_open(self) -> bool:
+        state = self.state
+        return state == "open" or (state == "half_open" and self.trial)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.trial:
+            return False
+        self.trial = True
+        return True
+
+    def record(self, ok):
+        """ok=True/False for an outcome, None when the call never finished (cancelled)."""
+        self.trial = False
+        if ok:
+            self.failures = 0
+            self.opened_at = None
+        elif ok is False:
+            self.failures += 1
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+class ModelLane:
+    def __init__(self, name: str, rpm: float, tpm: float):
+        self.name = name
+        # 10% burst + 90% refill: no sliding minute can exceed the limit
+        self.requests = AsyncTokenBucket(rate=rpm * 0.9 / 60, capacity=max(1, rpm * 0.1))
+        self.tokens = AsyncTokenBucket(rate=tpm * 0.9 / 60, capacity=max(1, tpm * 0.1))
+        # One waiter at a time takes from the buckets, chosen by priority
+        self.admission = PrioritySemaphore(1)
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN)
+        self.counters = Counter()
+
+    def expected_wait(self, tokens: float) -> float:
+        queued = self.admission.waiting + (self.admission.value == 0)
+        return max(
+            self.requests.wait_time(1 + queued),
+            self.tokens.wait_time(min(tokens, self.tokens.capacity) * (1 + queued))
+        )
+
+    async def admit(self, priority: int, tokens: float):
+        async with self.admission.slot(priority):
+            await self.requests.acquire(1)
+            await self.tokens.acquire(min(tokens, self.tokens.capacity))
+
+lanes = {
+    LLM_MODEL_LARGE: ModelLane(LLM_MODEL_LARGE, LLM_RPM_LARGE, LLM_TPM_LARGE),
+    LLM_MODEL_SMALL: ModelLane(LLM_MODEL_SMALL, LLM_RPM_SMALL, LLM_TPM_SMALL),
+}
+_inflight = PrioritySemaphore(LLM_CONCURRENCY)
+_client = None
+
+def _groq():
+    global _client
+    if _client is None:
+        # Retries and timeouts are ours, not the SDK's
+        _client = get_async_groq().with_options(max_retries=0, timeout=LLM_TIMEOUT)
+    return _client
+
+def estimate_tokens(messages: list) -> int:
+    return sum(len(m["content"]) for m in messages) // 4 + OUTPUT_TOKENS
+
+def _pick(task: str, tokens: int) -> tuple:
+    """(lane, priority) for this attempt."""
+    model, fallback, priority = ROUTES[task]
+    lane = lanes[model]
+    if fallback and not lanes[fallback].breaker.is_open():
+        if lane.breaker.is_open() or (priority == INTERACTIVE and lane.expected_wait(tokens) > LLM_ROUTE_MAX_WAIT):
+            lane.counters["rerouted"] += 1
+            return lanes[fallback], priority
+    return lane, priority
+
+def _backoff(attempt: int, error: Exception) -> float:
+    import groq
+    retry_after = None
+    if isinstance(error, groq.RateLimitError):
+        try:
+            retry_after = float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    if retry_after is not None:
+        return retry_after + random.uniform(0, 0.5)
+    delay = min(8.0, 0.5 * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+@asynccontextmanager
+async def _attempt(lane: ModelLane, priority: int, tokens: int):
+    """One call on one model: breaker check, budgets, an in-flight slot, outcome bookkeeping."""
+    import groq
+    if not lane.breaker.allow():
+        lane.counters["rejected"] += 1
+        raise LLMUnavailable(f"{lane.name} circuit is open")
+    ok = None
+    try:
+        await lane.admit(priority, tokens)
+        async with _inflight.slot(priority):
+            lane.counters["calls"] += 1
+            yield
+        ok = True
+    except _retryable() as e:
+        ok = False
+        lane.counters["errors"] += 1
+        if isinstance(e, groq.RateLimitError):
+            lane.counters["rate_limited"] += 1
+            # Everyone queued on this model backs off, not just this call
+            lane.requests.penalize(_backoff(0, e))
+        raise
+    except groq.APIStatusError:
+        # The model answered; the request itself was bad
+        ok = True
+        raise
+    finally:
+        lane.breaker.record(ok)
+
+async def complete(task: str, messages: list, json_mode: bool = False, parse=None, cache: bool = False):
+    """
+    One completion for `task` (see ROUTES), passed through `parse` if given.
+    Raises LLMUnavailable, or whatever `parse` raises. With cache=True,
+    an identical earlier call answers instead - only parseable replies
+    from the route's own model are stored.
+    """
+    parse = parse or (lambda content: content)
+    model = ROUTES[task][0]
+    if cache:
+        key = response_key(model, messages, json_mode)
+        content = await asyncio.to_thread(get_llm_cache().get, key)
+        if content is not None:
+            return parse(content)
+
+    tokens = estimate_tokens(messages)
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        lane, priority = _pick(task, tokens)
+        try:
+            async with _attempt(lane, priority, tokens):
+                completion = await _groq().chat.completions.create(messages=messages, model=lane.name, **extra)
+            break
+        except _retryable() as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise LLMUnavailable(f"{task}: giving up after {attempt + 1} attempts ({e!r})") from e
+            await asyncio.sleep(_backoff(attempt, e))
+
+    content = completion.choices[0].message.content
+    result = parse(content)
+    if cache and lane.name == model:
+        usage = completion.usage
+        prompt_tokens = usage.prompt_tokens if usage else tokens - OUTPUT_TOKENS
+        completion_tokens = usage.completion_tokens if usage else len(content) // 4
+        await asyncio.to_thread(get_llm_cache().put, key, content, model, prompt_tokens, completion_tokens)
+    return result
+
+async def stream(task: str, messages: list):
+    """
+    Yields content deltas as they arrive. Retried only until the first
+    delta - after that a failure surfaces as LLMUnavailable.
+    """
+    tokens = estimate_tokens(messages)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        lane, priority = _pick(task, tokens)
+        started = False
+        try:
+            async with _attempt(lane, priority, tokens):
+                response = await _groq().chat.completions.create(messages=messages, model=lane.name, stream=True)
+                async for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        started = True
+                        yield delta
+            return
+        except _retryable() as e:
+            if started or attempt == LLM_MAX_RETRIES:
+                raise LLMUnavailable(f"{task}: stream failed ({e!r})") from e
+            await asyncio.sleep(_backoff(attempt, e))
+
+def stats() -> dict:
+    return {
+        "in_flight": LLM_CONCURRENCY - _inflight.value,
+        "queued": _inflight.waiting,
+        "models": {
+            name: {
+                **lane.counters,
+                "breaker": lane.breaker.state,
+                "queued": lane.admission.waiting,
+                "requests_available": round(lane.requests.tokens, 1),
+                "tokens_available": round(lane.tokens.tokens),
+            }
+            for name, lane in lanes.items()
+        },
+    }
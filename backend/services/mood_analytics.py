@@ -0,0 +1,142 @@
+import numpy as np
+from datetime import datetime
+
+# Deterministic mood statistics over a user's mood_entries, vectorised with
+# NumPy so multi-year histories stay in the millisecond range. Entries are
+# averaged per calendar day (UTC) first; all windows are in calendar days,
+# so gaps in logging don't stretch a "7-day" mean over three weeks.
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ROLLING_WINDOWS = (7, 30)
+TREND_MIN_DAYS = 3
+# On the 1-5 scale: the fitted line must move this much across the period to
+# count as Rising/Falling, and day-to-day swings this large read as Volatile
+TREND_MIN_CHANGE = 0.5
+VOLATILE_THRESHOLD = 1.25
+# ...and the line has to explain at least this share of the variance (R^2),
+# so a noisy but flat week isn't called a trend
+TREND_MIN_FIT = 0.3
+
+def daily_scores(moods: list) -> tuple:
+    """(days, mean score per day) sorted by day, as datetime64[D] and float arrays."""
+    if not moods:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    days = np.array([m["created_at"][:10] for m in moods], dtype="datetime64[D]")
+    scores = np.array([m["mood_score"] for m in moods], dtype=float)
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    sums = np.bincount(inverse, weights=scores)
+    counts = np.bincount(inverse)
+    return unique_days, sums / counts
+
+def rolling_means(days: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of logged days within each trailing `window` calendar days, one value per calendar day."""
+    offsets = (days - days[0]).astype(int)
+    span = offsets[-1] + 1
+    sums = np.zeros(span)
+    counts = np.zeros(span)
+    sums[offsets] = values
+    counts[offsets] = 1
+    csum = np.concatenate(([0.0], np.cumsum(sums)))
+    ccount = np.concatenate(([0.0], np.cumsum(counts)))
+    ends = np.arange(1, span + 1)
+    starts = np.maximum(ends - window, 0)
+    window_counts = ccount[ends] - ccount[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, (csum[ends] - csum[starts]) / window_counts, np.nan)
+
+def streaks(days: np.ndarray, today: np.datetime64) -> tuple:
+    """(current, longest) runs of consecutive logged days; the current run may end today or yesterday."""
+    offsets = (days - days[0]).astype(int)
+    breaks = np.flatnonzero(np.diff(offsets) != 1) + 1
+    run_starts = np.concatenate(([0], breaks))
+    run_lengths = np.diff(np.concatenate((run_starts, [len(days)])))
+    current = int(run_lengths[-1]) if (today - days[-1]).astype(int) <= 1 else 0
+    return current, int(run_lengths.max())
+
+def weekday_means(days: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Mean daily score per weekday (Monday first); NaN for weekdays never logged."""
+    # 1970-01-01 was a Thursday
+    weekday = (days.astype(int) + 3) % 7
+    sums = np.bincount(weekday, weights=values, minlength=7)
+    counts = np.bincount(weekday, minlength=7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+def classify_trend(days: np.ndarray, values: np.ndarray) -> tuple:
+    """(trend, change) where change is the fitted line's rise across the period."""
+    if len(values) < TREND_MIN_DAYS:
+        return None, None
+    x = (days - days[0]).astype(float)
+    slope, intercept = np.polyfit(x, values, 1)
+    change = slope * x[-1]
+    residual = ((values - (slope * x + intercept)) ** 2).sum()
+    total = ((values - values.mean()) ** 2).sum()
+    fit = 1 - residual / total if total else 0.0
+    volatility = np.abs(np.diff(values)).mean()
+    if volatility >= VOLATILE_THRESHOLD and abs(change) < volatility:
+        return "Volatile", change
+    if fit >= TREND_MIN_FIT and change >= TREND_MIN_CHANGE:
+        return "Rising", change
+    if fit >= TREND_MIN_FIT and change <= -TREND_MIN_CHANGE:
+        return "Falling", change
+    return "Stable", change
+
+def _num(value):
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+def compute_stats(moods: list, today: str = None) -> dict:
+    """
+    Summary statistics for a list of mood_entries rows ({created_at, mood_score}).
+    `today` (YYYY-MM-DD) anchors the current streak; defaults to the UTC date.
+    """
+    days, values = daily_scores(moods)
+    if not len(days):
+        return {"entries": 0, "days_logged": 0, "trend": None}
+
+    today = np.datetime64(today or datetime.utcnow().date().isoformat(), "D")
+    current_streak, longest_streak = streaks(days, today)
+    by_weekday = weekday_means(days, values)
+    trend, change = classify_trend(days, values)
+
+    logged = ~np.isnan(by_weekday)
+    best = worst = None
+    if logged.sum() >= 2:
+        best = WEEKDAYS[int(np.nanargmax(by_weekday))]
+        worst = WEEKDAYS[int(np.nanargmin(by_weekday))]
+
+    return {
+        "entries": len(moods),
+        "days_logged": len(days),
+        "first_day": str(days[0]),
+        "last_day": str(days[-1]),
+        "mean": _num(values.mean()),
+        "std": _num(values.std()),
+        "rolling_mean": {f"{w}d": _num(rolling_means(days, values, w)[-1]) for w in ROLLING_WINDOWS},
+        "volatility": _num(np.abs(np.diff(values)).mean()) if len(values) > 1 else None,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "weekday_means": {WEEKDAYS[i]: _num(by_weekday[i]) for i in range(7)},
+        "best_weekday": best,
+        "worst_weekday": worst,
+        "trend": trend,
+        "trend_change": _num(change),
+    }
+
+def describe(stats: dict) -> str:
+    """Plain-text facts for the LLM prompt."""
+    if not stats["days_logged"]:
+        return "No moods logged.\n"
+    lines = [
+        f"- Mood logged on {stats['days_logged']} day(s), {stats['entries']} entries",
+        f"- Average mood: {stats['mean']}/5 (spread {stats['std']})",
+    ]
+    if stats["volatility"] is not None:
+        lines.append(f"- Average day-to-day change: {stats['volatility']}")
+    if stats["trend"]:
+        lines.append(f"- Sentiment trend: {stats['trend']} (fitted change {stats['trend_change']:+})")
+    else:
+        lines.append("- Sentiment trend: not enough days logged to compute")
+    if stats["best_weekday"]:
+        lines.append(f"- Best day: {stats['best_weekday']}, hardest day: {stats['worst_weekday']}")
+    lines.append(f"- Longest logging streak: {stats['longest_streak']} day(s)")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,96 @@
+import uuid
+import asyncio
+import weakref
+from datetime import date, datetime, timezone, tzinfo
+from cachetools import TTLCache
+from config import MOOD_INDEX_USERS, MOOD_INDEX_TTL, MOOD_ZONE_TTL
+from repositories import moods as moods_repo
+
+# "Has this user logged a mood today?" from memory. Each user's latest
+# mood time is cached - written on insert, loaded once on a miss - and
+# compared with today in the user's timezone. Logging is serialized per
+# user, and the row id is derived from (user, local day), so two workers
+# logging the same day for the same zone collide on the primary key.
+#
+# The zone comes from the client (X-Timezone) and isn't stored anywhere,
+# so the key is only as stable as the header. Each worker pins the zone
+# of a user's first log for MOOD_ZONE_TTL, which stops a client that
+# changes its header from getting a second day out of the same worker;
+# across workers with different headers a second mood is still possible.
+
+MOOD_DAY_NAMESPACE = uuid.UUID("7d4f1c2e-2b8a-4c5e-9f36-0c1e8a9b5d21")
+
+# Cached for users with no moods at all
+NEVER = datetime.min.replace(tzinfo=timezone.utc)
+
+class MoodAlreadyLogged(Exception):
+    """The user has a mood for today (in their timezone)."""
+
+def mood_day_id(user_id: str, day: date) -> str:
+    return str(uuid.uuid5(MOOD_DAY_NAMESPACE, f"{user_id}:{day.isoformat()}"))
+
+def _parse(created_at: str) -> datetime:
+    moment = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+class MoodDayIndex:
+    def __init__(self, maxsize: int, ttl: float, zone_ttl: float = 86400):
+        # user_id -> latest created_at (aware), or NEVER
+        self.latest = TTLCache(maxsize=maxsize, ttl=ttl)
+        # user_id -> zone of their first log, used until it expires
+        self.zones = TTLCache(maxsize=maxsize, ttl=zone_ttl)
+        # Only users with a log in progress keep a lock
+        self._locks = weakref.WeakValueDictionary()
+        self.counters = {"hits": 0, "misses": 0, "inserts": 0, "duplicates": 0, "conflicts": 0}
+
+    def record(self, user_id: str, created_at: datetime):
+        current = self.latest.get(user_id)
+        if current is None or created_at > current:
+            self.latest[user_id] = created_at
+
+    async def last_logged(self, user_id: str) -> datetime:
+        moment = self.latest.get(user_id)
+        if moment is not None:
+            self.counters["hits"] += 1
+            return moment
+        self.counters["misses"] += 1
+        row = await moods_repo.latest(user_id)
+        self.record(user_id, _parse(row["created_at"]) if row else NEVER)
+        return self.latest.get(user_id, NEVER)
+
+    async def logged_today(self, user_id: str, tz: tzinfo) -> bool:
+        tz = self.zones.get(user_id, tz)
+        moment = await self.last_logged(user_id)
+        return moment is not NEVER and moment.astimezone(tz).date() == datetime.now(tz).date()
+
+    async def log(self, user_id: str, tz: tzinfo, data: dict) -> dict:
+        """Inserts today's mood, or raises MoodAlreadyLogged."""
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            tz = self.zones.setdefault(user_id, tz)
+            if await self.logged_today(user_id, tz):
+                self.counters["duplicates"] += 1
+                raise MoodAlreadyLogged()
+            day = datetime.now(tz).date()
+            from postgrest.exceptions import APIError
+            try:
+                row = await moods_repo.insert({**data, "id": mood_day_id(user_id, day)})
+            except APIError as e:
+                if e.code != "23505":
+                    raise
+                # Logged through another worker since our entry was loaded
+                self.counters["conflicts"] += 1
+                self.latest.pop(user_id, None)
+                raise MoodAlreadyLogged() from e
+            if row:
+                self.counters["inserts"] += 1
+                self.record(user_id, _parse(row["created_at"]))
+            return row
+
+    def stats(self) -> dict:
+        return {**self.counters, "users": len(self.latest)}
+
+index = MoodDayIndex(maxsize=MOOD_INDEX_USERS, ttl=MOOD_INDEX_TTL, zone_ttl=MOOD_ZONE_TTL)
+
+def get_mood_index() -> MoodDayIndex:
+    return index
@@ -0,0 +1,223 @@
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from config import (
+    API_NINJAS_KEY,
+    QUOTES_API_URL,
+    QUOTES_DB_PATH,
+    QUOTES_TIMEOUT,
+    QUOTES_REFRESH_SECONDS,
+    QUOTES_RETRY_SECONDS,
+    QUOTES_POOL_MAX,
+)
+
+# Quote of the day, shared by every API worker through a SQLite file.
+# Requests only read: memory, then the file, then - if the day was never
+# fetched - a pick from the local pool that is the same in every worker.
+# Fetching happens in the background (run_prefetch keeps today and
+# tomorrow filled): one task per day per process, and a lease row so only
+# one worker calls API Ninjas per QUOTES_RETRY_SECONDS.
+
+FALLBACK_QUOTES = [
+    {"quote": "The only journey is the one within.", "author": "Rainer Maria Rilke"},
+    {"quote": "Knowing yourself is the beginning of all wisdom.", "author": "Aristotle"},
+    {"quote": "The unexamined life is not worth living.", "author": "Socrates"},
+    {"quote": "What we think, we become.", "author": "Buddha"},
+    {"quote": "Well begun is half done.", "author": "Aristotle"},
+    {"quote": "It does not matter how slowly you go as long as you do not stop.", "author": "Confucius"},
+    {"quote": "The journey of a thousand miles begins with one step.", "author": "Lao Tzu"},
+    {"quote": "You have power over your mind - not outside events. Realize this, and you will find strength.", "author": "Marcus Aurelius"},
+    {"quote": "Fill your paper with the breathings of your heart.", "author": "William Wordsworth"},
+    {"quote": "Nothing is permanent in this wicked world - not even our troubles.", "author": "Charlie Chaplin"},
+    {"quote": "Keep your face always toward the sunshine, and shadows will fall behind you.", "author": "Walt Whitman"},
+    {"quote": "Be patient toward all that is unsolved in your heart.", "author": "Rainer Maria Rilke"},
+]
+
+def _day(offset: int = 0) -> str:
+    return (datetime.utcnow().date() + timedelta(days=offset)).isoformat()
+
+class QuoteProvider:
+    def __init__(self, db_path: str, api_url: str, api_key: str = None, timeout: float = 3.0,
+                 retry_seconds: float = 60.0, pool_max: int = 365):
+        # day -> quote; only today and tomorrow are kept
+        self.memory = {}
+        self.db_path = db_path
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.pool_max = pool_max
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "fallbacks": 0, "fetches": 0, "fetch_errors": 0, "lease_skips": 0}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._picks = {}
+        self._refreshing = {}
+
+    # --- shared tier ---
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_quotes (
+                    day TEXT PRIMARY KEY,
+                    quote TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            # Every fetched quote, for days when API Ninjas can't be reached
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quote_pool (quote TEXT PRIMARY KEY, author TEXT NOT NULL, added_on TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS quote_leases (day TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, day: str, quote: dict):
+        today = _day()
+        with self._lock:
+            self.memory[day] = quote
+            for old in [d for d in self.memory if d < today]:
+                del self.memory[old]
+
+    def _disk_get(self, day: str):
+        row = self._db().execute("SELECT quote, author FROM daily_quotes WHERE day = ?", (day,)).fetchone()
+        if row is None:
+            return None
+        quote = {"quote": row[0], "author": row[1]}
+        self._remember(day, quote)
+        return quote
+
+    def _store(self, day: str, quote: dict) -> dict:
+        """Keeps the first quote stored for `day` (another worker may have won) and returns it."""
+        db = self._db()
+        db.execute("INSERT OR IGNORE INTO daily_quotes VALUES (?, ?, ?, ?)", (day, quote["quote"], quote["author"], time.time()))
+        db.execute("INSERT OR IGNORE INTO quote_pool VALUES (?, ?, ?)", (quote["quote"], quote["author"], _day()))
+        db.execute(
+            "DELETE FROM quote_pool WHERE quote IN (SELECT quote FROM quote_pool ORDER BY added_on DESC LIMIT -1 OFFSET ?)",
+            (self.pool_max,)
+        )
+        cutoff = _day(-30)
+        db.execute("DELETE FROM daily_quotes WHERE day < ?", (cutoff,))
+        db.execute("DELETE FROM quote_leases WHERE day < ?", (cutoff,))
+        return self._disk_get(day)
+
+    def _acquire_lease(self, day: str) -> bool:
+        """At most one fetch attempt for `day` per retry window, across workers."""
+        now = time.time()
+        cursor = self._db().execute(
+            """
+            INSERT INTO quote_leases VALUES (?, ?)
+            ON CONFLICT (day) DO UPDATE SET expires_at = excluded.expires_at WHERE quote_leases.expires_at < ?
+            """,
+            (day, now + self.retry_seconds, now)
+        )
+        return cursor.rowcount == 1
+
+    def pool_pick(self, day: str) -> dict:
+        """
+        Stand-in quote for a day with nothing stored. Only pool entries
+        added before `day` count, so the pick is stable all day and the
+        same in every worker.
+        """
+        pick = self._picks.get(day)
+        if pick is None:
+            rows = self._db().execute(
+                "SELECT quote, author FROM quote_pool WHERE added_on < ? ORDER BY quote", (day,)
+            ).fetchall()
+            pool = FALLBACK_QUOTES + [{"quote": q, "author": a} for q, a in rows]
+            pick = pool[int(hashlib.sha256(day.encode()).hexdigest(), 16) % len(pool)]
+            self._picks = {day: pick}
+        return pick
+
+    # --- upstream ---
+    async def _fetch(self, day: str):
+        import httpx
+        if await asyncio.to_thread(self._disk_get, day):
+            return
+        if not await asyncio.to_thread(self._acquire_lease, day):
+            with self._lock:
+                self.counters["lease_skips"] += 1
+            return
+        with self._lock:
+            self.counters["fetches"] += 1
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                # Hard cap on the whole call, not just on each read
+                response = await asyncio.wait_for(
+                    client.get(self.api_url, headers={"X-Api-Key": self.api_key}), self.timeout
+                )
+            response.raise_for_status()
+            raw = response.json()[0]
+            quote = {"quote": raw["quote"], "author": raw.get("author") or "Unknown"}
+        except (httpx.HTTPError, asyncio.TimeoutError, ValueError, LookupError, TypeError) as e:
+            with self._lock:
+                self.counters["fetch_errors"] += 1
+            print(f"⚠️ [Quotes] Fetching the quote for {day} failed: {e!r}")
+            return
+        await asyncio.to_thread(self._store, day, quote)
+
+    def refresh(self, day: str) -> asyncio.Task:
+        """Starts a background fetch for `day`, or returns the one already running."""
+        task = self._refreshing.get(day)
+        if task is None or task.done():
+            task = asyncio.create_task(self._fetch(day))
+            self._refreshing = {d: t for d, t in self._refreshing.items() if not t.done()}
+            self._refreshing[day] = task
+        return task
+
+    # --- public API ---
+    async def get_daily_quote(self) -> dict:
+        """Today's quote. Never waits on the network."""
+        day = _day()
+        quote = self.memory.get(day)
+        if quote is not None:
+            with self._lock:
+                self.counters["memory_hits"] += 1
+            return quote
+        quote = await asyncio.to_thread(self._disk_get, day)
+        if quote is not None:
+            with self._lock:
+                self.counters["disk_hits"] += 1
+            return quote
+        with self._lock:
+            self.counters["fallbacks"] += 1
+        if self.api_key:
+            self.refresh(day)
+        return await asyncio.to_thread(self.pool_pick, day)
+
+    async def run_prefetch(self, interval: float = QUOTES_REFRESH_SECONDS):
+        """Keeps today's and tomorrow's quote stored, so midnight is a cache hit."""
+        if not self.api_key:
+            print("⚠️ [Quotes] API_NINJAS_KEY not set - serving the fallback pool")
+            return
+        while True:
+            try:
+                for day in (_day(), _day(1)):
+                    if day not in self.memory:
+                        await self.refresh(day)
+            except Exception as e:
+                # e.g. the SQLite file is locked or unwritable - try again next round
+                print(f"⚠️ [Quotes] Prefetch failed: {e!r}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "days_cached": sorted(self.memory)}
+
+provider = QuoteProvider(
+    db_path=QUOTES_DB_PATH,
+    api_url=QUOTES_API_URL,
+    api_key=API_NINJAS_KEY,
+    timeout=QUOTES_TIMEOUT,
+    retry_seconds=QUOTES_RETRY_SECONDS,
+    pool_max=QUOTES_POOL_MAX
+)
+
+def get_quote_provider() -> QuoteProvider:
+    return provider
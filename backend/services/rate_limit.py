@@ -0,0 +1,90 @@
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+
+class AsyncTokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursts up to `capacity`.
+    acquire() waits until enough tokens are available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` would be available, ignoring anyone already waiting."""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """Pushes the bucket into debt so nothing is granted for `seconds` (e.g. after a 429)."""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+class PrioritySemaphore:
+    """
+    Semaphore whose waiters are served by priority (lower first), FIFO
+    within a priority. A freed slot goes straight to the next waiter.
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+        self._waiters = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: int = 0):
+        if self.value > 0 and not self._waiters:
+            self.value -= 1
+            return
+        entry = (priority, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].done() and not entry[2].cancelled():
+                # Handed a slot just as we were cancelled - pass it on
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.value += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,75 @@
+import time
+import asyncio
+from cachetools import TTLCache
+
+class SingleFlightCache:
+    """
+    Short-TTL cache with request coalescing for expensive async calls.
+    Concurrent callers with the same key share one computation, and a
+    finished result is served from memory until it expires.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}
+        self.counters = {"hits": 0, "coalesced": 0, "misses": 0, "errors": 0}
+        self.saved_seconds = 0.0
+
+    async def get_or_compute(self, key, compute):
+        hit = self._results.get(key)
+        if hit is not None:
+            value, cost = hit
+            self.counters["hits"] += 1
+            self.saved_seconds += cost
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+            value, cost = await asyncio.shield(task)
+            self.saved_seconds += cost
+            return value
+
+        async def run():
+            start = time.perf_counter()
+            try:
+                value = await compute()
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            cost = time.perf_counter() - start
+            # Stored by the task itself, so it lands even if the first caller went away
+            self._results[key] = (value, cost)
+            return value, cost
+
+        self.counters["misses"] += 1
+        task = asyncio.create_task(run())
+        self._inflight[key] = task
+        value, _ = await asyncio.shield(task)
+        return value
+
+    def peek(self, key):
+        """Cached value or None, counted as a hit. Doesn't join in-flight work."""
+        hit = self._results.get(key)
+        if hit is None:
+            return None
+        self.counters["hits"] += 1
+        self.saved_seconds += hit[1]
+        return hit[0]
+
+    def put(self, key, value, cost: float = 0.0):
+        """Stores a value computed outside get_or_compute (e.g. a finished stream)."""
+        self.counters["misses"] += 1
+        self._results[key] = (value, cost)
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["coalesced"] + self.counters["misses"]
+        served = self.counters["hits"] + self.counters["coalesced"]
+        return {
+            **self.counters,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": len(self._results),
+        }
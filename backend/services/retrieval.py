@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import threading
+import numpy as np
+from cachetools import LRUCache
+from config import (
+    RETRIEVAL_BACKEND,
+    RETRIEVAL_INDEX_DIR,
+    RETRIEVAL_INDEX_TTL,
+    RETRIEVAL_INDEX_CACHE_USERS,
+    RETRIEVAL_IVF_MIN_VECTORS,
+    RETRIEVAL_IVF_NPROBE,
+)
+from repositories import journals as journals_repo
+
+# Retrieval backends for "related past entries". Both return rows shaped
+# like match_journals: {id, journal_id, content (encrypted chunk), similarity},
+# best first, similarity >= threshold.
+
+class RpcRetriever:
+    """
+    Exact search in Postgres via the match_journals RPC. The RPC must return
+    journal_id with each chunk; /journals/search skips rows without it.
+    """
+
+    name = "rpc"
+
+    async def search(self, user_id: str, query: list, threshold: float, k: int) -> list:
+        return await journals_repo.match(query, user_id, threshold=threshold, count=k)
+
+    def invalidate(self, user_id: str):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+class UserIndex:
+    """
+    One user's chunk vectors, L2-normalised float32, memory-mapped from disk.
+    Small users are searched brute force; past RETRIEVAL_IVF_MIN_VECTORS an
+    IVF layout (spherical k-means lists, vectors stored list by list) limits
+    each query to the RETRIEVAL_IVF_NPROBE closest lists.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.centroids = None
+        if self.meta["kind"] == "ivf":
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.offsets = np.load(os.path.join(path, "offsets.npy"))
+
+    @property
+    def built_at(self) -> float:
+        return self.meta["built_at"]
+
+    def search(self, query: np.ndarray, threshold: float, k: int, nprobe: int = RETRIEVAL_IVF_NPROBE) -> list:
+        if not len(self.vectors):
+            return []
+        if self.centroids is None:
+            candidates = np.arange(len(self.vectors))
+            scores = self.vectors @ query
+        else:
+            lists = np.argsort(-(self.centroids @ query))[:nprobe]
+            candidates = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+            scores = self.vectors[candidates] @ query
+
+        keep = np.flatnonzero(scores >= threshold)
+        if len(keep) > k:
+            keep = keep[np.argpartition(-scores[keep], k - 1)[:k]]
+        keep = keep[np.argsort(-scores[keep])]
+        return [
+            {
+                "id": self.meta["ids"][candidates[i]],
+                "journal_id": self.meta["journal_ids"][candidates[i]],
+                "content": self.meta["contents"][candidates[i]],
+                "similarity": float(scores[i]),
+            }
+            for i in keep
+        ]
+
+def parse_embedding(value) -> list:
+    """pgvector columns come back from PostgREST as "[0.1,...]" strings."""
+    return json.loads(value) if isinstance(value, str) else value
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def _kmeans(vectors: np.ndarray, lists: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample; returns normalised centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), lists * 64), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = np.bincount(assign, minlength=lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    return centroids
+
+def write_index(path: str, rows: list, built_at: float, ivf_min: int = RETRIEVAL_IVF_MIN_VECTORS):
+    """Builds the on-disk layout for `rows` ({id, journal_id, content_chunk_encrypted, embedding})."""
+    embeddings = [parse_embedding(r["embedding"]) for r in rows]
+    vectors = normalize(np.asarray(embeddings, dtype=np.float32)) if rows else np.zeros((0, 0), np.float32)
+    order = np.arange(len(rows))
+    kind = "flat"
+
+    tmp = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp, exist_ok=True)
+    if len(rows) >= ivf_min:
+        kind = "ivf"
+        lists = int(np.sqrt(len(rows)))
+        centroids = _kmeans(vectors, lists)
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=lists))))
+        np.save(os.path.join(tmp, "centroids.npy"), centroids)
+        np.save(os.path.join(tmp, "offsets.npy"), offsets)
+
+    np.save(os.path.join(tmp, "vectors.npy"), vectors[order])
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({
+            "kind": kind,
+            "built_at": built_at,
+            "ids": [rows[i]["id"] for i in order],
+            "journal_ids": [rows[i]["journal_id"] for i in order],
+            # Still encrypted - same as what the RPC returns
+            "contents": [rows[i]["content_chunk_encrypted"] for i in order],
+        }, f)
+
+    # Swap in whole; a reader holding the old files keeps its mapping
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another process won the race - theirs is just as fresh
+        shutil.rmtree(tmp, ignore_errors=True)
+
+class LocalRetriever:
+    """
+    Per-user in-process index, rebuilt from journal_vectors on first use,
+    after invalidate(user_id) (called whenever a user's vectors change -
+    also from the worker, via a marker file next to the index) or after
+    RETRIEVAL_INDEX_TTL as a safety net across hosts.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = RETRIEVAL_INDEX_DIR, ttl: float = RETRIEVAL_INDEX_TTL, cache_users: int = RETRIEVAL_INDEX_CACHE_USERS):
+        self.root = root
+        self.ttl = ttl
+        self.loaded = LRUCache(maxsize=cache_users)
+        self.counters = {"searches": 0, "builds": 0, "loads": 0}
+        self._building = {}
+
+    def _paths(self, user_id: str) -> tuple:
+        key = hashlib.sha256(user_id.encode()).hexdigest()[:32]
+        return os.path.join(self.root, key), os.path.join(self.root, f"{key}.invalidated")
+
+    def invalidate(self, user_id: str):
+        path, marker = self._paths(user_id)
+        os.makedirs(self.root, exist_ok=True)
+        # Its mtime is the invalidation time
+        with open(marker, "w"):
+            pass
+        self.loaded.pop(user_id, None)
+
+    def _fresh(self, index: UserIndex, marker: str) -> bool:
+        if time.time() - index.built_at > self.ttl:
+            return False
+        try:
+            return os.stat(marker).st_mtime < index.built_at
+        except FileNotFoundError:
+            return True
+
+    def _load(self, path: str, marker: str, cached):
+        """
+        `cached` or the on-disk index if it is still fresh, else None.
+        Blocking, and never touches self.loaded: the LRU isn't thread-safe,
+        so only the event loop reads and writes it.
+        """
+        index = cached
+        if index is None:
+            try:
+                index = UserIndex(path)
+            except (FileNotFoundError, ValueError):
+                return None
+        return index if self._fresh(index, marker) else None
+
+    async def _build(self, user_id: str) -> UserIndex:
+        # Timestamp before reading, so a write that lands mid-build invalidates the result
+        built_at = time.time()
+        rows = await journals_repo.list_user_vectors(user_id)
+        path, _ = self._paths(user_id)
+        await asyncio.to_thread(write_index, path, rows, built_at)
+        self.counters["builds"] += 1
+        return await asyncio.to_thread(UserIndex, path)
+
+    async def index_for(self, user_id: str) -> UserIndex:
+        path, marker = self._paths(user_id)
+        cached = self.loaded.get(user_id)
+        index = await asyncio.to_thread(self._load, path, marker, cached)
+        if index is not None:
+            if index is not cached:
+                self.counters["loads"] += 1
+            self.loaded[user_id] = index
+            return index
+        # One build per user at a time; concurrent searches wait for it
+        task = self._building.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._build(user_id))
+            self._building[user_id] = task
+            task.add_done_callback(lambda _: self._building.pop(user_id, None))
+        index = await asyncio.shield(task)
+        self.loaded[user_id] = index
+        return index
+
+    async def search(self, user_id: str, query: list, threshold: float, k: int) -> list:
+        index = await self.index_for(user_id)
+        self.counters["searches"] += 1
+        q = normalize(np.asarray(query, dtype=np.float32))
+        return index.search(q, threshold, k)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self.counters, "users_loaded": len(self.loaded)}
+
+retriever = LocalRetriever() if RETRIEVAL_BACKEND == "local" else RpcRetriever()
+
+def get_retriever():
+    return retriever
@@ -0,0 +1,139 @@
+import re
+import hmac
+import math
+import asyncio
+import hashlib
+from collections import Counter, defaultdict
+from config import (
+    require_env,
+    SEARCH_INDEX_KEY,
+    SEARCH_POSTINGS_PER_TERM,
+    SEARCH_VECTOR_THRESHOLD,
+    SEARCH_CANDIDATES,
+    SEARCH_RRF_K,
+)
+from repositories import journals as journals_repo
+from repositories import search_terms as terms_repo
+from services.retrieval import get_retriever
+
+# Hybrid journal search. Keyword side: a blind inverted index - every term
+# is HMAC(key, user_id + word), so the database can match equal words but
+# never learn them, and the same word differs between users. Scored BM25
+# style over per-field weights. Semantic side: the retrieval backend over
+# journal_vectors. The two rankings are merged with reciprocal-rank fusion.
+
+_KEY = None
+_WORD = re.compile(r"[^\W_]+")
+
+FIELD_BOOST = {"content": 1.0, "summary": 2.0, "tags": 3.0}
+BM25_K1 = 1.2
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i if in into is it its me my "
+    "of on or our she so that the their them then there they this to was we were what when which "
+    "who will with you your just very really also been am do did not no".split()
+)
+
+def normalize(word: str) -> str:
+    """Lowercase plus a light plural strip, so "walks" finds "walk"."""
+    word = word.lower()
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def tokens(text: str) -> list:
+    return [normalize(w) for w in _WORD.findall(text or "") if w.lower() not in STOPWORDS and len(w) > 1]
+
+def _key() -> bytes:
+    global _KEY
+    if _KEY is None:
+        _KEY = (SEARCH_INDEX_KEY or hmac.new(require_env("ENCRYPTION_KEY").encode(), b"journaly-search-index", hashlib.sha256).hexdigest()).encode()
+    return _KEY
+
+def term_key(user_id: str, token: str) -> str:
+    return hmac.new(_key(), f"{user_id}\x00{token}".encode(), hashlib.sha256).hexdigest()[:24]
+
+def term_weights(user_id: str, content: str, summary: str = None, tags: list = None) -> dict:
+    """{term: weight} for one journal; repeated words count sublinearly."""
+    weights = defaultdict(float)
+    fields = {"content": content, "summary": summary, "tags": " ".join(tags or [])}
+    for field, text in fields.items():
+        for token, tf in Counter(tokens(text)).items():
+            weights[term_key(user_id, token)] += FIELD_BOOST[field] * (1 + math.log(tf))
+    return {term: round(w, 3) for term, w in weights.items()}
+
+async def index_journal(journal_id: str, user_id: str, content: str, summary: str = None, tags: list = None) -> tuple:
+    """Brings the journal's terms up to date, writing only what changed. Returns (written, removed)."""
+    new = term_weights(user_id, content, summary, tags)
+    old = await terms_repo.list_for_journal(journal_id)
+    removed = [term for term in old if term not in new]
+    changed = [
+        {"journal_id": journal_id, "user_id": user_id, "term": term, "weight": weight}
+        for term, weight in new.items()
+        if old.get(term) != weight
+    ]
+    if removed:
+        await terms_repo.delete_terms(journal_id, removed)
+    if changed:
+        await terms_repo.upsert(changed)
+    return len(changed), len(removed)
+
+async def keyword_search(user_id: str, query: str) -> list:
+    """[(journal_id, score)] best first."""
+    terms = list(dict.fromkeys(term_key(user_id, t) for t in tokens(query)))
+    if not terms:
+        return []
+    *postings, total = await asyncio.gather(
+        *(terms_repo.postings(user_id, term, SEARCH_POSTINGS_PER_TERM) for term in terms),
+        journals_repo.count(user_id)
+    )
+    scores = defaultdict(float)
+    for rows in postings:
+        # Capped postings make very common terms look a little rarer; they score near zero either way
+        df = len(rows)
+        idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for row in rows:
+            w = row["weight"]
+            scores[row["journal_id"]] += idf * w * (BM25_K1 + 1) / (w + BM25_K1)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+async def semantic_search(user_id: str, query: str, embed) -> list:
+    """[(journal_id, similarity)] best chunk per journal, best first."""
+    query_vector = await embed(query)
+    if query_vector is None:
+        return []
+    hits = await get_retriever().search(user_id, query_vector, SEARCH_VECTOR_THRESHOLD, SEARCH_CANDIDATES)
+    best = {}
+    for hit in hits:
+        # match_journals versions that return only chunk columns can't be ranked per journal
+        journal_id = hit.get("journal_id")
+        if journal_id is not None:
+            best.setdefault(journal_id, hit["similarity"])
+    return list(best.items())
+
+def fuse(rankings: dict, k: int = SEARCH_RRF_K) -> list:
+    """Reciprocal-rank fusion of {source: [(id, score)...]} -> [(id, score, sources)] best first."""
+    fused = defaultdict(float)
+    sources = defaultdict(list)
+    for source, ranking in rankings.items():
+        for rank, (item_id, _) in enumerate(ranking):
+            fused[item_id] += 1 / (k + rank + 1)
+            sources[item_id].append(source)
+    return sorted(((i, s, sources[i]) for i, s in fused.items()), key=lambda item: -item[1])
+
+async def search(user_id: str, query: str, embed=None, limit: int = 20) -> list:
+    """
+    Fused [(journal_id, score, sources)]. `embed` (async text -> vector) adds
+    the semantic ranking; the keyword lookup runs while the query embeds.
+    """
+    if embed is None:
+        rankings = {"keyword": await keyword_search(user_id, query)}
+    else:
+        keyword, semantic = await asyncio.gather(
+            keyword_search(user_id, query),
+            semantic_search(user_id, query, embed)
+        )
+        rankings = {"keyword": keyword, "semantic": semantic}
+    return fuse(rankings)[:limit]
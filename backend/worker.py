@@ -0,0 +1,58 @@
+"""
+AI job worker. Runs separately from the API:
+
+    python worker.py
+
+Claims jobs from the SQLite queue (services/job_queue.py) and runs at most
+WORKER_CONCURRENCY of them at a time. Failed jobs are retried with
+exponential backoff until JOB_MAX_ATTEMPTS.
+"""
+import asyncio
+from config import WORKER_CONCURRENCY, WORKER_POLL_SECONDS, close_async_supabase
+from services import ai_service, job_queue
+
+# kind -> (handler, on_final_failure)
+HANDLERS = {
+    "process_journal": (ai_service.run_journal_job, ai_service.mark_journal_failed),
+}
+
+async def run_job(job: dict):
+    handler, on_failure = HANDLERS[job["kind"]]
+    try:
+        await handler(job["payload"])
+        await asyncio.to_thread(job_queue.complete, job["key"])
+    except Exception as e:
+        will_retry = await asyncio.to_thread(job_queue.fail, job["key"], str(e))
+        if will_retry:
+            print(f"⚠️ [Worker] {job['key']} failed (attempt {job['attempts'] + 1}), retrying: {e}")
+        else:
+            await on_failure(job["payload"], str(e))
+
+async def main():
+    running = set()
+    print(f"[Worker] started with concurrency {WORKER_CONCURRENCY}")
+
+    try:
+        while True:
+            free_slots = WORKER_CONCURRENCY - len(running)
+            jobs = await asyncio.to_thread(job_queue.claim, free_slots)
+
+            for job in jobs:
+                if job["kind"] not in HANDLERS:
+                    await asyncio.to_thread(job_queue.fail, job["key"], f"Unknown job kind {job['kind']}")
+                    continue
+                task = asyncio.create_task(run_job(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            if not jobs:
+                await asyncio.sleep(WORKER_POLL_SECONDS)
+            elif len(running) >= WORKER_CONCURRENCY:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        await close_async_supabase()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,17 +1,11 @@
-import { useQuery } from '@tanstack/react-query';
 import { Quote, RefreshCw } from 'lucide-react';
-import api from '../services/api';
+import useDashboard from '../hooks/useDashboard';
 
 const DailyQuoteWidget = () => {
   
-  const { data: quote, isLoading, isError} = useQuery({
-    queryKey: ['dailyQuote'],
-    queryFn: async () => {
-      const res = await api.get('/quotes/daily');
-      return res.data;
-    },
-    staleTime: 1000 * 60 * 60, // Cache for 1 hour on client side
-  });
+  const { data: dashboard, isLoading, isError: dashboardError } = useDashboard();
+  const quote = dashboard?.quote;
+  const isError = dashboardError || (!isLoading && !quote);
 
   return (
     <div className="bg-[#228B22] text-white p-6 rounded-3xl shadow-lg relative overflow-hidden flex flex-col justify-between h-full min-h-50">
@@ -3,7 +3,7 @@ import { useEditor, EditorContent } from '@tiptap/react';
 import StarterKit from '@tiptap/starter-kit';
 import { Sparkles, Wand2 } from 'lucide-react';
 import useVisualViewport from '../hooks/useVisualViewport';
-import api from '../services/api';
+import { streamEvents } from '../services/sse';
 
 const JournalEditor = ({ initialContent, onSave, isSaving, journalId, onChange }) => {
   const [aiPrompt, setAiPrompt] = useState(null);
@@ -42,12 +42,22 @@ const JournalEditor = ({ initialContent, onSave, isSaving, journalId, onChange }
     setAiPrompt(null);
 
     try {
-      const response = await api.post('/journals/deepen', {
-        content: text,
-        journal_id: journalId
+      // Tokens are shown as the model writes them
+      let prompt = "";
+      await streamEvents('/journals/deepen/stream', {
+        method: 'POST',
+        body: { content: text, journal_id: journalId },
+        onEvent: ({ event, data }) => {
+          if (event === 'token') {
+            prompt += data.text;
+            setAiPrompt(prompt);
+          } else if (event === 'done') {
+            setAiPrompt(data.prompt);
+          } else if (event === 'error') {
+            throw new Error(data.detail);
+          }
+        },
       });
-
-      setAiPrompt(response.data.prompt);
       
       // If it was a new entry, we might need to update the URL (handled by parent usually, 
       // but for now let's just show the prompt)
@@ -15,6 +15,7 @@ import {
 import { ChevronLeft, ChevronRight, Loader2 } from 'lucide-react';
 import api from '../services/api';
 import { UserAuth } from '../context/AuthContext';
+import useDashboard from '../hooks/useDashboard';
 
 const MoodCalendar = () => {
   const { session } = UserAuth();
@@ -27,8 +28,10 @@ const MoodCalendar = () => {
   const calendarStart = startOfWeek(monthStart);
   const calendarEnd = endOfWeek(monthEnd);
 
-  // Fetch Data
-  const { data: moodHistory, isLoading } = useQuery({
+  // Fetch Data - the current month comes with the dashboard, other months on demand
+  const { data: dashboard, isLoading: isLoadingDashboard, isError: dashboardError } = useDashboard();
+  const useDashboardMonth = isSameMonth(currentDate, new Date()) && !dashboardError;
+  const { data: history, isLoading: isLoadingHistory } = useQuery({
     queryKey: ['moodHistory', session?.user.id, format(currentDate, 'yyyy-MM')],
     queryFn: async () => {
       const res = await api.get('/moods/history', {
@@ -39,8 +42,10 @@ const MoodCalendar = () => {
       });
       return res.data;
     },
-    enabled: !!session?.user.id
+    enabled: !!session?.user.id && !useDashboardMonth
   });
+  const moodHistory = useDashboardMonth ? dashboard?.moods : history;
+  const isLoading = useDashboardMonth ? isLoadingDashboard : isLoadingHistory;
 
   // Helper to get color based on score
   const getMoodColor = (score) => {
@@ -12,6 +12,7 @@ import { useQuery } from '@tanstack/react-query';
 import { Loader2 } from 'lucide-react';
 import api from '../services/api';
 import { UserAuth } from '../context/AuthContext';
+import useDashboard from '../hooks/useDashboard';
 
 const MoodChart = () => {
   const { session } = UserAuth();
@@ -21,8 +22,9 @@ const MoodChart = () => {
   const startDate = startOfMonth(currentDate).toISOString();
   const endDate = endOfMonth(currentDate).toISOString();
 
-  // Fetch Data
-  const { data: rawData, isLoading } = useQuery({
+  // Fetch Data - this month is part of the dashboard; fall back to /moods/history if it failed
+  const { data: dashboard, isLoading: isLoadingDashboard, isError: dashboardError } = useDashboard();
+  const { data: history, isLoading: isLoadingHistory } = useQuery({
     queryKey: ['moodHistory', session?.user.id, 'chart'],
     queryFn: async () => {
       const res = await api.get('/moods/history', {
@@ -30,8 +32,15 @@ const MoodChart = () => {
       });
       return res.data;
     },
-    enabled: !!session?.user.id
+    enabled: !!session?.user.id && dashboardError
   });
+  const rawData = dashboard
+    ? dashboard.moods.filter((m) => {
+        const day = parseISO(m.created_at);
+        return day >= startOfMonth(currentDate) && day <= endOfMonth(currentDate);
+      })
+    : history;
+  const isLoading = isLoadingDashboard || (dashboardError && isLoadingHistory);
 
   // Process data for Recharts
   const chartData = rawData?.map((item) => ({
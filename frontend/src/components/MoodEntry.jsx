@@ -1,15 +1,12 @@
 import { useState } from 'react';
-import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
+import { useMutation, useQueryClient } from '@tanstack/react-query';
 import { Loader2, CheckCircle2 } from 'lucide-react';
 import api from '../services/api';
-import { UserAuth } from '../context/AuthContext';
+import useDashboard from '../hooks/useDashboard';
 
 const MoodEntry = () => {
   const queryClient = useQueryClient();
   const [selectedMood, setSelectedMood] = useState(null);
-  const { session } = UserAuth();
-
-  const userId = session?.user?.id;
 
   const moodIcons = [
     { icon: "🙁", text: "Rough day", score: 1 },
@@ -20,13 +17,8 @@ const MoodEntry = () => {
   ];
 
   // 1. Check if user already logged today
-  const { data: hasLoggedToday, isLoading: isLoadingStatus } = useQuery({
-    queryKey: ['moodStatus', 'today', userId],
-    queryFn: async () => {
-      const res = await api.get('/moods/today');
-      return res.data;
-    },
-  });
+  const { data: dashboard, isLoading: isLoadingStatus } = useDashboard();
+  const hasLoggedToday = dashboard?.logged_today;
 
   // 2. Mutation to save mood via FastAPI
   const mutation = useMutation({
@@ -40,7 +32,12 @@ const MoodEntry = () => {
       return res.data;
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['moodStatus'] });
+      queryClient.invalidateQueries({ queryKey: ['dashboard'] });
+      queryClient.invalidateQueries({ queryKey: ['moodHistory'] });
+    },
+    onError: () => {
+      // Most likely already logged (another tab or device) - refresh the status
+      queryClient.invalidateQueries({ queryKey: ['dashboard'] });
     }
   });
 
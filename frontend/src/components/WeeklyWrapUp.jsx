@@ -3,18 +3,26 @@ import { useQuery } from '@tanstack/react-query';
 import { ChevronLeft, ChevronRight, Sparkles, Loader2 } from 'lucide-react';
 import { format, parseISO } from 'date-fns';
 import api from '../services/api';
+import useDashboard from '../hooks/useDashboard';
 
 const WeeklyWrapUp = () => {
   const [weekOffset, setWeekOffset] = useState(0); // 0 = Last Week
 
-  const { data, isLoading } = useQuery({
+  // Last week's insight comes with the dashboard once it has been generated
+  const { data: dashboard, isLoading: isLoadingDashboard } = useDashboard();
+  const fromDashboard = weekOffset === 0 ? dashboard?.weekly : null;
+
+  const { data: weekly, isLoading: isLoadingWeekly } = useQuery({
     queryKey: ['weeklyWrapUp', weekOffset],
     queryFn: async () => {
       const res = await api.get(`/insights/weekly?offset=${weekOffset}`);
       return res.data;
     },
+    enabled: !(weekOffset === 0 && (isLoadingDashboard || fromDashboard)),
     keepPreviousData: true // Keeps old data visible while fetching new
   });
+  const data = fromDashboard || weekly;
+  const isLoading = !data && (isLoadingDashboard || isLoadingWeekly);
 
   const payload = data?.payload;
 
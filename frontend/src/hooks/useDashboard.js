@@ -0,0 +1,33 @@
+import { useQuery } from '@tanstack/react-query';
+import { startOfMonth, endOfMonth, startOfWeek, endOfWeek } from 'date-fns';
+import api from '../services/api';
+import { UserAuth } from '../context/AuthContext';
+
+// This month's calendar grid - covers both the calendar and the chart
+export const dashboardRange = () => {
+  const now = new Date();
+  return {
+    start: startOfWeek(startOfMonth(now)),
+    end: endOfWeek(endOfMonth(now)),
+  };
+};
+
+// One /dashboard request feeds every home and insights widget on load.
+// The browser revalidates with the ETag, so an unchanged dashboard is a 304.
+export default function useDashboard() {
+  const { session } = UserAuth();
+  const userId = session?.user?.id;
+
+  return useQuery({
+    queryKey: ['dashboard', userId],
+    queryFn: async () => {
+      const { start, end } = dashboardRange();
+      const res = await api.get('/dashboard/', {
+        params: { start_date: start.toISOString(), end_date: end.toISOString() }
+      });
+      return res.data;
+    },
+    enabled: !!userId,
+    staleTime: 1000 * 30,
+  });
+}
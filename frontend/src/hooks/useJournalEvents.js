@@ -0,0 +1,27 @@
+import { useEffect } from "react";
+import { streamEvents } from "../services/sse";
+
+// onConnect runs on every (re)connect: events published while we weren't
+// listening are not replayed, so callers should refetch what they show.
+export default function useJournalEvents(onEvent, { enabled = true, onConnect } = {}) {
+  useEffect(() => {
+    if (!enabled) return;
+
+    const controller = new AbortController();
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await streamEvents('/journals/events', { signal: controller.signal, onEvent, onOpen: onConnect });
+        } catch {
+          if (controller.signal.aborted) return;
+        }
+        // Stream dropped - back off briefly and reconnect
+        await new Promise(resolve => setTimeout(resolve, 5000));
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  }, [onEvent, enabled, onConnect]);
+}
@@ -1,31 +1,64 @@
+import { useCallback } from 'react';
 import { Link } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { UserAuth } from '../context/AuthContext';
 import { Plus, PenLine } from 'lucide-react';
 import JournalCard from '../components/JournalCard';
 import api from '../services/api';
+import useJournalEvents from '../hooks/useJournalEvents';
 
 const JournalsPage = () => {
   const { session } = UserAuth();
   const queryClient = useQueryClient();
   const user = session?.user;
 
-  // --- FETCH JOURNALS ---
-  const { data: journals, isLoading, error } = useQuery({
+  // --- FETCH JOURNALS (cursor-paginated) ---
+  const {
+    data,
+    isLoading,
+    error,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['journals', user?.id],
-    queryFn: async () => {
-      const { data } = await api.get('/journals/');
+    queryFn: async ({ pageParam }) => {
+      const { data } = await api.get('/journals/', {
+        params: pageParam ? { cursor: pageParam } : {}
+      });
       return data;
     },
-    refetchInterval: (data) => {
-      if (!data || !Array.isArray(data)) {
-        return false;
-      }
-      const isProcessing = data?.some(j => j.summary === "Generating summary...");
-      return isProcessing ? 2000 : false;
-    }
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   });
 
+  const journals = data?.pages.flatMap(page => page.items) ?? [];
+
+  // --- LIVE AI UPDATES (server push instead of polling) ---
+  const handleJournalEvent = useCallback(({ event, data: payload }) => {
+    const patch = event === 'journal.processed'
+      ? { summary: payload.summary, tags: payload.tags }
+      : event === 'journal.failed'
+        ? { summary: "Summary unavailable" }
+        : null;
+    if (!patch) return;
+
+    queryClient.setQueryData(['journals', user?.id], (old) => old && {
+      ...old,
+      pages: old.pages.map(page => ({
+        ...page,
+        items: page.items.map(j => j.id === payload.journal_id ? { ...j, ...patch } : j),
+      })),
+    });
+  }, [queryClient, user?.id]);
+
+  // Catch up on anything processed before the stream opened or while it was down
+  const refetchJournals = useCallback(() => {
+    queryClient.invalidateQueries({ queryKey: ['journals', user?.id] });
+  }, [queryClient, user?.id]);
+
+  useJournalEvents(handleJournalEvent, { enabled: !!user, onConnect: refetchJournals });
+
   // --- DELETE JOURNAL ---
   const deleteMutation = useMutation({
     mutationFn: async (journalId) => {
@@ -63,16 +96,30 @@ const JournalsPage = () => {
         </Link>
       </div>
 
-      {journals && journals.length > 0 ? (
-        <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-          {journals.map((journal) => (
-            <JournalCard 
-              key={journal.id} 
-              entry={journal} 
-              onDelete={handleDelete} 
-            />
-          ))}
-        </div>
+      {journals.length > 0 ? (
+        <>
+          <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
+            {journals.map((journal) => (
+              <JournalCard 
+                key={journal.id} 
+                entry={journal} 
+                onDelete={handleDelete} 
+              />
+            ))}
+          </div>
+
+          {hasNextPage && (
+            <div className="flex justify-center">
+              <button
+                onClick={() => fetchNextPage()}
+                disabled={isFetchingNextPage}
+                className="text-[#228B22] font-medium hover:underline disabled:opacity-50"
+              >
+                {isFetchingNextPage ? 'Loading...' : 'Load older entries'}
+              </button>
+            </div>
+          )}
+        </>
       ) : (
         <div className="flex flex-col items-center justify-center py-20 text-center border-2 border-dashed border-[#2C4C3B]/10 rounded-3xl">
           <div className="bg-[#F3F0E7] p-4 rounded-full mb-4">
@@ -0,0 +1,49 @@
+import { supabase } from '../supabaseClient';
+import api from './api';
+
+// Parses one SSE block ("event: x\ndata: {...}") into { event, data }
+function parseEvent(block) {
+  let event = "message";
+  let data = "";
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data += line.slice(5).trim();
+  }
+  return data ? { event, data: JSON.parse(data) } : null;
+}
+
+// Opens an SSE endpoint with the Supabase token and calls onEvent for each message.
+// EventSource can't send an Authorization header (or POST), so we read the stream with fetch.
+// onOpen runs once the server has accepted the stream, before any event is read.
+export async function streamEvents(path, { method = 'GET', body, signal, onEvent, onOpen }) {
+  const { data: { session } } = await supabase.auth.getSession();
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method,
+    headers: {
+      Authorization: `Bearer ${session?.access_token}`,
+      ...(body ? { 'Content-Type': 'application/json' } : {}),
+    },
+    body: body ? JSON.stringify(body) : undefined,
+    signal,
+  });
+  if (!response.ok) {
+    throw new Error(`Stream failed with ${response.status}`);
+  }
+  onOpen?.();
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    const blocks = buffer.split("\n\n");
+    buffer = blocks.pop();
+    for (const block of blocks) {
+      const parsed = parseEvent(block);
+      if (parsed) onEvent(parsed);
+    }
+  }
+}